@@ -0,0 +1,198 @@
+import io
+import json
+import platform
+import statistics
+from datetime import datetime
+from importlib import metadata
+from time import perf_counter, time
+import logging
+
+from rich.console import Console
+
+from python_zte_mc801a.lib.data_processing import (
+    process_data,
+    process_sample,
+    decode_sms_messages,
+)
+from python_zte_mc801a.lib.batch_processing import process_batch
+from python_zte_mc801a.lib.helpers import get_processed_data, get_router_poller
+from python_zte_mc801a.lib.mock_router import start_mock_router
+from python_zte_mc801a.lib.router_requests import (
+    RouterSession,
+    get_router_session,
+    get_auth_cookies,
+    get_signal_data,
+    get_sms_page,
+)
+from python_zte_mc801a.client.live import (
+    LIVE_VISUALIZATIONS,
+    generate_table,
+    make_layout,
+    render_live_data,
+)
+from python_zte_mc801a.client.ring_buffer import ColumnarRingBuffer
+from python_zte_mc801a.lib.change_detection import ChangeDetector
+from python_zte_mc801a.lib.polling import PollResult
+
+log = logging.getLogger("rich")
+
+BENCHMARK_PASSWORD = "benchmark"
+
+
+def measure(func, iterations: int, warmup: int = 3) -> dict:
+    """Time repeated calls of a function
+
+    Args:
+        func (callable): Function to time, called without arguments
+        iterations (int): Number of timed calls
+        warmup (int, optional): Number of untimed calls made first. Defaults to 3.
+
+    Returns:
+        dict: Timing statistics, in seconds
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+
+    for _ in range(iterations):
+        start = perf_counter()
+        func()
+        timings.append(perf_counter() - start)
+
+    timings.sort()
+
+    return {
+        "iterations": iterations,
+        "mean": statistics.mean(timings),
+        "median": statistics.median(timings),
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "min": timings[0],
+        "max": timings[-1],
+        "unit": "s",
+    }
+
+
+def _render(renderable) -> str:
+    console = Console(file=io.StringIO(), width=160, color_system="truecolor")
+    console.print(renderable)
+    return console.file.getvalue()
+
+
+def _render_live_snapshot(layout, latest: PollResult, ring_buffer, detector) -> str:
+    # What `show_live` runs for each new background poll result
+    raw_data, sms_data = latest.value
+    render_live_data(
+        layout,
+        LIVE_VISUALIZATIONS.SMS,
+        process_sample(raw_data),
+        raw_data,
+        sms_data,
+        ring_buffer,
+        detector,
+    )
+    return _render(layout)
+
+
+def _get_processed_data_uncached(router_ip: str) -> tuple:
+    # Time a full round trip: without this, calls within the signal refresh
+    # interval return the poller's snapshot (or a cached response) instantly
+    get_router_poller(router_ip, BENCHMARK_PASSWORD).invalidate()
+    get_router_session(router_ip, BENCHMARK_PASSWORD).invalidate_cache()
+    return get_processed_data(router_ip, BENCHMARK_PASSWORD)
+
+
+def run_benchmarks(iterations: int = 200, latency: float = 0.0) -> dict:
+    """Run the benchmark suite against a local mock router
+
+    Args:
+        iterations (int, optional): Number of timed iterations per benchmark. Defaults to 200.
+        latency (float, optional): Simulated router latency in seconds. Defaults to 0.
+
+    Returns:
+        dict: Environment description and per-benchmark timing statistics
+    """
+    server = start_mock_router(
+        password=BENCHMARK_PASSWORD, latency=latency, sms_count=500, seed=0
+    )
+    router_ip = server.router_ip
+
+    try:
+        session = RouterSession(router_ip, BENCHMARK_PASSWORD)
+        raw_data = session.get_signal_data()
+        sample = process_sample(raw_data)
+        batch_samples = [dict(raw_data) for _ in range(10000)]
+
+        raw_messages = session.call(get_sms_page, data_per_page=500)
+
+        layout = make_layout()
+        ring_buffer = ColumnarRingBuffer(["lte_rsrp", "Z5g_rsrp"])
+        detector = ChangeDetector()
+        latest = PollResult(
+            (raw_data, session.get_latest_sms_messages()), time(), None, 1
+        )
+
+        benchmarks = {
+            "process_data": lambda: process_data(raw_data),
+            "process_sample": lambda: process_sample(raw_data),
+            "process_batch_10000": lambda: process_batch(batch_samples),
+            "get_auth_cookies": lambda: get_auth_cookies(router_ip, BENCHMARK_PASSWORD),
+            "get_auth_cookies_pooled": lambda: get_auth_cookies(
+                router_ip, BENCHMARK_PASSWORD, session=session.http
+            ),
+            "get_signal_data_pooled": lambda: get_signal_data(
+                router_ip, session.get_auth_cookies(), session=session.http
+            ),
+            "set_5g_band_pooled": lambda: session.set_5g_band("78"),
+            "get_processed_data": lambda: _get_processed_data_uncached(router_ip),
+            "sms_decode_500": lambda: decode_sms_messages(
+                [dict(msg) for msg in raw_messages], 500
+            ),
+            "get_latest_sms_messages_3": lambda: session.get_latest_sms_messages(n=3),
+            "get_latest_sms_messages_500": lambda: session.get_latest_sms_messages(
+                n=500
+            ),
+            "generate_table": lambda: _render(
+                generate_table(sample, "4G", show_carriers=True)
+            ),
+            "render_live_data": lambda: _render_live_snapshot(
+                layout, latest, ring_buffer, detector
+            ),
+        }
+
+        results = {}
+
+        for name, func in benchmarks.items():
+            log.info(f"Running {name}")
+            results[name] = measure(func, iterations)
+
+        session.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    try:
+        version = metadata.version("python-zte-mc801a")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+
+    return {
+        "version": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "iterations": iterations,
+        "router_latency": latency,
+        "results": results,
+    }
+
+
+def write_benchmark_results(results: dict, output_file: str):
+    """Write benchmark results as JSON
+
+    Args:
+        results (dict): Results obtained using `run_benchmarks`
+        output_file (str): Path to the output file
+    """
+    with open(output_file, "w") as f:
+        json.dump(results, f, indent=2)
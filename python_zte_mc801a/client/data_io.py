@@ -1,9 +1,11 @@
 import yaml
-import json
 from pathlib import Path
 from datetime import datetime
 import logging
 
+from python_zte_mc801a.client.history import HistoryStore, migrate_legacy_data
+from python_zte_mc801a.client.sqlite_store import SQLiteStore
+
 log = logging.getLogger("rich")
 
 
@@ -36,38 +38,91 @@ def check_config(router_ip: str, password: str) -> dict:
     return None
 
 
-def check_create_data_file():
-    if not Path("data.json").exists():
-        Path("data.json").touch()
-        Path("data.json").write_text('{"signal_data":[]}')
+def load_inventory(inventory_file: str) -> list:
+    """Load the list of routers to poll from a YAML inventory file
 
+    The file contains a `routers` list (or a top-level list) of entries with
+    `router_ip`, `password` and an optional `name`:
 
-def persist_data(data):
-    if data:
-        check_create_data_file()
+        routers:
+          - name: office
+            router_ip: 192.168.0.1
+            password: ADMIN_PASSWORD
+
+    Args:
+        inventory_file (str): Path to the inventory file
+
+    Returns:
+        list: Router configurations, or None if the inventory is invalid
+    """
+    if not Path(inventory_file).exists():
+        log.error(f"Could not locate inventory file {inventory_file}")
+        return None
+
+    with open(inventory_file, "r") as f:
+        inventory = yaml.load(f, Loader=yaml.SafeLoader)
 
-        with open("data.json", "r") as f:
-            existing_json_data = json.load(f)
+    if isinstance(inventory, dict):
+        inventory = inventory.get("routers")
 
-        with open("data.json", "w") as f:
-            data["time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if not isinstance(inventory, list) or not len(inventory):
+        log.error(f"No routers found in inventory file {inventory_file}")
+        return None
+
+    routers = []
+
+    for index, router in enumerate(inventory):
+        if (
+            not isinstance(router, dict)
+            or not router.get("router_ip")
+            or not router.get("password")
+        ):
+            log.error(
+                f"Inventory entry {index} must provide both router_ip and password"
+            )
+            return None
 
-            existing_json_data["signal_data"].append(data)
+        routers.append(
+            {
+                "name": str(router.get("name", router["router_ip"])),
+                "router_ip": router["router_ip"],
+                "password": router["password"],
+            }
+        )
 
-            json.dump(existing_json_data, f)
+    names = [router["name"] for router in routers]
+    if len(set(names)) != len(names):
+        log.error(f"Router names in inventory file {inventory_file} must be unique")
+        return None
 
+    return routers
 
-def load_data():
-    check_create_data_file()
 
-    with open("data.json", "r") as f:
-        json_data = json.load(f)
+HISTORY_DIRECTORY = "history"
 
-        if "signal_data" in json_data.keys():
-            y = [int(x["lte_rsrp"]) for x in json_data["signal_data"][-10:]]
-            x = [*range(0, len(y))]
+_history_store = None
+
+
+def get_history_store() -> HistoryStore:
+    """Return the history store, migrating the legacy `data.json` file on first use
+
+    Returns:
+        HistoryStore: History store
+    """
+    global _history_store
+
+    if _history_store is None:
+        _history_store = HistoryStore(HISTORY_DIRECTORY)
+        migrate_legacy_data(_history_store, "data.json")
+
+    return _history_store
+
+
+def persist_data(data, router: str = None, sqlite_store: SQLiteStore = None):
+    if data:
+        data["time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-            return x, y
+        get_history_store().append(data)
 
-        else:
-            return [], []
+        if sqlite_store is not None:
+            sqlite_store.insert(router, data)
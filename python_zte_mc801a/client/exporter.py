@@ -0,0 +1,286 @@
+"""Prometheus exporter serving router signal data on `/metrics`.
+
+Each router's data is fetched at most once per TTL, however many scrapers there
+are: concurrent scrapes of an expired snapshot wait for a single router request.
+A scrape waits at most `scrape_timeout` for the routers; those that have not
+answered by then are reported as down, while their poll keeps running for later
+scrapes.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from time import monotonic
+import logging
+import math
+
+from python_zte_mc801a.lib.data_processing import process_sample
+from python_zte_mc801a.lib.router_requests import ResponseCache, get_signal_data
+from python_zte_mc801a.client.fleet import create_fleet_sessions
+
+log = logging.getLogger("rich")
+
+METRIC_PREFIX = "zte_mc801a"
+
+# Gauges read from `SignalSample` attributes: name -> (attribute, help)
+SAMPLE_GAUGES = {
+    "lte_rsrp_dbm": ("lte_rsrp", "LTE reference signal received power"),
+    "lte_rsrq_db": ("lte_rsrq", "LTE reference signal received quality"),
+    "lte_rssi_dbm": ("lte_rssi", "LTE received signal strength indicator"),
+    "lte_snr_db": ("lte_snr", "LTE signal to noise ratio"),
+    "lte_pci": ("lte_pci", "LTE physical cell ID"),
+    "lte_earfcn": ("lte_earfcn", "LTE channel (EARFCN)"),
+    "lte_bandwidth_mhz": ("lte_bandwidth", "LTE primary carrier bandwidth"),
+    "lte_pci_locked": ("lte_pci_locked", "Whether the LTE PCI is locked"),
+    "lte_earfcn_locked": ("lte_earfcn_locked", "Whether the LTE EARFCN is locked"),
+    "cell_id": ("cell_id", "LTE cell ID"),
+    "enbid": ("enbid", "LTE eNodeB ID"),
+    "ca_active": ("ca_active", "Whether carrier aggregation is active"),
+    "nr5g_rsrp_dbm": ("nr5g_rsrp", "5G reference signal received power"),
+    "nr5g_sinr_db": ("nr5g_sinr", "5G signal to interference plus noise ratio"),
+    "nr5g_pci": ("nr5g_pci", "5G physical cell ID"),
+    "nr5g_earfcn": ("nr5g_earfcn", "5G channel (NR-ARFCN)"),
+}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value) -> str:
+    if isinstance(value, (bool, int)):
+        return str(int(value))
+
+    value = float(value)
+
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _labels(labels: dict) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def format_metrics(samples: dict) -> str:
+    """Render signal samples in the Prometheus text exposition format
+
+    Args:
+        samples (dict): Router name -> (`SignalSample`, raw data, age in seconds), or None if the router could not be polled
+
+    Returns:
+        str: Metrics page
+    """
+    metrics = {}
+
+    def add(name: str, help_text: str, labels: dict, value):
+        if value is None:
+            return
+        family = metrics.setdefault(f"{METRIC_PREFIX}_{name}", (help_text, []))
+        family[1].append(f"{METRIC_PREFIX}_{name}{_labels(labels)} {_format(value)}")
+
+    for router, polled in samples.items():
+        add(
+            "up",
+            "Whether the router could be polled",
+            {"router": router},
+            polled is not None,
+        )
+
+        if polled is None:
+            continue
+
+        sample, raw_data, age = polled
+        labels = {"router": router}
+
+        add("snapshot_age_seconds", "Age of the router data", labels, age)
+
+        for name, (attribute, help_text) in SAMPLE_GAUGES.items():
+            add(name, help_text, labels, getattr(sample, attribute))
+
+        add(
+            "temperature_celsius",
+            "Modem temperature",
+            {**labels, "modem": "4g"},
+            sample.temperature_4g,
+        )
+        add(
+            "temperature_celsius",
+            "Modem temperature",
+            {**labels, "modem": "5g"},
+            sample.temperature_5g,
+        )
+        add(
+            "signal_bars",
+            "Signal strength bars",
+            labels,
+            _to_float(raw_data.get("signalbar")),
+        )
+        add(
+            "ca_secondary_carriers",
+            "Number of LTE secondary carriers",
+            labels,
+            len(sample.ca_carriers),
+        )
+
+        for index, carrier in enumerate(sample.ca_carriers):
+            add(
+                "ca_carrier_bandwidth_mhz",
+                "Bandwidth of an LTE secondary carrier",
+                {
+                    **labels,
+                    "carrier": index + 1,
+                    "band": carrier.band,
+                    "pci": carrier.pci,
+                    "earfcn": carrier.earfcn,
+                },
+                carrier.bandwidth,
+            )
+
+        add(
+            "info",
+            "Router and network information",
+            {
+                **labels,
+                "firmware": sample.firmware_version,
+                "network_type": sample.network_type,
+                "provider": sample.network_provider,
+                "apn": sample.apn,
+                "lte_band": sample.lte_band,
+                "nr5g_bands": sample.nr5g_bands,
+            },
+            1,
+        )
+
+    lines = []
+
+    for name, (help_text, values) in metrics.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(values)
+
+    return "\n".join(lines) + "\n"
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MetricsExporter:
+    """Polls routers on demand, through a `ResponseCache` shared by all routers"""
+
+    def __init__(
+        self,
+        inventory: list,
+        ttl: float = 5.0,
+        timeout: float = 10,
+        scrape_timeout: float = None,
+    ) -> None:
+        """
+        Args:
+            inventory (list): Router configurations (see `load_inventory`)
+            ttl (float, optional): Seconds router data is reused for. Defaults to 5.
+            timeout (float, optional): Timeout in seconds of each HTTP request to a router. Defaults to 10.
+            scrape_timeout (float, optional): Maximum seconds a scrape waits for the routers. Defaults to `timeout`.
+        """
+        self.cache = ResponseCache(ttl=ttl, max_entries=max(256, len(inventory)))
+        self.sessions = create_fleet_sessions(
+            inventory, timeout=timeout, cache=self.cache
+        )
+        self.scrape_timeout = scrape_timeout or timeout
+        # At most one poll per router is in flight, so a worker per router
+        # means a stuck router never delays the polls of the others
+        self.executor = ThreadPoolExecutor(max_workers=max(1, len(self.sessions)))
+        self.polls = {}
+        self.polls_lock = Lock()
+        self.errors = {}
+
+    def _poll(self, name: str):
+        try:
+            raw_data, age = self.sessions[name].call_cached(get_signal_data)
+        except Exception as e:
+            # Cached errors are raised again until they expire: only log new ones
+            if self.errors.get(name) is not e:
+                self.errors[name] = e
+                log.warning(f"Could not poll {name}: {e!r}")
+            return None
+        return process_sample(raw_data), raw_data, age
+
+    def _start_poll(self, name: str):
+        with self.polls_lock:
+            future = self.polls.get(name)
+            if future is None or future.done():
+                future = self.polls[name] = self.executor.submit(self._poll, name)
+            return future
+
+    def render(self) -> str:
+        """Poll all routers (using cached data where fresh) and render the metrics page
+
+        Returns:
+            str: Metrics page
+        """
+        start = monotonic()
+        futures = {name: self._start_poll(name) for name in self.sessions}
+
+        wait(futures.values(), timeout=self.scrape_timeout)
+
+        samples = {}
+        for name, future in futures.items():
+            if future.done():
+                samples[name] = future.result()
+            else:
+                log.warning(
+                    f"Could not poll {name}: no response within {self.scrape_timeout:g}s"
+                )
+                samples[name] = None
+
+        page = format_metrics(samples)
+        duration = monotonic() - start
+
+        return (
+            page
+            + f"# HELP {METRIC_PREFIX}_scrape_duration_seconds Time spent rendering the metrics\n"
+            + f"# TYPE {METRIC_PREFIX}_scrape_duration_seconds gauge\n"
+            + f"{METRIC_PREFIX}_scrape_duration_seconds {duration:g}\n"
+        )
+
+    def close(self):
+        self.executor.shutdown()
+        for session in self.sessions.values():
+            session.close()
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        log.debug(format % args)
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        content = self.server.exporter.render().encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """HTTP server exposing a `MetricsExporter` on `/metrics`"""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, exporter: MetricsExporter) -> None:
+        self.exporter = exporter
+        super().__init__(address, MetricsRequestHandler)
@@ -0,0 +1,240 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from time import monotonic, sleep
+import logging
+
+from rich.pretty import pprint
+
+from python_zte_mc801a.lib.data_processing import process_data
+from python_zte_mc801a.lib.router_requests import RouterSession, ResponseCache
+from python_zte_mc801a.lib.polling import PollScheduler
+from python_zte_mc801a.client.sqlite_store import SQLiteStore
+
+log = logging.getLogger("rich")
+
+
+def create_fleet_sessions(
+    inventory: list, timeout: float, cache: ResponseCache = None
+) -> dict:
+    """Create one router session per inventory entry
+
+    Args:
+        inventory (list): Router configurations obtained using `load_inventory`
+        timeout (float): Timeout in seconds of each HTTP request to a router
+        cache (ResponseCache, optional): Cache of read results shared by the sessions. Defaults to None (no caching).
+
+    Returns:
+        dict: Router sessions, keyed by router name
+    """
+    return {
+        router["name"]: RouterSession(
+            router["router_ip"], router["password"], timeout=timeout, cache=cache
+        )
+        for router in inventory
+    }
+
+
+def poll_router(
+    session: RouterSession, raw: bool = False, schedule: PollScheduler = None
+) -> dict:
+    """Poll a single router, capturing errors instead of raising them
+
+    With a schedule, the router is only polled if its next poll is due within
+    half a target interval, i.e. closer to this polling cycle than to the next.
+
+    Args:
+        session (RouterSession): Router session
+        raw (bool, optional): Whether to return raw instead of processed data. Defaults to False.
+        schedule (PollScheduler, optional): Adaptive schedule of the router's polls. Defaults to None (always poll).
+
+    Returns:
+        dict: Router IP, poll duration, `raw_data` and either `data` or `error`, or `skipped` if not polled
+    """
+    start = monotonic()
+    result = {"router_ip": session.router_ip, "raw_data": None}
+
+    if schedule is not None and schedule.delay() >= schedule.target_interval / 2:
+        if schedule.circuit_open:
+            skipped = f"circuit {schedule.state}, next try in {schedule.delay():.0f}s"
+        else:
+            skipped = f"backing off, polling {schedule}"
+        result["skipped"] = skipped
+        result["duration"] = 0.0
+        return result
+
+    error = None
+
+    try:
+        data = session.get_signal_data()
+        result["raw_data"] = data
+        result["data"] = data if raw else process_data(raw_data=data)
+    except Exception as e:
+        error = e
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    duration = monotonic() - start
+    result["duration"] = round(duration, 3)
+
+    if schedule is not None:
+        schedule.record(duration, error)
+
+    return result
+
+
+def poll_fleet(
+    sessions: dict,
+    executor: ThreadPoolExecutor,
+    raw: bool = False,
+    schedules: dict = None,
+    deadline: float = None,
+    pending: dict = None,
+) -> dict:
+    """Poll all routers concurrently
+
+    Routers are polled in parallel by the executor's workers, so a cycle takes
+    about as long as the slowest router (given enough workers), and at most
+    `deadline` seconds: routers that have not answered by then are reported
+    with an error. Their polls keep running in the background; with `pending`,
+    such routers are not polled again until their previous poll completes.
+
+    Args:
+        sessions (dict): Router sessions, keyed by router name
+        executor (ThreadPoolExecutor): Executor bounding the number of concurrent polls
+        raw (bool, optional): Whether to return raw instead of processed data. Defaults to False.
+        schedules (dict, optional): `PollScheduler` per router name. Defaults to None (poll every router).
+        deadline (float, optional): Maximum seconds to wait for the routers. Defaults to None (no limit).
+        pending (dict, optional): Polls still running from previous cycles, keyed by router name, updated in place. Defaults to None.
+
+    Returns:
+        dict: Poll results obtained using `poll_router`, keyed by router name
+    """
+    schedules = schedules or {}
+    pending = pending if pending is not None else {}
+    results = {}
+    futures = {}
+
+    for name, session in sessions.items():
+        if name in pending and not pending[name].done():
+            results[name] = _timeout_result(session, "previous poll still running")
+        else:
+            pending.pop(name, None)
+            futures[name] = executor.submit(
+                poll_router, session, raw, schedules.get(name)
+            )
+
+    wait(futures.values(), timeout=deadline)
+
+    for name, future in futures.items():
+        if future.done():
+            results[name] = future.result()
+        else:
+            pending[name] = future
+            results[name] = _timeout_result(
+                sessions[name], f"no response within {deadline:g}s", deadline
+            )
+
+    return {name: results[name] for name in sessions}
+
+
+def _timeout_result(session: RouterSession, reason: str, duration: float = 0.0):
+    return {
+        "router_ip": session.router_ip,
+        "raw_data": None,
+        "error": f"TimeoutError: {reason}",
+        "duration": duration,
+    }
+
+
+def show_fleet(
+    inventory: list,
+    max_workers: int = 8,
+    timeout: float = 10,
+    interval: float = 5,
+    cycles: int = 0,
+    raw: bool = False,
+    sqlite_path: str = None,
+    max_interval: float = 60,
+    deadline: float = None,
+):
+    """Repeatedly poll a fleet of routers and print one combined result per cycle
+
+    Each router has its own `PollScheduler`: slow or failing routers are polled
+    less often, without slowing down the cycles of the others. Routers that do
+    not answer within `deadline` are reported as failed for the cycle (see
+    `poll_fleet`).
+
+    Args:
+        inventory (list): Router configurations obtained using `load_inventory`
+        max_workers (int, optional): Maximum number of routers polled concurrently. Defaults to 8.
+        timeout (float, optional): Timeout in seconds of each HTTP request to a router. Defaults to 10.
+        interval (float, optional): Seconds between the start of two cycles. Defaults to 5.
+        cycles (int, optional): Number of cycles to run, 0 to run forever. Defaults to 0.
+        raw (bool, optional): Whether to print raw instead of processed data. Defaults to False.
+        sqlite_path (str, optional): SQLite database in which raw samples are stored. Defaults to None.
+        max_interval (float, optional): Maximum seconds between polls of a slow or failing router. Defaults to 60.
+        deadline (float, optional): Maximum seconds a cycle waits for the routers. Defaults to the longer of `interval` and `timeout`.
+    """
+    deadline = deadline or max(interval, timeout)
+    pending = {}
+    sessions = create_fleet_sessions(inventory, timeout=timeout)
+    schedules = {
+        name: PollScheduler(
+            interval=interval, max_interval=max_interval, slow_latency=timeout / 4
+        )
+        for name in sessions
+    }
+    sqlite_store = SQLiteStore(sqlite_path) if sqlite_path else None
+    cycle = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            while not cycles or cycle < cycles:
+                cycle_start = monotonic()
+
+                results = poll_fleet(
+                    sessions,
+                    executor,
+                    raw=raw,
+                    schedules=schedules,
+                    deadline=deadline,
+                    pending=pending,
+                )
+
+                duration = monotonic() - cycle_start
+                errors = len([r for r in results.values() if "error" in r])
+                skipped = len([r for r in results.values() if "skipped" in r])
+
+                time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                raw_samples = {
+                    name: result.pop("raw_data") for name, result in results.items()
+                }
+
+                if sqlite_store is not None:
+                    sqlite_store.insert_many(
+                        [
+                            (name, {**sample, "time": time})
+                            for name, sample in raw_samples.items()
+                            if sample
+                        ]
+                    )
+
+                pprint(
+                    {
+                        "time": time,
+                        "routers": results,
+                    }
+                )
+                log.info(
+                    f"Polled {len(results) - skipped} routers in {duration:.2f}s "
+                    f"({errors} errors, {skipped} skipped)"
+                )
+
+                cycle += 1
+                if not cycles or cycle < cycles:
+                    sleep(max(0, interval - duration))
+        finally:
+            for session in sessions.values():
+                session.close()
+
+            if sqlite_store is not None:
+                sqlite_store.close()
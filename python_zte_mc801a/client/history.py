@@ -0,0 +1,251 @@
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+import logging
+
+log = logging.getLogger("rich")
+
+SEGMENT_PREFIX = "signal_data-"
+SEGMENT_SUFFIX = ".jsonl"
+SEGMENT_TIME_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+
+class HistoryStore:
+    """Append-only store of raw signal data samples.
+
+    Samples are written as one JSON document per line to segment files, so each
+    write costs the same regardless of the history size and a crash can at most
+    truncate the last line. The current segment is rotated once it reaches a
+    maximum size or age.
+    """
+
+    def __init__(
+        self,
+        directory: str = "history",
+        max_segment_bytes: int = 16 * 1024 * 1024,
+        max_segment_age: timedelta = timedelta(days=1),
+    ) -> None:
+        """
+        Args:
+            directory (str, optional): Directory holding the segment files. Defaults to "history".
+            max_segment_bytes (int, optional): Size after which a new segment is started. Defaults to 16MB.
+            max_segment_age (timedelta, optional): Age after which a new segment is started. Defaults to 1 day.
+        """
+        self.directory = Path(directory)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+
+        self._segment_path = None
+        self._segment_start = None
+        self._segment_file = None
+
+    def segments(self) -> list:
+        """List segment files, oldest first
+
+        Returns:
+            list: Paths of the segment files
+        """
+        if not self.directory.exists():
+            return []
+
+        return sorted(self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+
+    def append(self, record: dict):
+        """Append a sample to the current segment
+
+        Args:
+            record (dict): Sample to store
+        """
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+
+        segment_file = self._current_segment()
+        segment_file.write(line)
+        segment_file.flush()
+
+    def extend(self, records: list):
+        """Append several samples to the current segment
+
+        Args:
+            records (list): Samples to store
+        """
+        for record in records:
+            self.append(record)
+
+    def iter_records(self):
+        """Iterate over all stored samples, oldest first
+
+        Lines that cannot be decoded (e.g. truncated by a crash) are skipped.
+
+        Yields:
+            dict: Stored sample
+        """
+        for segment in self.segments():
+            with open(segment, "r") as f:
+                for line in f:
+                    record = _decode_line(line)
+                    if record is not None:
+                        yield record
+
+    def tail(self, n: int) -> list:
+        """Return the latest samples without reading the whole history
+
+        Args:
+            n (int): Number of samples to return
+
+        Returns:
+            list: Up to `n` samples, oldest first
+        """
+        records = []
+
+        for segment in reversed(self.segments()):
+            lines = _read_last_lines(segment, n - len(records))
+            records = [
+                record
+                for record in (_decode_line(line) for line in lines)
+                if record is not None
+            ] + records
+
+            if len(records) >= n:
+                break
+
+        return records[-n:] if n else []
+
+    def close(self):
+        """Close the current segment file"""
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+
+    def _current_segment(self):
+        now = datetime.now()
+
+        if self._segment_file is None:
+            self._open_latest_segment(now)
+        elif (
+            self._segment_file.tell() >= self.max_segment_bytes
+            or now - self._segment_start >= self.max_segment_age
+        ):
+            self.close()
+            self._open_segment(now)
+
+        return self._segment_file
+
+    def _open_latest_segment(self, now: datetime):
+        segments = self.segments()
+
+        if segments:
+            latest = segments[-1]
+            start = _segment_start(latest)
+
+            if (
+                start is not None
+                and latest.stat().st_size < self.max_segment_bytes
+                and now - start < self.max_segment_age
+            ):
+                self._segment_path = latest
+                self._segment_start = start
+                self._segment_file = open(latest, "a")
+
+                # Terminate a line left incomplete by a crash
+                if latest.stat().st_size and not _ends_with_newline(latest):
+                    self._segment_file.write("\n")
+                return
+
+        self._open_segment(now)
+
+    def _open_segment(self, now: datetime):
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        path = self.directory / (
+            f"{SEGMENT_PREFIX}{now.strftime(SEGMENT_TIME_FORMAT)}{SEGMENT_SUFFIX}"
+        )
+
+        self._segment_path = path
+        self._segment_start = now
+        self._segment_file = open(path, "a")
+
+
+def migrate_legacy_data(store: HistoryStore, legacy_file: str = "data.json") -> int:
+    """Move samples from the legacy `{"signal_data": [...]}` file into a history store
+
+    The legacy file is renamed with a `.migrated` suffix once its samples are
+    stored, so the migration only runs once.
+
+    Args:
+        store (HistoryStore): Destination store
+        legacy_file (str, optional): Path to the legacy data file. Defaults to "data.json".
+
+    Returns:
+        int: Number of migrated samples
+    """
+    legacy_path = Path(legacy_file)
+
+    if not legacy_path.exists():
+        return 0
+
+    try:
+        with open(legacy_path, "r") as f:
+            legacy_data = json.load(f)
+    except ValueError:
+        log.error(f"Could not migrate {legacy_path}: invalid JSON")
+        return 0
+
+    records = (
+        legacy_data.get("signal_data", []) if isinstance(legacy_data, dict) else []
+    )
+
+    store.extend(records)
+    legacy_path.rename(legacy_path.with_name(legacy_path.name + ".migrated"))
+
+    log.info(f"Migrated {len(records)} samples from {legacy_path} to {store.directory}")
+
+    return len(records)
+
+
+def _segment_start(path: Path) -> datetime:
+    try:
+        return datetime.strptime(
+            path.name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)], SEGMENT_TIME_FORMAT
+        )
+    except ValueError:
+        return None
+
+
+def _ends_with_newline(path: Path) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _decode_line(line: str) -> dict:
+    line = line.strip()
+
+    if not line:
+        return None
+
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def _read_last_lines(path: Path, n: int, block_size: int = 8192) -> list:
+    """Read the last `n` lines of a file by seeking backwards from its end"""
+    if n <= 0:
+        return []
+
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+
+        while position > 0 and data.count(b"\n") <= n:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+
+    lines = data.decode().splitlines()
+
+    return lines[-n:]
@@ -1,16 +1,34 @@
+from rich.align import Align
 from rich.console import Group
 from rich.layout import Layout
 from rich.live import Live
 from rich.panel import Panel
 from rich.table import Table
 from datetime import datetime
-from time import sleep
-
-from python_zte_mc801a.client.data_io import persist_data, load_data
-from python_zte_mc801a.lib.helpers import get_processed_data, get_sms_data
+from time import time
+
+from python_zte_mc801a.client.data_io import persist_data
+from python_zte_mc801a.client.sqlite_store import SQLiteStore
+from python_zte_mc801a.client.ring_buffer import ColumnarRingBuffer
+from python_zte_mc801a.lib.router_requests import RouterSession
+from python_zte_mc801a.lib.polling import (
+    BackgroundPoller,
+    PollResult,
+    PollScheduler,
+    TieredPoller,
+)
+from python_zte_mc801a.lib.data_processing import (
+    SignalSample,
+    SIGNAL_SCHEMA,
+    process_sample,
+)
+from python_zte_mc801a.lib.change_detection import ChangeDetector
+from python_zte_mc801a.lib.instrumentation import metrics, JSONLinesSink
+from python_zte_mc801a.client.stats import stats_footer
 
 from enum import Enum
 
+import numpy as np
 import termplotlib as tpl
 
 
@@ -28,6 +46,17 @@ class LIVE_VISUALIZATIONS(str, Enum):
     SMS = "SMS"
 
 
+# Metrics recorded for charts: raw data field and chart title, per visualization
+CHART_METRICS = {
+    LIVE_VISUALIZATIONS.POWER_4G: ("lte_rsrp", "4G Signal Power"),
+    LIVE_VISUALIZATIONS.POWER_5G: ("Z5g_rsrp", "5G Signal Power"),
+}
+
+CHART_WINDOW = 10
+
+RING_BUFFER_FILE = "live_buffer.bin"
+
+
 class Header:
     """Display app header."""
 
@@ -75,94 +104,293 @@ def generate_sms_table(sms_data: list) -> Table:
 
 
 def generate_table(
-    processed_data, primary_data_type, secondary_data_type=None
+    sample: SignalSample, primary_data_type: str, show_carriers: bool = False
 ) -> Table:
-    table = Table(show_lines=True)
+    """Generate table containing one section of signal data
 
-    primary_data = processed_data[primary_data_type]
-
-    main_row = []
+    Args:
+        sample (SignalSample): Signal sample
+        primary_data_type (str): Section of `SIGNAL_SCHEMA` to display
+        show_carriers (bool, optional): Whether to add one row per CA secondary carrier. Defaults to False.
 
-    for column in primary_data:
-        table.add_column(primary_data[column]["desc"])
-        main_row.append(str(primary_data[column]["str_value"]))
+    Returns:
+        Table: the signal data table
+    """
+    table = Table(show_lines=True)
 
-    table.add_row(*main_row)
+    for field in SIGNAL_SCHEMA[primary_data_type]:
+        table.add_column(field.desc)
 
-    if secondary_data_type and (len(processed_data[secondary_data_type])):
-        secondary_data = processed_data[secondary_data_type]
+    table.add_row(*sample.format(primary_data_type).values())
 
-        for ca_row in secondary_data:
+    if show_carriers:
+        for ca_row in sample.format_carriers():
             table.add_row(*ca_row)
 
     return Panel(table, title=primary_data_type)
 
 
-def update_live_table(layout, config, viz):
-    processed_data, raw_data = get_processed_data(
-        config["router_ip"], config["password"]
+def poll_live_data(session: RouterSession, poller: TieredPoller, viz) -> tuple:
+    """Poll the data displayed by the dashboard
+
+    Args:
+        session (RouterSession): Router session
+        poller (TieredPoller): Signal data poller using `session`
+        viz (LIVE_VISUALIZATIONS): Selected visualization
+
+    Returns:
+        tuple: Raw signal data and SMS messages (None unless `viz` is SMS)
+    """
+    raw_data = poller.poll()
+    sms_data = (
+        session.get_latest_sms_messages() if viz == LIVE_VISUALIZATIONS.SMS else None
     )
-    layout["side"].update(
-        Group(
-            generate_table(processed_data, "CELL AND NETWORK"),
-            generate_table(processed_data, "4G", "4G_CA"),
-            generate_table(processed_data, "5G"),
+    return raw_data, sms_data
+
+
+@metrics.timed("render")
+def render_live_data(
+    layout,
+    viz,
+    sample: SignalSample,
+    raw_data: dict,
+    sms_data: list,
+    ring_buffer: ColumnarRingBuffer,
+    detector: ChangeDetector = None,
+):
+    """Update the dashboard with a new sample
+
+    Signal tables are only re-rendered when `detector` reports a change.
+
+    Returns:
+        list: Change events (None without `detector`)
+    """
+    ring_buffer.append(raw_data)
+
+    events = detector.update(raw_data) if detector is not None else None
+
+    if events is None or events:
+        layout["side"].update(
+            Group(
+                generate_table(sample, "CELL AND NETWORK"),
+                generate_table(sample, "4G", show_carriers=True),
+                generate_table(sample, "5G"),
+            )
         )
-    )
-    # layout["body"].update(
 
-    layout["body"].update(update_viz(config=config, viz=viz))
+    layout["body"].update(
+        update_viz(viz=viz, ring_buffer=ring_buffer, sms_data=sms_data)
+    )
 
-    return processed_data, raw_data
+    return events
 
 
-def update_viz(config: dict, viz: LIVE_VISUALIZATIONS = LIVE_VISUALIZATIONS.SMS):
+def update_viz(
+    viz: LIVE_VISUALIZATIONS = LIVE_VISUALIZATIONS.SMS,
+    ring_buffer: ColumnarRingBuffer = None,
+    sms_data: list = None,
+):
     if viz == LIVE_VISUALIZATIONS.SMS:
-        return generate_sms_table(get_sms_data(config["router_ip"], config["password"]))
+        # SMS messages are polled with the signal data (see `poll_live_data`)
+        return generate_sms_table(sms_data or [])
     else:
-        x, y = load_data()
+        metric, title = CHART_METRICS[viz]
+
+        y = ring_buffer.window(metric, CHART_WINDOW)
+        y = y[~np.isnan(y)]
+        x = [*range(0, len(y))]
 
         fig = tpl.figure()
         fig.plot(x, y, ylim=[-98, -90])
 
-        return Panel(fig.get_string(), title="4G Signal Power")
+        return Panel(fig.get_string(), title=title)
 
 
-def update_footer(layout, processed_data):
+def update_footer(layout, sample: SignalSample, status: str = None, stats: str = None):
     grid = Table.grid(expand=True)
     grid.add_column(justify="center", ratio=1)
+    grid.add_column(justify="center", ratio=1)
     grid.add_column(justify="right")
-    grid.add_row(
-        f"🌡  4G:{processed_data['MISC']['TEMPERATURE_4G']['str_value']}C  -  5G:{processed_data['MISC']['TEMPERATURE_5G']['str_value']}C",
-        f"{processed_data['MISC']['FIRMWARE_VERSION']['str_value']}",
+
+    if sample is None:
+        grid.add_row("", status or "", "")
+    else:
+        grid.add_row(
+            f"🌡  4G:{sample.temperature_4g}C  -  5G:{sample.temperature_5g}C",
+            status or "",
+            f"{sample.firmware_version}",
+        )
+
+    layout["footer"].size = 3 if stats is None else 4
+    layout["footer"].update(
+        Panel(grid if stats is None else Group(grid, Align.center(f"[dim]{stats}[/]")))
     )
-    layout["footer"].update(Panel(grid))
 
 
-def show_live(config: dict, viz: LIVE_VISUALIZATIONS):
+def data_status(latest: PollResult, stale_after: float) -> str:
+    """Describe missing or stale data, if any
+
+    Args:
+        latest (PollResult): Latest result of the background poller
+        stale_after (float): Age in seconds after which data is stale
+
+    Returns:
+        str: Status markup, or None if data is fresh
+    """
+    error = f" ({type(latest.error).__name__})" if latest.error else ""
+
+    if latest.timestamp is None:
+        return f"[b yellow]⌛ Waiting for router data{error}[/]"
+
+    age = time() - latest.timestamp
+
+    if age > stale_after:
+        return f"[b red]⚠ Stale data ({age:.0f}s old){error}[/]"
+
+    return None
+
+
+def schedule_status(schedule: PollScheduler) -> str:
+    """Describe polls slowed down or paused by the scheduler, if any
+
+    Args:
+        schedule (PollScheduler): Schedule of the background poller
+
+    Returns:
+        str: Status markup, or None if polling at the target interval
+    """
+    if schedule.circuit_open:
+        return f"[b red]⛔ Router not responding, next try in {schedule.delay():.0f}s[/]"
+
+    if schedule.interval > schedule.target_interval:
+        return f"[b yellow]🐢 Router busy, polling {schedule}[/]"
+
+    return None
+
+
+def show_live(
+    config: dict,
+    viz: LIVE_VISUALIZATIONS,
+    sqlite_path: str = None,
+    poll_interval: float = 5.0,
+    timeout: float = 10.0,
+    refresh: float = 1.0,
+    stale_after: float = None,
+    max_poll_interval: float = 60.0,
+    show_stats: bool = False,
+    metrics_file: str = None,
+    max_updates: int = 0,
+):
+    """Show the live dashboard
+
+    The router is polled in a background thread; the dashboard draws the latest
+    polled data at its own pace, so a slow router never freezes it. Polls back
+    off when the router gets slow or fails (see `PollScheduler`).
+
+    Args:
+        config (dict): Router IP and password
+        viz (LIVE_VISUALIZATIONS): Visualization shown in the dashboard body
+        sqlite_path (str, optional): SQLite database to store samples in. Defaults to None.
+        poll_interval (float, optional): Target seconds between router polls. Defaults to 5.
+        timeout (float, optional): Timeout in seconds of each HTTP request. Defaults to 10.
+        refresh (float, optional): Seconds between dashboard updates. Defaults to 1.
+        stale_after (float, optional): Age in seconds after which data is flagged as stale. Defaults to 3 poll intervals.
+        max_poll_interval (float, optional): Maximum seconds between router polls when backing off. Defaults to 60.
+        show_stats (bool, optional): Whether to show stage latencies in the footer (see `stats_footer`). Defaults to False.
+        metrics_file (str, optional): JSON Lines file to append timings and counters to. Defaults to None.
+        max_updates (int, optional): Number of updates with new data after which to exit, 0 to run until interrupted. Defaults to 0.
+    """
+    stale_after = stale_after or 3 * poll_interval
+
+    sqlite_store = SQLiteStore(sqlite_path) if sqlite_path else None
+    ring_buffer = ColumnarRingBuffer(
+        [metric for metric, _ in CHART_METRICS.values()], path=RING_BUFFER_FILE
+    )
+    detector = ChangeDetector()
+
+    metrics_sink = JSONLinesSink(metrics_file) if metrics_file else None
+    if metrics_sink is not None:
+        metrics.add_sink(metrics_sink)
+
+    session = RouterSession(config["router_ip"], config["password"], timeout=timeout)
+    tiered_poller = TieredPoller(session.get_signal_data)
+    schedule = PollScheduler(
+        interval=poll_interval,
+        max_interval=max_poll_interval,
+        slow_latency=timeout / 4,
+    )
+    poller = BackgroundPoller(
+        lambda: poll_live_data(session, tiered_poller, viz), schedule=schedule
+    ).start()
+
     layout = make_layout()
     layout["header"].update(Header())
-    processed_data, raw_data = update_live_table(layout, config, viz)
-    update_footer(layout, processed_data)
+    update_footer(
+        layout,
+        None,
+        data_status(poller.latest, stale_after),
+        stats_footer(metrics.summary()) if show_stats else None,
+    )
 
+    sample = None
+    sequence = 0
+    updates = 0
+    last_event = None
     last_persisted = None
 
+    # Samples are persisted when something changed, and at least this often
     PERSIST_INTERVAL = 60
 
-    # Layout automatically refreshed, so just need to update underlying data??
-
-    with Live(layout, refresh_per_second=0.5, screen=True):
-        while True:
-            processed_data, raw_data = update_live_table(layout, config, viz)
-            update_footer(layout, processed_data)
-
-            if (
-                not last_persisted
-                or (datetime.now() - last_persisted).seconds > PERSIST_INTERVAL
-            ):
-                last_persisted = datetime.now()
-                persist_data(raw_data)
-
-            sleep(5)
-            # progress.update(bar_4g, completed=abs(int(data['lte_rsrp'])))
-            # progress.update(bar_5g, completed=abs(int(data['Z5g_rsrp'])))
+    try:
+        with Live(layout, refresh_per_second=1 / refresh, screen=True):
+            while not max_updates or updates < max_updates:
+                latest = poller.latest
+
+                if latest.sequence != sequence:
+                    sequence = latest.sequence
+                    updates += 1
+                    raw_data, sms_data = latest.value
+                    sample = process_sample(raw_data)
+
+                    events = render_live_data(
+                        layout, viz, sample, raw_data, sms_data, ring_buffer, detector
+                    )
+
+                    if events:
+                        last_event = f"{datetime.now():%H:%M:%S} {events[-1]}"
+
+                    if (
+                        events
+                        or not last_persisted
+                        or (datetime.now() - last_persisted).seconds > PERSIST_INTERVAL
+                    ):
+                        last_persisted = datetime.now()
+                        persist_data(
+                            raw_data,
+                            router=config["router_ip"],
+                            sqlite_store=sqlite_store,
+                        )
+                        ring_buffer.flush()
+
+                update_footer(
+                    layout,
+                    sample,
+                    schedule_status(schedule)
+                    or data_status(latest, stale_after)
+                    or last_event,
+                    stats_footer(metrics.summary()) if show_stats else None,
+                )
+
+                # Wake up early when a poll completes, to draw new data at once
+                poller.wait(refresh)
+    finally:
+        poller.stop(timeout=0)
+        ring_buffer.flush()
+        session.close()
+
+        if sqlite_store is not None:
+            sqlite_store.close()
+
+        if metrics_sink is not None:
+            metrics.remove_sink(metrics_sink)
+            metrics_sink.close()
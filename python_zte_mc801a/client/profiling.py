@@ -0,0 +1,85 @@
+"""Profiling of CLI commands (`--profile`), without changing their code.
+
+Two output formats are supported, chosen by the file extension:
+
+- `.json`: spans of the instrumented stages (login, fetch, decode, process,
+  render, see `lib.instrumentation`) in the Chrome trace event format, viewable
+  as a flame chart in Perfetto or speedscope.
+- anything else: cProfile statistics of every function, readable with
+  `python -m pstats` or converted to a flame graph (e.g. with flameprof).
+"""
+
+import cProfile
+import pstats
+import threading
+from pathlib import Path
+import logging
+
+from python_zte_mc801a.lib.instrumentation import metrics, TraceEventSink
+
+log = logging.getLogger("rich")
+
+
+class CommandProfiler:
+    """Profiles the current process from `start` to `stop`.
+
+    With cProfile, threads started while profiling (e.g. background pollers)
+    are profiled too, and their statistics are merged into the output file.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): Output file; a `.json` extension selects the trace format
+        """
+        self.path = path
+        self.trace = Path(path).suffix.lower() == ".json"
+
+        self._sink = TraceEventSink() if self.trace else None
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    def start(self) -> "CommandProfiler":
+        if self.trace:
+            metrics.add_sink(self._sink)
+        else:
+            threading.setprofile(self._profile_thread)
+            self._enable(cProfile.Profile())
+
+        return self
+
+    def stop(self):
+        """Stop profiling and write the output file"""
+        if self.trace:
+            metrics.remove_sink(self._sink)
+            self._sink.save(self.path)
+        else:
+            threading.setprofile(None)
+
+            with self._lock:
+                profiles = list(self._profiles)
+
+            for profile in profiles:
+                profile.disable()
+
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(self.path)
+
+        log.info(f"Profile written to {self.path}")
+
+    def _enable(self, profile: cProfile.Profile):
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Only one profiler can be active per thread on some Python versions
+            log.debug(f"Could not profile {threading.current_thread().name}: {e}")
+            return
+
+        with self._lock:
+            self._profiles.append(profile)
+
+    def _profile_thread(self, *args):
+        # Called once at the start of each new thread, then replaced by cProfile
+        self._enable(cProfile.Profile())
@@ -0,0 +1,118 @@
+from pathlib import Path
+from time import time
+import logging
+
+import numpy as np
+
+log = logging.getLogger("rich")
+
+HEADER_VERSION = 1
+HEADER_SIZE = 4  # version, capacity, number of metrics, total number of appends
+HEADER_BYTES = HEADER_SIZE * np.dtype(np.int64).itemsize
+
+
+class ColumnarRingBuffer:
+    """Fixed-size, column-per-metric buffer of the latest samples.
+
+    Values are stored as floats in a preallocated array (one row per metric plus a
+    timestamp row), so memory stays bounded and reading the latest `n` values costs
+    O(n). When a path is provided, the buffer is backed by a memory-mapped file and
+    survives restarts.
+    """
+
+    def __init__(self, metrics: list, capacity: int = 720, path: str = None) -> None:
+        """
+        Args:
+            metrics (list): Raw data fields to record (e.g. ["lte_rsrp", "Z5g_rsrp"])
+            capacity (int, optional): Number of samples kept. Defaults to 720.
+            path (str, optional): File backing the buffer. Defaults to None (in memory only).
+        """
+        self.metrics = list(metrics)
+        self.capacity = capacity
+        self.path = path
+
+        self._rows = {metric: index + 1 for index, metric in enumerate(self.metrics)}
+        shape = (len(self.metrics) + 1, capacity)
+
+        if path is None:
+            self._header = np.zeros(HEADER_SIZE, dtype=np.int64)
+            self._data = np.full(shape, np.nan)
+        else:
+            self._open_file(shape)
+
+        self._header[:3] = (HEADER_VERSION, capacity, len(self.metrics))
+
+    def _open_file(self, shape: tuple):
+        path = Path(self.path)
+        size = HEADER_BYTES + shape[0] * shape[1] * np.dtype(np.float64).itemsize
+
+        reuse = path.exists() and path.stat().st_size == size
+
+        if reuse:
+            header = np.memmap(path, dtype=np.int64, mode="r", shape=(HEADER_SIZE,))
+            reuse = tuple(header[:3]) == (HEADER_VERSION, shape[1], shape[0] - 1)
+            del header
+
+        if not reuse and path.exists():
+            log.warning(f"Ring buffer file {path} does not match, recreating it")
+
+        mode = "r+" if reuse else "w+"
+
+        self._header = np.memmap(path, dtype=np.int64, mode=mode, shape=(HEADER_SIZE,))
+        self._data = np.memmap(
+            path, dtype=np.float64, mode="r+", offset=HEADER_BYTES, shape=shape
+        )
+
+        if not reuse:
+            self._data[:] = np.nan
+
+    def __len__(self) -> int:
+        return int(min(self._header[3], self.capacity))
+
+    def append(self, sample: dict, timestamp: float = None):
+        """Record the metrics of a raw data sample
+
+        Missing or non-numeric values are recorded as NaN.
+
+        Args:
+            sample (dict): Raw data sample
+            timestamp (float, optional): Sample time (seconds since epoch). Defaults to now.
+        """
+        index = int(self._header[3] % self.capacity)
+
+        self._data[0, index] = time() if timestamp is None else timestamp
+
+        for metric, row in self._rows.items():
+            try:
+                self._data[row, index] = float(sample.get(metric))
+            except (TypeError, ValueError):
+                self._data[row, index] = np.nan
+
+        self._header[3] += 1
+
+    def window(self, metric: str, n: int) -> np.ndarray:
+        """Return the latest values of a metric, oldest first
+
+        Args:
+            metric (str): Metric name, or "time" for sample timestamps
+            n (int): Maximum number of values
+
+        Returns:
+            np.ndarray: Up to `n` values
+        """
+        row = 0 if metric == "time" else self._rows[metric]
+        n = min(n, len(self))
+
+        end = int(self._header[3] % self.capacity)
+        start = end - n
+
+        if start >= 0:
+            return np.array(self._data[row, start:end])
+
+        return np.concatenate((self._data[row, start:], self._data[row, :end]))
+
+    def flush(self):
+        """Write changes to the backing file, if any"""
+        if self.path is not None:
+            self._header.flush()
+            self._data.flush()
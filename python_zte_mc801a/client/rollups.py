@@ -0,0 +1,165 @@
+import math
+import json
+
+# Raw data fields aggregated into rollups
+ROLLUP_METRICS = [
+    "lte_rsrp",
+    "lte_rsrq",
+    "lte_snr",
+    "Z5g_rsrp",
+    "Z5g_SINR",
+    "pm_sensor_mdm",
+    "pm_modem_5g",
+]
+
+# Rollup resolutions, in seconds (buckets are aligned on UTC)
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# Width of the histogram bins used to estimate percentiles
+HISTOGRAM_BIN_WIDTH = 0.5
+
+
+class RollupBucket:
+    """Aggregate of a metric over one time bucket.
+
+    Count, sum, min and max are exact. Percentiles are estimated from a sparse
+    histogram with `HISTOGRAM_BIN_WIDTH` bins, which keeps the bucket small and
+    mergeable whatever the number of samples.
+    """
+
+    __slots__ = ("start", "count", "total", "minimum", "maximum", "histogram")
+
+    def __init__(
+        self,
+        start: int,
+        count: int = 0,
+        total: float = 0.0,
+        minimum: float = None,
+        maximum: float = None,
+        histogram: dict = None,
+    ) -> None:
+        self.start = start
+        self.count = count
+        self.total = total
+        self.minimum = minimum
+        self.maximum = maximum
+        self.histogram = histogram if histogram is not None else {}
+
+    def update(self, value: float):
+        """Add a value to the bucket
+
+        Args:
+            value (float): Metric value
+        """
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+        histogram_bin = math.floor(value / HISTOGRAM_BIN_WIDTH)
+        self.histogram[histogram_bin] = self.histogram.get(histogram_bin, 0) + 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, q: float) -> float:
+        """Estimate a percentile from the histogram
+
+        Args:
+            q (float): Percentile, between 0 and 100
+
+        Returns:
+            float: Estimated value (lower edge of the matching histogram bin)
+        """
+        if not self.count:
+            return None
+
+        rank = q / 100 * self.count
+        seen = 0
+
+        for histogram_bin in sorted(self.histogram):
+            seen += self.histogram[histogram_bin]
+            if seen >= rank:
+                value = histogram_bin * HISTOGRAM_BIN_WIDTH
+                return min(max(value, self.minimum), self.maximum)
+
+        return self.maximum
+
+    def histogram_json(self) -> str:
+        return json.dumps(self.histogram, separators=(",", ":"))
+
+    @staticmethod
+    def parse_histogram(histogram_json: str) -> dict:
+        return {int(k): v for k, v in json.loads(histogram_json).items()}
+
+
+class RollupAggregator:
+    """Incrementally maintains per-minute, per-hour and per-day rollups.
+
+    Only the latest bucket of each (router, resolution, metric) is kept in memory.
+    When a sample falls into another bucket, its current state is obtained from
+    `loader` (e.g. a database), so history is never rescanned.
+    """
+
+    def __init__(self, loader=None, metrics: list = ROLLUP_METRICS) -> None:
+        """
+        Args:
+            loader (callable, optional): Called with `(router, resolution, metric, start)`, returns the stored `RollupBucket` or None. Defaults to None.
+            metrics (list, optional): Raw data fields to aggregate. Defaults to ROLLUP_METRICS.
+        """
+        self.loader = loader
+        self.metrics = metrics
+        self._buckets = {}
+
+    def add(self, router: str, timestamp: float, sample: dict) -> list:
+        """Add a raw data sample to the rollups
+
+        Args:
+            router (str): Router the sample was obtained from
+            timestamp (float): Sample time (seconds since epoch)
+            sample (dict): Raw data sample
+
+        Returns:
+            list: Updated `(router, resolution, metric, RollupBucket)` tuples
+        """
+        updated = []
+
+        for metric in self.metrics:
+            try:
+                value = float(sample.get(metric))
+            except (TypeError, ValueError):
+                continue
+
+            if math.isnan(value):
+                continue
+
+            for resolution, seconds in RESOLUTIONS.items():
+                bucket = self._bucket(
+                    router, resolution, metric, int(timestamp // seconds * seconds)
+                )
+                bucket.update(value)
+                updated.append((router, resolution, metric, bucket))
+
+        return updated
+
+    def clear(self):
+        """Forget the in-memory buckets; they are reloaded from `loader` on next use"""
+        self._buckets = {}
+
+    def _bucket(self, router: str, resolution: str, metric: str, start: int):
+        key = (router, resolution, metric)
+        bucket = self._buckets.get(key)
+
+        if bucket is None or bucket.start != start:
+            bucket = None
+
+            if self.loader is not None:
+                bucket = self.loader(router, resolution, metric, start)
+
+            if bucket is None:
+                bucket = RollupBucket(start)
+
+            self._buckets[key] = bucket
+
+        return bucket
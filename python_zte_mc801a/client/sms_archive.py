@@ -0,0 +1,207 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+from python_zte_mc801a.lib.data_processing import decode_sms_content
+from python_zte_mc801a.lib.router_requests import RouterSession, get_sms_page
+
+log = logging.getLogger("rich")
+
+MESSAGE_FIELDS = ["number", "date", "tag", "content"]
+
+
+class SMSArchive:
+    """Local SQLite archive of SMS messages, per router.
+
+    Besides the messages, the archive records for each router a high-water mark:
+    the highest message id of the last complete sync. Later syncs stop paging as
+    soon as they reach it.
+    """
+
+    def __init__(self, path: str = "sms_archive.sqlite3") -> None:
+        """
+        Args:
+            path (str, optional): Path to the database file. Defaults to "sms_archive.sqlite3".
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+
+        with self.connection:
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    router TEXT NOT NULL,
+                    id INTEGER NOT NULL,
+                    number TEXT,
+                    date TEXT,
+                    tag TEXT,
+                    content TEXT,
+                    PRIMARY KEY (router, id)
+                )
+                """
+            )
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    router TEXT PRIMARY KEY,
+                    high_water_mark INTEGER NOT NULL
+                )
+                """
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def high_water_mark(self, router: str) -> int:
+        """Return the highest message id of the last complete sync
+
+        Args:
+            router (str): Router IP (or fleet name)
+
+        Returns:
+            int: Message id, or None if the router was never synced
+        """
+        row = self.connection.execute(
+            "SELECT high_water_mark FROM sync_state WHERE router = ?", (router,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_high_water_mark(self, router: str, message_id: int):
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state (router, high_water_mark) VALUES (?, ?)",
+                (router, message_id),
+            )
+
+    def add(self, router: str, messages: list) -> int:
+        """Archive decoded messages, ignoring those already archived
+
+        Args:
+            router (str): Router IP (or fleet name)
+            messages (list): Messages with decoded content
+
+        Returns:
+            int: Number of newly archived messages
+        """
+        with self.connection:
+            cursor = self.connection.executemany(
+                "INSERT OR IGNORE INTO messages (router, id, number, date, tag, content) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (router, int(msg["id"]), *[msg.get(f) for f in MESSAGE_FIELDS])
+                    for msg in messages
+                ],
+            )
+        return cursor.rowcount
+
+    def messages(self, router: str = None, since_id: int = None) -> list:
+        """Return archived messages, newest first
+
+        Args:
+            router (str, optional): Router IP (or fleet name). Defaults to all routers.
+            since_id (int, optional): Only return messages with a higher id. Defaults to None.
+
+        Returns:
+            list: Message dictionaries
+        """
+        conditions, parameters = [], []
+
+        if router is not None:
+            conditions.append("router = ?")
+            parameters.append(router)
+        if since_id is not None:
+            conditions.append("id > ?")
+            parameters.append(since_id)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        rows = self.connection.execute(
+            f"SELECT router, id, {', '.join(MESSAGE_FIELDS)} FROM messages {where} "
+            "ORDER BY router, id DESC",
+            parameters,
+        )
+
+        return [
+            dict(zip(["router", "id", *MESSAGE_FIELDS], row)) for row in rows.fetchall()
+        ]
+
+
+def sync_sms(
+    session: RouterSession,
+    archive: SMSArchive,
+    router: str = None,
+    page_size: int = 100,
+    concurrency: int = 4,
+) -> dict:
+    """Copy the messages of a router that are not yet archived
+
+    Pages of `sms_data_total` (newest first) are fetched `concurrency` at a time
+    (the first page alone when the router was synced before), until a page is
+    incomplete or reaches the archive's high-water mark. The high-water mark is
+    only advanced once the sync completes, so an interrupted sync is resumed by
+    the next one.
+
+    Args:
+        session (RouterSession): Router session, with at least `concurrency` pooled connections
+        archive (SMSArchive): Local archive
+        router (str, optional): Name of the router in the archive. Defaults to its IP.
+        page_size (int, optional): Number of messages per page. Defaults to 100.
+        concurrency (int, optional): Number of pages fetched at once. Defaults to 4.
+
+    Returns:
+        dict: Number of pages fetched, messages received and newly archived messages, and new high-water mark
+    """
+    router = router or session.router_ip
+    high_water_mark = archive.high_water_mark(router)
+    newest = high_water_mark
+    stats = {"pages": 0, "received": 0, "archived": 0}
+
+    # Log in once before fetching pages concurrently
+    session.get_auth_cookies()
+
+    def fetch_page(page: int) -> list:
+        return session.call(get_sms_page, page=page, data_per_page=page_size)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        first_page = 0
+        done = False
+
+        # Incremental syncs usually only need the first page: fetch it alone
+        wave = 1 if high_water_mark is not None else concurrency
+
+        while not done:
+            pages = range(first_page, first_page + wave)
+            stats["pages"] += wave
+
+            for messages in executor.map(fetch_page, pages):
+                if high_water_mark is not None:
+                    messages = [
+                        msg for msg in messages if int(msg["id"]) > high_water_mark
+                    ]
+
+                stats["received"] += len(messages)
+                stats["archived"] += archive.add(
+                    router,
+                    [
+                        {**msg, "content": decode_sms_content(msg["content"])}
+                        for msg in messages
+                    ],
+                )
+
+                if messages:
+                    newest = max(newest or 0, *(int(msg["id"]) for msg in messages))
+
+                # Incomplete pages are the last ones; filtered pages reached the mark
+                if len(messages) < page_size:
+                    done = True
+                    break
+
+            first_page += wave
+            wave = concurrency
+
+    if newest is not None:
+        archive.set_high_water_mark(router, newest)
+
+    log.debug(f"Synced SMS messages of {router}: {stats}")
+
+    return {**stats, "high_water_mark": newest}
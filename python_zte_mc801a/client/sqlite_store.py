@@ -0,0 +1,327 @@
+import json
+import sqlite3
+from datetime import datetime
+import logging
+
+from python_zte_mc801a.lib.data_processing import to_number, from_hex
+from python_zte_mc801a.client.rollups import (
+    RollupAggregator,
+    RollupBucket,
+    RESOLUTIONS,
+    ROLLUP_METRICS,
+)
+
+log = logging.getLogger("rich")
+
+
+def _str(value: str) -> str:
+    return str(value) if value is not None else None
+
+
+# Raw data fields stored in typed columns: name -> (SQL type, parser)
+SAMPLE_COLUMNS = {
+    "lte_rsrp": ("INTEGER", to_number),
+    "lte_rsrq": ("INTEGER", to_number),
+    "lte_rssi": ("INTEGER", to_number),
+    "lte_snr": ("REAL", to_number),
+    "lte_pci": ("INTEGER", from_hex),
+    "wan_active_channel": ("INTEGER", to_number),
+    "wan_active_band": ("TEXT", _str),
+    "Z5g_rsrp": ("INTEGER", to_number),
+    "Z5g_SINR": ("REAL", to_number),
+    "nr5g_pci": ("INTEGER", from_hex),
+    "nr5g_action_channel": ("INTEGER", to_number),
+    "nr5g_action_band": ("TEXT", _str),
+    "cell_id": ("INTEGER", from_hex),
+    "network_type": ("TEXT", _str),
+    "pm_sensor_mdm": ("REAL", to_number),
+    "pm_modem_5g": ("REAL", to_number),
+    "signalbar": ("INTEGER", to_number),
+}
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class SQLiteStore:
+    """Indexed SQLite store of raw signal data samples.
+
+    The main numeric fields are stored in typed columns (PCIs and cell ID decoded
+    from hex) and indexed by router and time, so time-range queries do not need to
+    parse the whole history. The full raw sample is kept as JSON alongside.
+
+    Per-minute, per-hour and per-day rollups of the main metrics are updated in
+    the same transaction as each insert, for long-window queries.
+    """
+
+    def __init__(self, path: str = "history.sqlite3") -> None:
+        """
+        Args:
+            path (str, optional): Path to the database file. Defaults to "history.sqlite3".
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self._create_schema()
+        self.rollups = RollupAggregator(loader=self._load_rollup)
+
+    def _create_schema(self):
+        columns = ",\n".join(
+            f"{name} {sql_type}" for name, (sql_type, _) in SAMPLE_COLUMNS.items()
+        )
+
+        with self.connection:
+            self.connection.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS samples (
+                    id INTEGER PRIMARY KEY,
+                    router TEXT NOT NULL,
+                    ts REAL NOT NULL,
+                    {columns},
+                    raw TEXT NOT NULL
+                )
+                """
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS samples_router_ts ON samples (router, ts)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts)"
+            )
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rollups (
+                    router TEXT NOT NULL,
+                    resolution TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    start INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    total REAL NOT NULL,
+                    minimum REAL,
+                    maximum REAL,
+                    histogram TEXT NOT NULL,
+                    PRIMARY KEY (router, resolution, metric, start)
+                )
+                """
+            )
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+    def insert(self, router: str, sample: dict):
+        """Insert a single sample
+
+        Args:
+            router (str): Router the sample was obtained from
+            sample (dict): Raw data sample, with a `time` field set by `persist_data`
+        """
+        self.insert_many([(router, sample)])
+
+    def insert_many(self, records: list):
+        """Insert several samples, and update their rollups, in a single transaction
+
+        Args:
+            records (list): `(router, sample)` tuples
+        """
+        names = ["router", "ts", *SAMPLE_COLUMNS.keys(), "raw"]
+
+        rows = [_sample_row(router, sample) for router, sample in records]
+
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    f"INSERT INTO samples ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                    rows,
+                )
+
+                # Buckets are written as each sample updates them, so a bucket
+                # the batch leaves and comes back to is reloaded up to date
+                for (router, sample), row in zip(records, rows):
+                    self.connection.executemany(
+                        "INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                router,
+                                resolution,
+                                metric,
+                                bucket.start,
+                                bucket.count,
+                                bucket.total,
+                                bucket.minimum,
+                                bucket.maximum,
+                                bucket.histogram_json(),
+                            )
+                            for router, resolution, metric, bucket in self.rollups.add(
+                                router, row[1], sample
+                            )
+                        ],
+                    )
+        except Exception:
+            # The in-memory buckets counted samples that were rolled back
+            self.rollups.clear()
+            raise
+
+    def _load_rollup(
+        self, router: str, resolution: str, metric: str, start: int
+    ) -> RollupBucket:
+        row = self.connection.execute(
+            "SELECT count, total, minimum, maximum, histogram FROM rollups "
+            "WHERE router = ? AND resolution = ? AND metric = ? AND start = ?",
+            (router, resolution, metric, start),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return RollupBucket(
+            start, row[0], row[1], row[2], row[3], RollupBucket.parse_histogram(row[4])
+        )
+
+    def query_rollups(
+        self,
+        metric: str,
+        resolution: str,
+        router: str = None,
+        since: datetime = None,
+        until: datetime = None,
+    ) -> list:
+        """Query the rollups of a metric over a time range
+
+        Args:
+            metric (str): Metric name (see `ROLLUP_METRICS`)
+            resolution (str): "minute", "hour" or "day"
+            router (str, optional): Router to restrict the query to. Defaults to None (all routers).
+            since (datetime, optional): Start of the time range. Defaults to None.
+            until (datetime, optional): End of the time range. Defaults to None.
+
+        Raises:
+            ValueError: Unknown metric or resolution
+
+        Returns:
+            list: Dictionaries with `router`, `time`, `count`, `mean`, `min`, `max`, `p50` and `p95`, oldest first
+        """
+        if metric not in ROLLUP_METRICS:
+            raise ValueError(f"Unknown rollup metric {metric}")
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution {resolution}")
+
+        conditions = ["resolution = ?", "metric = ?"]
+        parameters = [resolution, metric]
+
+        if router is not None:
+            conditions.append("router = ?")
+            parameters.append(router)
+        if since is not None:
+            conditions.append("start >= ?")
+            parameters.append(
+                int(
+                    since.timestamp()
+                    // RESOLUTIONS[resolution]
+                    * RESOLUTIONS[resolution]
+                )
+            )
+        if until is not None:
+            conditions.append("start < ?")
+            parameters.append(until.timestamp())
+
+        cursor = self.connection.execute(
+            "SELECT router, start, count, total, minimum, maximum, histogram FROM rollups "
+            f"WHERE {' AND '.join(conditions)} ORDER BY start",
+            parameters,
+        )
+
+        results = []
+
+        for row in cursor:
+            bucket = RollupBucket(
+                row[1],
+                row[2],
+                row[3],
+                row[4],
+                row[5],
+                RollupBucket.parse_histogram(row[6]),
+            )
+            results.append(
+                {
+                    "router": row[0],
+                    "time": datetime.fromtimestamp(bucket.start).strftime(TIME_FORMAT),
+                    "count": bucket.count,
+                    "mean": round(bucket.mean, 2),
+                    "min": bucket.minimum,
+                    "max": bucket.maximum,
+                    "p50": bucket.percentile(50),
+                    "p95": bucket.percentile(95),
+                }
+            )
+
+        return results
+
+    def query(
+        self,
+        fields: list,
+        router: str = None,
+        since: datetime = None,
+        until: datetime = None,
+    ) -> list:
+        """Query typed columns over a time range
+
+        Args:
+            fields (list): Column names (see `SAMPLE_COLUMNS`)
+            router (str, optional): Router to restrict the query to. Defaults to None (all routers).
+            since (datetime, optional): Start of the time range. Defaults to None.
+            until (datetime, optional): End of the time range. Defaults to None.
+
+        Raises:
+            ValueError: Unknown field
+
+        Returns:
+            list: Dictionaries with `router`, `time` and the requested fields, oldest first
+        """
+        for field in fields:
+            if field not in SAMPLE_COLUMNS:
+                raise ValueError(f"Unknown field {field}")
+
+        conditions = []
+        parameters = []
+
+        if router is not None:
+            conditions.append("router = ?")
+            parameters.append(router)
+        if since is not None:
+            conditions.append("ts >= ?")
+            parameters.append(since.timestamp())
+        if until is not None:
+            conditions.append("ts < ?")
+            parameters.append(until.timestamp())
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        cursor = self.connection.execute(
+            f"SELECT router, ts, {', '.join(fields)} FROM samples {where} ORDER BY ts",
+            parameters,
+        )
+
+        return [
+            {
+                "router": row[0],
+                "time": datetime.fromtimestamp(row[1]).strftime(TIME_FORMAT),
+                **dict(zip(fields, row[2:])),
+            }
+            for row in cursor
+        ]
+
+
+def _sample_row(router: str, sample: dict) -> tuple:
+    if "time" in sample:
+        ts = datetime.strptime(sample["time"], TIME_FORMAT).timestamp()
+    else:
+        ts = datetime.now().timestamp()
+
+    values = []
+
+    for name, (_, parser) in SAMPLE_COLUMNS.items():
+        try:
+            values.append(parser(sample.get(name)))
+        except ValueError:
+            values.append(None)
+
+    return (router, ts, *values, json.dumps(sample, separators=(",", ":")))
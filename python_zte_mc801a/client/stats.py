@@ -0,0 +1,140 @@
+from io import StringIO
+from time import sleep
+import logging
+
+from rich.console import Console, Group
+from rich.table import Table
+
+from python_zte_mc801a.lib.data_processing import process_sample
+from python_zte_mc801a.lib.instrumentation import metrics
+from python_zte_mc801a.lib.router_requests import RouterSession
+
+log = logging.getLogger("rich")
+
+# Stages shown by `stats_table`, in hot-path order
+STAGES = {
+    "login": "Login (including retries)",
+    "login_attempt": "Login attempt",
+    "fetch_signal": "Signal data fetch",
+    "fetch_sms": "SMS fetch",
+    "decode_sms": "SMS decoding",
+    "process": "Data processing",
+    "render": "Dashboard rendering",
+}
+
+
+def login_counts(summary: dict) -> tuple:
+    """Count logins and login retries
+
+    Args:
+        summary (dict): Summary obtained using `Metrics.summary`
+
+    Returns:
+        tuple: Number of logins, retries and re-logins after a rejected session
+    """
+    logins = summary.get("login", {}).get("count", 0)
+    attempts = summary.get("login_attempt", {}).get("count", 0)
+    return logins, attempts - logins, summary["counters"].get("reauth", 0)
+
+
+def stats_table(summary: dict) -> Table:
+    """Build a table of stage latencies and login counts
+
+    Args:
+        summary (dict): Summary obtained using `Metrics.summary`
+
+    Returns:
+        Table: Count and p50/p95/max latencies (in milliseconds) per stage
+    """
+    table = Table(title="Latency per stage")
+
+    for column in ["Stage", "Count", "Errors", "p50 (ms)", "p95 (ms)", "Max (ms)"]:
+        table.add_column(column, justify="left" if column == "Stage" else "right")
+
+    for name, desc in STAGES.items():
+        stage = summary.get(name)
+        if stage is None:
+            continue
+
+        table.add_row(
+            desc,
+            str(stage["count"]),
+            str(summary["counters"].get(f"{name}_error", 0)),
+            *[f"{stage[key] * 1000:.1f}" for key in ["p50", "p95", "max"]],
+        )
+
+    logins, retries, reauths = login_counts(summary)
+    table.caption = f"{logins} logins, {retries} login retries, {reauths} re-logins"
+
+    return table
+
+
+def stats_footer(summary: dict) -> str:
+    """Summarize fetch and render latencies in one line, e.g. for the dashboard footer
+
+    Args:
+        summary (dict): Summary obtained using `Metrics.summary`
+
+    Returns:
+        str: p50/p95 latencies of the main stages and login counts
+    """
+    parts = []
+
+    for name, label in [
+        ("fetch_signal", "fetch"),
+        ("process", "process"),
+        ("render", "render"),
+    ]:
+        stage = summary.get(name)
+        if stage is not None:
+            parts.append(
+                f"{label} {stage['p50'] * 1000:.0f}/{stage['p95'] * 1000:.0f}ms"
+            )
+
+    logins, retries, _ = login_counts(summary)
+    parts.append(f"logins {logins} (+{retries} retries)")
+
+    return "p50/p95 " + " · ".join(parts)
+
+
+def collect_stats(
+    session: RouterSession, samples: int = 10, interval: float = 1.0, sms: bool = True
+):
+    """Run the dashboard hot path repeatedly, recording its timings in `metrics`
+
+    Each iteration fetches signal data (and SMS messages), processes it and
+    renders the dashboard tables off-screen.
+
+    Args:
+        session (RouterSession): Router session
+        samples (int, optional): Number of iterations. Defaults to 10.
+        interval (float, optional): Seconds between iterations. Defaults to 1.
+        sms (bool, optional): Whether to fetch and decode SMS messages. Defaults to True.
+    """
+    # Imported here: the dashboard module imports this one
+    from python_zte_mc801a.client.live import generate_sms_table, generate_table
+
+    console = Console(file=StringIO(), width=120)
+
+    for index in range(samples):
+        try:
+            sample = process_sample(session.get_signal_data())
+            sms_data = session.get_latest_sms_messages() if sms else []
+
+            with metrics.time("render"):
+                console.print(
+                    Group(
+                        generate_table(sample, "CELL AND NETWORK"),
+                        generate_table(sample, "4G", show_carriers=True),
+                        generate_table(sample, "5G"),
+                        generate_sms_table(sms_data),
+                    )
+                )
+        except Exception as e:
+            log.warning(f"Iteration {index + 1} failed: {e!r}")
+
+        console.file.truncate(0)
+        console.file.seek(0)
+
+        if index < samples - 1:
+            sleep(interval)
@@ -0,0 +1,404 @@
+"""Asyncio counterparts of `router_requests`, built on `aiohttp`.
+
+Install with the `async` extra (`pip install python-zte-mc801a[async]`).
+"""
+
+import asyncio
+import functools
+import logging
+import random
+
+from python_zte_mc801a.lib.data_processing import (
+    get_ad_value,
+    get_version_hash,
+    hash_password,
+    decode_sms_messages,
+)
+from python_zte_mc801a.lib.constants import ALL_DATA_FIELDS, VERSION_FIELDS
+from python_zte_mc801a.lib.router_requests import (
+    AuthenticationError,
+    get_write_headers,
+    get_cmd_url,
+    sms_page_url,
+    parse_read_response,
+    check_login_response,
+    set_5g_band_request_data,
+)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# aiohttp counterpart of `router_requests.LOGIN_RETRY_ERRORS`
+LOGIN_RETRY_ERRORS = (OSError, asyncio.TimeoutError, ValueError, KeyError) + (
+    (aiohttp.ClientError,) if aiohttp is not None else ()
+)
+
+log = logging.getLogger("rich")
+
+
+def async_retry(
+    tries: int = 3,
+    delay: float = 2,
+    backoff: float = 1,
+    jitter: float = 0,
+    exceptions: tuple = (Exception,),
+):
+    """Retry a coroutine function without blocking the event loop
+
+    Args:
+        tries (int, optional): Maximum number of attempts. Defaults to 3.
+        delay (float, optional): Seconds to wait before the first retry. Defaults to 2.
+        backoff (float, optional): Factor applied to the delay after each retry. Defaults to 1.
+        jitter (float, optional): Maximum random seconds added to each delay. Defaults to 0.
+        exceptions (tuple, optional): Exception types to retry on. Defaults to all exceptions.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            wait = delay
+
+            for attempt in range(1, tries + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except exceptions as e:
+                    if attempt == tries:
+                        raise
+                    pause = wait + random.uniform(0, jitter)
+                    log.warning(f"{e}, retrying in {pause:.1f} seconds...")
+                    await asyncio.sleep(pause)
+                    wait *= backoff
+
+        return wrapper
+
+    return decorator
+
+
+def create_client_session(limit: int = 100, **kwargs) -> "aiohttp.ClientSession":
+    """Create an `aiohttp` session suitable for polling routers
+
+    Args:
+        limit (int, optional): Maximum number of simultaneous connections across all routers. Defaults to 100.
+        **kwargs: Additional keyword arguments passed to `aiohttp.ClientSession`
+
+    Raises:
+        ImportError: `aiohttp` is not installed
+
+    Returns:
+        aiohttp.ClientSession: Client session
+    """
+    if aiohttp is None:
+        raise ImportError(
+            "aiohttp is required for the async client: pip install python-zte-mc801a[async]"
+        )
+
+    # Cookies are passed explicitly with each request; the default jar would
+    # ignore cookies set by IP-addressed hosts anyway
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=limit),
+        cookie_jar=aiohttp.DummyCookieJar(),
+        **kwargs,
+    )
+
+
+@async_retry(
+    tries=3,
+    delay=1,
+    backoff=2,
+    jitter=1,
+    exceptions=LOGIN_RETRY_ERRORS,
+)
+async def get_auth_cookies(
+    session: "aiohttp.ClientSession", router_ip: str, user_password: str
+) -> dict:
+    """Retrieve authentication cookies from the router
+
+    Args:
+        session (aiohttp.ClientSession): HTTP session used to send the requests
+        router_ip (str): IP (or hostname) of the router
+        user_password (str): Admin user password
+
+    Raises:
+        Exception: Unable to retrieve authentication cookies
+
+    Returns:
+        dict: Authentication cookies
+    """
+    headers = {"referer": f"http://{router_ip}/"}
+
+    # Request the current LD
+    async with session.get(
+        get_cmd_url(router_ip, "LD"), cookies={"stok": ""}, headers=headers
+    ) as r_ld:
+        ld = (await r_ld.json(content_type=None))["LD"]
+
+    pwd = hash_password(user_password, ld)
+
+    # Login request
+    async with session.get(
+        f"http://{router_ip}/goform/goform_set_cmd_process?isTest=false&goformId=LOGIN&password={pwd}",
+        cookies={"stok": ""},
+        headers=headers,
+    ) as r_login:
+        check_login_response(await r_login.json(content_type=None))
+
+        return {name: morsel.value for name, morsel in r_login.cookies.items()}
+
+
+async def get_signal_data(
+    session: "aiohttp.ClientSession",
+    router_ip: str,
+    auth_cookies: dict,
+    fields: list = ALL_DATA_FIELDS,
+) -> dict:
+    """Retrieve router data related to signals
+
+    Args:
+        session (aiohttp.ClientSession): HTTP session used to send the request
+        router_ip (str): IP (or hostname) of the router
+        auth_cookies (dict): Authentication cookies obtained using `get_auth_cookies`
+        fields (list, optional): Data fields to retrieve. Defaults to ALL_DATA_FIELDS.
+
+    Raises:
+        AuthenticationError: The router rejected the authentication cookies
+
+    Returns:
+        dict: Signal data dictionary (unprocessed)
+    """
+    async with session.get(
+        get_cmd_url(router_ip, ",".join(fields), multi_data=True),
+        cookies=auth_cookies,
+        headers={"referer": f"http://{router_ip}/"},
+    ) as r_data:
+        return parse_read_response(r_data.status, await r_data.text())
+
+
+async def get_latest_sms_messages(
+    session: "aiohttp.ClientSession", router_ip: str, auth_cookies: dict, n: int = 3
+) -> list:
+    """Retrieve latest SMS messages
+
+    Args:
+        session (aiohttp.ClientSession): HTTP session used to send the request
+        router_ip (str): IP (or hostname) of the router
+        auth_cookies (dict): Authentication cookies obtained using `get_auth_cookies`
+        n (int, optional): Number of messages to retrieve. Defaults to 3.
+
+    Raises:
+        AuthenticationError: The router rejected the authentication cookies
+
+    Returns:
+        list: Dictionaries of messages
+    """
+    async with session.get(
+        sms_page_url(router_ip, data_per_page=n),
+        cookies=auth_cookies,
+        headers={"referer": f"http://{router_ip}/"},
+    ) as r_data:
+        json_data = parse_read_response(r_data.status, await r_data.text())
+
+    return decode_sms_messages(json_data["messages"], n)
+
+
+async def get_ad_token(
+    session: "aiohttp.ClientSession",
+    router_ip: str,
+    auth_cookies: dict,
+    version_hash: str = None,
+) -> str:
+    """Derive the AD value of the next write request
+
+    When `version_hash` is provided, only `RD` is requested from the router.
+
+    Args:
+        session (aiohttp.ClientSession): HTTP session used to send the request
+        router_ip (str): IP (or hostname) of the router
+        auth_cookies (dict): Authentication cookies obtained using `get_auth_cookies`
+        version_hash (str, optional): Cached version hash (see `get_version_hash`). Defaults to None (version fields requested along with RD).
+
+    Raises:
+        AuthenticationError: The router rejected the authentication cookies
+
+    Returns:
+        str: AD value
+    """
+    if version_hash is None:
+        raw_data = await get_signal_data(
+            session, router_ip, auth_cookies, fields=VERSION_FIELDS + ["RD"]
+        )
+        return get_ad_value(raw_data)
+
+    async with session.get(
+        get_cmd_url(router_ip, "RD"),
+        cookies=auth_cookies,
+        headers={"referer": f"http://{router_ip}/"},
+    ) as r_data:
+        raw_data = parse_read_response(r_data.status, await r_data.text())
+
+    return get_ad_value(raw_data, version_hash)
+
+
+async def set_5g_band(
+    session: "aiohttp.ClientSession",
+    router_ip: str,
+    auth_cookies: dict,
+    bands: str,
+    verbose: bool = False,
+    version_hash: str = None,
+) -> bool:
+    """Set the 5G band mask
+
+    Args:
+        session (aiohttp.ClientSession): HTTP session used to send the request
+        router_ip (str): IP (or hostname) of the router
+        auth_cookies (dict): Authentication cookies obtained using `get_auth_cookies`
+        bands (str): Comma-separated 5G bands (e.g. "1,3,78")
+        verbose (bool, optional): Whether messages should be logged. Defaults to False.
+        version_hash (str, optional): Cached version hash (see `get_ad_token`). Defaults to None.
+
+    Returns:
+        bool: Success
+    """
+    ad = await get_ad_token(session, router_ip, auth_cookies, version_hash)
+
+    async with session.post(
+        f"http://{router_ip}/goform/goform_set_cmd_process",
+        data=set_5g_band_request_data(bands, ad),
+        cookies=auth_cookies,
+        headers=get_write_headers(router_ip),
+    ) as r:
+        content = await r.text()
+
+    try:
+        json_data = parse_read_response(r.status, content)
+    except AuthenticationError:
+        json_data = {}
+
+    if r.status == 200 and json_data.get("result") == "success":
+        if verbose:
+            log.info(f"Successfully set 5G bands to {bands}")
+        return True
+    else:
+        if verbose:
+            log.error(f"Error setting 5G band to {bands}: {content}")
+        return False
+
+
+class AsyncRouterSession:
+    """Authenticated session to a single router for use within an event loop.
+
+    Mirrors `RouterSession`: logs in lazily, reuses the `stok` cookie and logs in
+    again when the router rejects it. Many `AsyncRouterSession` objects can share
+    a single `aiohttp.ClientSession`.
+
+    Example:
+        async with create_client_session() as http:
+            sessions = [AsyncRouterSession(http, ip, password) for ip in ips]
+            results = await asyncio.gather(*[s.get_signal_data() for s in sessions])
+    """
+
+    def __init__(
+        self, session: "aiohttp.ClientSession", router_ip: str, user_password: str
+    ) -> None:
+        """
+        Args:
+            session (aiohttp.ClientSession): HTTP session used to send the requests
+            router_ip (str): IP (or hostname) of the router
+            user_password (str): Admin user password
+        """
+        self.http = session
+        self.router_ip = router_ip
+        self.user_password = user_password
+        self.auth_cookies = None
+        self.login_count = 0
+        self.version_hash = None
+        self._login_lock = asyncio.Lock()
+
+    async def login(self, rejected_cookies: dict = None) -> dict:
+        """Log in to the router, replacing any existing authentication cookies
+
+        Concurrent callers share a single login: if the cookies were already
+        replaced since `rejected_cookies` were handed out, no new login is made.
+
+        Args:
+            rejected_cookies (dict, optional): Cookies the router just rejected. Defaults to None.
+
+        Returns:
+            dict: Authentication cookies
+        """
+        async with self._login_lock:
+            if self.auth_cookies is None or self.auth_cookies is rejected_cookies:
+                self.auth_cookies = await get_auth_cookies(
+                    self.http, self.router_ip, self.user_password
+                )
+                self.login_count += 1
+                self.version_hash = None
+            return self.auth_cookies
+
+    async def get_auth_cookies(self) -> dict:
+        """Return the current authentication cookies, logging in if required
+
+        Returns:
+            dict: Authentication cookies
+        """
+        if self.auth_cookies is None:
+            return await self.login()
+        return self.auth_cookies
+
+    async def call(self, func, **kwargs):
+        """Await a request coroutine function with this session's router and cookies
+
+        Args:
+            func (callable): Coroutine function accepting `session`, `router_ip` and `auth_cookies` (e.g. `get_signal_data`)
+            **kwargs: Additional keyword arguments passed to `func`
+
+        Returns:
+            Any: Return value of `func`
+        """
+        auth_cookies = await self.get_auth_cookies()
+
+        try:
+            return await func(
+                session=self.http,
+                router_ip=self.router_ip,
+                auth_cookies=auth_cookies,
+                **kwargs,
+            )
+        except AuthenticationError:
+            log.debug(f"Session for {self.router_ip} rejected, logging in again")
+            return await func(
+                session=self.http,
+                router_ip=self.router_ip,
+                auth_cookies=await self.login(rejected_cookies=auth_cookies),
+                **kwargs,
+            )
+
+    async def get_signal_data(self) -> dict:
+        """Retrieve router data related to signals (see `get_signal_data`)"""
+        return await self.call(get_signal_data)
+
+    async def get_latest_sms_messages(self, n: int = 3) -> list:
+        """Retrieve latest SMS messages (see `get_latest_sms_messages`)"""
+        return await self.call(get_latest_sms_messages, n=n)
+
+    async def get_version_hash(self) -> str:
+        """Return the version hash of the AD value, retrieving it on first use
+
+        Returns:
+            str: Version hash (see `get_version_hash`)
+        """
+        if self.version_hash is None:
+            raw_data = await self.call(get_signal_data, fields=VERSION_FIELDS)
+            self.version_hash = get_version_hash(raw_data)
+        return self.version_hash
+
+    async def set_5g_band(self, bands: str, verbose: bool = False) -> bool:
+        """Set the 5G band mask (see `set_5g_band`)"""
+        return await self.call(
+            set_5g_band,
+            bands=bands,
+            verbose=verbose,
+            version_hash=await self.get_version_hash(),
+        )
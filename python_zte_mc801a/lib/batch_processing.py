@@ -0,0 +1,176 @@
+import numpy as np
+
+# Raw data fields converted to float columns (missing values are NaN)
+NUMERIC_FIELDS = [
+    "lte_rsrp",
+    "lte_rsrq",
+    "lte_rssi",
+    "lte_snr",
+    "wan_active_channel",
+    "lte_ca_pcell_bandwidth",
+    "Z5g_rsrp",
+    "Z5g_SINR",
+    "nr5g_action_channel",
+    "pm_sensor_mdm",
+    "pm_modem_5g",
+    "signalbar",
+]
+
+# Raw data fields decoded from hex to int64 columns (missing values are -1)
+HEX_FIELDS = ["lte_pci", "nr5g_pci", "cell_id"]
+
+# Raw data fields kept as string columns
+STRING_FIELDS = [
+    "network_type",
+    "wan_active_band",
+    "lte_ca_pcell_band",
+    "nr5g_action_band",
+    "wan_ipaddr",
+]
+
+MISSING_INT = -1
+
+
+def to_float_column(values: list) -> np.ndarray:
+    """Convert raw numeric strings to a float column
+
+    Args:
+        values (list): Raw values (empty strings and None for missing values)
+
+    Returns:
+        np.ndarray: float64 column, NaN for missing or invalid values
+    """
+    values = ["nan" if value is None or value == "" else value for value in values]
+
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        # Fall back to element-wise parsing when some values are not numeric
+        return np.array([_parse_float(value) for value in values], dtype=np.float64)
+
+
+def hex_to_int_column(values: list) -> np.ndarray:
+    """Decode raw hexadecimal strings to an integer column
+
+    Args:
+        values (list): Raw hex values (empty strings and None for missing values)
+
+    Returns:
+        np.ndarray: int64 column, `MISSING_INT` for missing or invalid values
+    """
+    try:
+        return np.array(
+            [int(value, 16) if value else MISSING_INT for value in values],
+            dtype=np.int64,
+        )
+    except ValueError:
+        return np.array([_parse_hex(value) for value in values], dtype=np.int64)
+
+
+def parse_ca_columns(ca_infos: list) -> dict:
+    """Parse `lte_multi_ca_scell_info` values into per-carrier columns
+
+    Carriers of all samples are flattened; `ca_sample_index` maps each carrier
+    to its sample and `ca_count` gives the number of carriers per sample.
+
+    Args:
+        ca_infos (list): Raw `lte_multi_ca_scell_info` values
+
+    Returns:
+        dict: `ca_count`, `ca_sample_index`, `ca_pci`, `ca_band`, `ca_earfcn` and `ca_bandwidth` columns (numeric columns are float, NaN for missing values)
+    """
+    ca_infos = ["" if info is None else info for info in ca_infos]
+
+    counts = np.array(
+        [info.count(";") + 1 if info else 0 for info in ca_infos], dtype=np.int64
+    )
+    carriers = ";".join(info for info in ca_infos if info).split(";")
+
+    if counts.sum() == 0:
+        carriers = []
+
+    widths = {carrier.count(",") + 1 for carrier in carriers}
+
+    if len(widths) == 1 and min(widths) >= 6:
+        width = widths.pop()
+        fields = ",".join(carriers).split(",")
+    else:
+        # Carriers have different or too few fields: normalise them to 6
+        width = 6
+        fields = [
+            field
+            for carrier in carriers
+            for field in (carrier.split(",") + [""] * 6)[:6]
+        ]
+
+    return {
+        "ca_count": counts,
+        "ca_sample_index": np.repeat(np.arange(len(ca_infos)), counts),
+        "ca_pci": to_float_column(fields[1::width]),
+        "ca_band": np.array(fields[3::width], dtype=str),
+        "ca_earfcn": to_float_column(fields[4::width]),
+        "ca_bandwidth": to_float_column(fields[5::width]),
+    }
+
+
+def process_batch(raw_samples: list) -> dict:
+    """Process many raw data samples into NumPy columns
+
+    Columnar counterpart of `process_sample`, for whole histories (e.g. the
+    records of a `HistoryStore`).
+
+    Args:
+        raw_samples (list): Raw data dictionaries
+
+    Returns:
+        dict: Columns keyed by raw field name, plus `enbid`, `time` (when samples have a `time` field) and the carrier columns from `parse_ca_columns`
+    """
+    columns = {}
+
+    for field in NUMERIC_FIELDS:
+        columns[field] = to_float_column([sample.get(field) for sample in raw_samples])
+
+    for field in HEX_FIELDS:
+        columns[field] = hex_to_int_column(
+            [sample.get(field) for sample in raw_samples]
+        )
+
+    for field in STRING_FIELDS:
+        columns[field] = np.array(
+            [sample.get(field) or "" for sample in raw_samples], dtype=str
+        )
+
+    cell_id = columns["cell_id"]
+    columns["enbid"] = np.where(cell_id >= 0, cell_id // 256, MISSING_INT)
+
+    columns["ca_active"] = np.array(
+        [bool(sample.get("wan_lte_ca")) for sample in raw_samples], dtype=bool
+    )
+
+    if raw_samples and "time" in raw_samples[0]:
+        columns["time"] = np.array(
+            [sample.get("time") or "NaT" for sample in raw_samples],
+            dtype="datetime64[s]",
+        )
+
+    columns.update(
+        parse_ca_columns(
+            [sample.get("lte_multi_ca_scell_info") for sample in raw_samples]
+        )
+    )
+
+    return columns
+
+
+def _parse_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def _parse_hex(value: str) -> int:
+    try:
+        return int(value, 16) if value else MISSING_INT
+    except ValueError:
+        return MISSING_INT
@@ -0,0 +1,164 @@
+import math
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Optional
+
+
+class CHANGE_EVENTS(str, Enum):
+    FIRST_SAMPLE = "first-sample"
+    HANDOVER_4G = "handover-4g"
+    HANDOVER_5G = "handover-5g"
+    CELL_CHANGE = "cell-change"
+    BAND_CHANGE = "band-change"
+    CA_ACTIVATED = "ca-activated"
+    CA_DEACTIVATED = "ca-deactivated"
+    CA_CHANGE = "ca-change"
+    WAN_IP_CHANGE = "wan-ip-change"
+    LOCK_CHANGE = "lock-change"
+    THRESHOLD = "threshold"
+
+
+# Raw data fields whose changes are reported, with the matching event type
+TRACKED_FIELDS = {
+    "lte_pci": CHANGE_EVENTS.HANDOVER_4G,
+    "nr5g_pci": CHANGE_EVENTS.HANDOVER_5G,
+    "cell_id": CHANGE_EVENTS.CELL_CHANGE,
+    "wan_active_band": CHANGE_EVENTS.BAND_CHANGE,
+    "lte_ca_pcell_band": CHANGE_EVENTS.BAND_CHANGE,
+    "nr5g_action_band": CHANGE_EVENTS.BAND_CHANGE,
+    "lte_multi_ca_scell_info": CHANGE_EVENTS.CA_CHANGE,
+    "wan_ipaddr": CHANGE_EVENTS.WAN_IP_CHANGE,
+    "lte_pci_lock": CHANGE_EVENTS.LOCK_CHANGE,
+    "lte_earfcn_lock": CHANGE_EVENTS.LOCK_CHANGE,
+    "lte_freq_lock": CHANGE_EVENTS.LOCK_CHANGE,
+}
+
+# Minimum change of numeric fields reported as a `THRESHOLD` event
+DEFAULT_THRESHOLDS = {
+    "lte_rsrp": 3,
+    "lte_rsrq": 2,
+    "lte_snr": 3,
+    "Z5g_rsrp": 3,
+    "Z5g_SINR": 3,
+    "pm_sensor_mdm": 3,
+    "pm_modem_5g": 3,
+}
+
+
+@dataclass
+class ChangeEvent:
+    """Meaningful difference between two raw data samples"""
+
+    __slots__ = ("type", "field", "old", "new")
+
+    type: CHANGE_EVENTS
+    field: Optional[str]
+    old: Any
+    new: Any
+
+    @property
+    def delta(self) -> Optional[float]:
+        """Numeric change (`THRESHOLD` events only)"""
+        if self.type != CHANGE_EVENTS.THRESHOLD:
+            return None
+        return self.new - self.old
+
+    def __str__(self) -> str:
+        if self.type == CHANGE_EVENTS.FIRST_SAMPLE:
+            return self.type.value
+        if self.type == CHANGE_EVENTS.THRESHOLD:
+            return f"{self.field} {self.old:g} → {self.new:g} ({self.delta:+g})"
+        return f"{self.type.value}: {self.field} {self.old or '-'} → {self.new or '-'}"
+
+
+class ChangeDetector:
+    """Compares each raw data sample with the previous one and reports changes.
+
+    Categorical fields (`TRACKED_FIELDS`) are reported on any change. Numeric
+    fields are reported when they move by at least their threshold from the last
+    reported value, so slow drifts are reported as well as sudden jumps.
+    """
+
+    def __init__(
+        self,
+        thresholds: dict = DEFAULT_THRESHOLDS,
+        tracked_fields: dict = TRACKED_FIELDS,
+    ) -> None:
+        """
+        Args:
+            thresholds (dict, optional): Numeric field -> minimum reported change. Defaults to DEFAULT_THRESHOLDS.
+            tracked_fields (dict, optional): Categorical field -> event type. Defaults to TRACKED_FIELDS.
+        """
+        self.thresholds = thresholds
+        self.tracked_fields = tracked_fields
+
+        self.previous = None
+        self._references = {}
+
+    def update(self, raw_data: dict) -> list:
+        """Compare a raw data sample with the previous one
+
+        Args:
+            raw_data (dict): Raw data sample
+
+        Returns:
+            list: `ChangeEvent`s, empty if nothing meaningful changed. The first sample yields a single `FIRST_SAMPLE` event.
+        """
+        events = []
+
+        if self.previous is None:
+            events.append(ChangeEvent(CHANGE_EVENTS.FIRST_SAMPLE, None, None, None))
+        else:
+            events.extend(self._categorical_changes(self.previous, raw_data))
+
+        for field, threshold in self.thresholds.items():
+            value = _to_float(raw_data.get(field))
+            reference = self._references.get(field)
+
+            if value is None:
+                continue
+
+            if reference is None:
+                self._references[field] = value
+            elif abs(value - reference) >= threshold:
+                events.append(
+                    ChangeEvent(CHANGE_EVENTS.THRESHOLD, field, reference, value)
+                )
+                self._references[field] = value
+
+        self.previous = dict(raw_data)
+
+        return events
+
+    def _categorical_changes(self, previous: dict, current: dict) -> list:
+        events = []
+
+        ca_before = bool(previous.get("wan_lte_ca"))
+        ca_after = bool(current.get("wan_lte_ca"))
+
+        if ca_before != ca_after:
+            events.append(
+                ChangeEvent(
+                    CHANGE_EVENTS.CA_ACTIVATED
+                    if ca_after
+                    else CHANGE_EVENTS.CA_DEACTIVATED,
+                    "wan_lte_ca",
+                    previous.get("wan_lte_ca"),
+                    current.get("wan_lte_ca"),
+                )
+            )
+
+        for field, event_type in self.tracked_fields.items():
+            old, new = previous.get(field), current.get(field)
+            if old != new:
+                events.append(ChangeEvent(event_type, field, old, new))
+
+        return events
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
@@ -1,5 +1,8 @@
 ALL_5G_BANDS = "1,2,3,5,7,8,20,28,38,41,50,51,66,70,71,74,75,76,77,78,79,80,81,82,83,84"
 
+# Fields hashed into the static part of the AD value of write requests
+VERSION_FIELDS = ["wa_inner_version", "cr_version"]
+
 ALL_DATA_FIELDS = [
     "lte_pci",
     "lte_pci_lock",
@@ -39,3 +42,64 @@ ALL_DATA_FIELDS = [
     "network_provider",
     "signalbar",
 ]
+
+# Groups of data fields polled together, with their refresh interval in seconds.
+# Together they cover ALL_DATA_FIELDS except RD, which is only needed for writes.
+FIELD_GROUPS = {
+    "signal": (
+        [
+            "lte_rsrp",
+            "lte_rsrq",
+            "lte_rssi",
+            "lte_snr",
+            "Z5g_rsrp",
+            "Z5g_SINR",
+            "signalbar",
+        ],
+        1,
+    ),
+    "cell": (
+        [
+            "lte_pci",
+            "nr5g_pci",
+            "cell_id",
+            "network_type",
+            "wan_active_channel",
+            "wan_active_band",
+            "nr5g_action_band",
+            "nr5g_action_channel",
+            "wan_lte_ca",
+            "lte_multi_ca_scell_info",
+            "lte_ca_pcell_bandwidth",
+            "lte_ca_pcell_band",
+            "lte_ca_scell_bandwidth",
+            "lte_ca_scell_band",
+        ],
+        5,
+    ),
+    "status": (
+        [
+            "lte_pci_lock",
+            "lte_earfcn_lock",
+            "lte_freq_lock",
+            "wan_ipaddr",
+            "pm_sensor_mdm",
+            "pm_modem_5g",
+        ],
+        30,
+    ),
+    "static": (
+        [
+            "wan_apn",
+            "dns_mode",
+            "prefer_dns_manual",
+            "standby_dns_manual",
+            "rmcc",
+            "rmnc",
+            "wa_inner_version",
+            "cr_version",
+            "network_provider",
+        ],
+        600,
+    ),
+}
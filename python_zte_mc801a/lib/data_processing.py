@@ -1,265 +1,556 @@
 import math
 import hashlib
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import Optional, Union
 
+from python_zte_mc801a.lib.instrumentation import metrics
 
-def process_data(raw_data: dict) -> dict:
-    """Process raw data to produce usable data
+
+def to_number(value: str) -> Optional[Union[int, float]]:
+    """Parse a raw numeric value, keeping integers as `int`
 
     Args:
-        data (dict): Raw data
+        value (str): Raw value
 
     Returns:
-        dict: Processed signal data
+        int | float: Parsed value, or None if empty or invalid
     """
-    processed_data = {}
+    if value is None or value == "":
+        return None
 
-    processed_data["4G"] = process_data_4g(raw_data)
-    processed_data["4G_CA"] = process_ca_4g_data(raw_data)
-    processed_data["CELL AND NETWORK"] = process_data_cell(raw_data)
-    processed_data["5G"] = process_5g_data(raw_data)
-    processed_data["MISC"] = process_misc_data(raw_data)
+    try:
+        return int(value)
+    except ValueError:
+        pass
 
-    return processed_data
+    try:
+        return float(value)
+    except ValueError:
+        return None
 
 
-def process_misc_data(data: dict) -> dict:
-    """Process misc. data such as temperature and firmware version
+def from_hex(value: str) -> Optional[int]:
+    """Parse a raw hexadecimal value (e.g. PCI or cell ID)
 
     Args:
-        data (dict): Raw data
+        value (str): Raw value
 
     Returns:
-        dict: Processed data
+        int: Parsed value, or None if empty or invalid
     """
-    processed_data = {}
+    if value is None or value == "":
+        return None
 
-    processed_data["TEMPERATURE_4G"] = {
-        "desc": "Temperature 4G",
-        "str_value": f"{data['pm_sensor_mdm']}",
-    }
+    try:
+        return int(value, base=16)
+    except ValueError:
+        return None
 
-    processed_data["TEMPERATURE_5G"] = {
-        "desc": "Temperature 4G",
-        "str_value": f"{data['pm_modem_5g']}",
-    }
 
-    processed_data["FIRMWARE_VERSION"] = {
-        "desc": "Firmware Version",
-        "str_value": f"{data['wa_inner_version']}",
-    }
+@dataclass
+class Carrier:
+    """Secondary LTE carrier used for carrier aggregation"""
 
-    return processed_data
+    __slots__ = ("pci", "earfcn", "band", "bandwidth")
 
+    pci: Optional[int]
+    earfcn: Optional[int]
+    band: str
+    bandwidth: Optional[float]
 
-def process_ca_4g_data(data: dict) -> list:
-    """Process carrier aggregation data
+
+@dataclass
+class SignalSample:
+    """Typed signal data sample.
+
+    Numeric values are parsed once (PCIs and cell ID decoded from hex) and
+    display strings are only built when rendered, using `SIGNAL_SCHEMA`.
+    Values missing from the raw data are None.
+    """
+
+    __slots__ = (
+        "lte_pci",
+        "lte_pci_locked",
+        "lte_earfcn",
+        "lte_earfcn_locked",
+        "lte_band",
+        "lte_bandwidth",
+        "lte_rsrp",
+        "lte_rsrq",
+        "lte_rssi",
+        "lte_snr",
+        "ca_carriers",
+        "cell_id",
+        "network_type",
+        "network_provider",
+        "ca_active",
+        "wan_ip",
+        "apn",
+        "nr5g_pci",
+        "nr5g_earfcn",
+        "nr5g_bands",
+        "nr5g_rsrp",
+        "nr5g_sinr",
+        "temperature_4g",
+        "temperature_5g",
+        "firmware_version",
+    )
+
+    lte_pci: Optional[int]
+    lte_pci_locked: bool
+    lte_earfcn: Optional[int]
+    lte_earfcn_locked: bool
+    lte_band: str
+    lte_bandwidth: Optional[float]
+    lte_rsrp: Optional[int]
+    lte_rsrq: Optional[int]
+    lte_rssi: Optional[int]
+    lte_snr: Optional[float]
+    ca_carriers: tuple
+    cell_id: Optional[int]
+    network_type: str
+    network_provider: str
+    ca_active: bool
+    wan_ip: str
+    apn: str
+    nr5g_pci: Optional[int]
+    nr5g_earfcn: Optional[int]
+    nr5g_bands: str
+    nr5g_rsrp: Optional[int]
+    nr5g_sinr: Optional[float]
+    temperature_4g: Optional[float]
+    temperature_5g: Optional[float]
+    firmware_version: str
+
+    @property
+    def enbid(self) -> Optional[int]:
+        """eNodeB ID derived from the cell ID"""
+        if self.cell_id is None:
+            return None
+        return math.trunc(self.cell_id / 256)
+
+    def format(self, section: str) -> dict:
+        """Format the values of a schema section for display
+
+        Args:
+            section (str): Section of `SIGNAL_SCHEMA` (e.g. "4G")
+
+        Returns:
+            dict: Display strings, keyed by schema field key
+        """
+        return {field.key: field.format(self) for field in SIGNAL_SCHEMA[section]}
+
+    def format_carriers(self) -> list:
+        """Format carrier aggregation data as table rows (PCI, EARFCN, bands)
+
+        Returns:
+            list: One list of display strings per secondary carrier
+        """
+        return [
+            [
+                _str(carrier.pci),
+                _str(carrier.earfcn),
+                f"{carrier.band} ({round(carrier.bandwidth)}Mhz)",
+            ]
+            for carrier in self.ca_carriers
+        ]
+
+    def section_dict(self, section: str) -> dict:
+        """Build the nested representation of one section of `SIGNAL_SCHEMA`
+
+        Args:
+            section (str): Section name (e.g. "5G")
+
+        Returns:
+            dict: Field key -> `{"desc": ..., "str_value": ...}`
+        """
+        return {
+            field.key: {"desc": field.desc, "str_value": field.format(self)}
+            for field in SIGNAL_SCHEMA[section]
+        }
+
+    def as_dict(self) -> dict:
+        """Build the nested `{"desc": ..., "str_value": ...}` representation
+
+        Returns:
+            dict: Processed signal data, as returned by `process_data`
+        """
+        processed_data = {
+            section: self.section_dict(section) for section in SIGNAL_SCHEMA
+        }
+        processed_data["4G_CA"] = self.format_carriers()
+
+        return processed_data
+
+
+def _str(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _db(value) -> str:
+    return "" if value is None else f"{value}dB"
+
+
+def _lock(locked: bool) -> str:
+    return "🔒" if locked else ""
+
+
+def _format_lte_band(sample: SignalSample) -> str:
+    if sample.lte_bandwidth is not None:
+        return f"{sample.lte_band} ({round(sample.lte_bandwidth)}Mhz)"
+    return sample.lte_band
+
+
+SchemaField = namedtuple("SchemaField", ["key", "desc", "format"])
+
+# Display description and formatter of each value, per section
+SIGNAL_SCHEMA = {
+    "4G": (
+        SchemaField(
+            "4G_PCI",
+            "PCI",
+            lambda s: f"{_lock(s.lte_pci_locked)}{_str(s.lte_pci)}",
+        ),
+        SchemaField(
+            "4G_EARFCN",
+            "EARFCN",
+            lambda s: f"{_lock(s.lte_earfcn_locked)}{_str(s.lte_earfcn)}",
+        ),
+        SchemaField("4G_BANDS", "Bands", _format_lte_band),
+        SchemaField("4G_RSRP", "RSRP [Power]", lambda s: _db(s.lte_rsrp)),
+        SchemaField("4G_RSRQ", "RSRQ [Quality]", lambda s: _db(s.lte_rsrq)),
+        SchemaField("4G_RSSI", "RSSI", lambda s: _db(s.lte_rssi)),
+        SchemaField("4G_SNR", "SNR [Noise]", lambda s: _db(s.lte_snr)),
+    ),
+    "CELL AND NETWORK": (
+        SchemaField("CELL_ID", "Cell ID", lambda s: _str(s.cell_id)),
+        SchemaField("ENBID", "ENBID", lambda s: _str(s.enbid)),
+        SchemaField("NETWORK_TYPE", "Network Type", lambda s: s.network_type),
+        SchemaField("NETWORK_PROVIDER", "Provider", lambda s: s.network_provider),
+        SchemaField(
+            "CA_STATUS",
+            "CA Status",
+            lambda s: "🟢 Active" if s.ca_active else "🔴 Inactive",
+        ),
+        SchemaField("WAN_WIP", "WAN IP", lambda s: s.wan_ip),
+        SchemaField("APN", "APN", lambda s: s.apn),
+    ),
+    "5G": (
+        SchemaField("PCI", "PCI", lambda s: _str(s.nr5g_pci)),
+        SchemaField("EARFCN", "EARFCN", lambda s: _str(s.nr5g_earfcn)),
+        SchemaField("Bands", "Bands", lambda s: s.nr5g_bands),
+        SchemaField("RSRP", "RSRP [Power]", lambda s: _db(s.nr5g_rsrp)),
+        SchemaField("SNR", "SNR [Noise]", lambda s: _db(s.nr5g_sinr)),
+    ),
+    "MISC": (
+        SchemaField(
+            "TEMPERATURE_4G", "Temperature 4G", lambda s: _str(s.temperature_4g)
+        ),
+        SchemaField(
+            "TEMPERATURE_5G", "Temperature 5G", lambda s: _str(s.temperature_5g)
+        ),
+        SchemaField(
+            "FIRMWARE_VERSION", "Firmware Version", lambda s: s.firmware_version
+        ),
+    ),
+}
+
+
+def parse_ca_carriers(lte_multi_ca_scell_info: str) -> tuple:
+    """Parse the secondary carriers from `lte_multi_ca_scell_info`
 
     Args:
-        data (dict): Raw data
+        lte_multi_ca_scell_info (str): Raw carrier aggregation data
 
     Returns:
-        dict: Processed data
+        tuple: `Carrier` objects
     """
-    ca_4g_processed_data = []
-
-    if len(data["lte_multi_ca_scell_info"]):
-        ca_4g = data["lte_multi_ca_scell_info"].split(";")
+    carriers = []
 
-        for chan in ca_4g:
+    if lte_multi_ca_scell_info:
+        for chan in lte_multi_ca_scell_info.split(";"):
             chan_details = chan.split(",")
-            ca_4g_processed_data.append(
-                [
-                    chan_details[1],
-                    chan_details[4],
-                    f"{chan_details[3]} ({round(float(chan_details[5]))}Mhz)",
-                ]
+            carriers.append(
+                Carrier(
+                    pci=to_number(chan_details[1]),
+                    earfcn=to_number(chan_details[4]),
+                    band=chan_details[3],
+                    bandwidth=float(chan_details[5]),
+                )
             )
 
-    return ca_4g_processed_data
+    return tuple(carriers)
 
 
-def process_5g_data(data: dict) -> dict:
-    """Process 5G-related data
+@metrics.timed("process")
+def process_sample(raw_data: dict) -> SignalSample:
+    """Parse raw data into a typed signal sample
 
     Args:
-        data (dict): Raw data
+        raw_data (dict): Raw data
 
     Returns:
-        dict: Processed data
+        SignalSample: Signal sample
     """
-    processed_data = {}
+    get = raw_data.get
+
+    lte_pci = from_hex(get("lte_pci"))
+    lte_earfcn = get("wan_active_channel", "")
+    pcell_bandwidth = to_number(get("lte_ca_pcell_bandwidth"))
+
+    return SignalSample(
+        lte_pci=lte_pci,
+        lte_pci_locked=lte_pci is not None and str(lte_pci) == get("lte_pci_lock"),
+        lte_earfcn=to_number(lte_earfcn),
+        lte_earfcn_locked=lte_earfcn == get("lte_earfcn_lock"),
+        lte_band=get("lte_ca_pcell_band", "")
+        if pcell_bandwidth is not None
+        else get("wan_active_band", ""),
+        lte_bandwidth=pcell_bandwidth,
+        lte_rsrp=to_number(get("lte_rsrp")),
+        lte_rsrq=to_number(get("lte_rsrq")),
+        lte_rssi=to_number(get("lte_rssi")),
+        lte_snr=to_number(get("lte_snr")),
+        ca_carriers=parse_ca_carriers(get("lte_multi_ca_scell_info", "")),
+        cell_id=from_hex(get("cell_id")),
+        network_type=get("network_type", ""),
+        network_provider=get("network_provider", ""),
+        ca_active=bool(get("wan_lte_ca")),
+        wan_ip=get("wan_ipaddr", ""),
+        apn=get("wan_apn", ""),
+        nr5g_pci=from_hex(get("nr5g_pci")),
+        nr5g_earfcn=to_number(get("nr5g_action_channel")),
+        nr5g_bands=get("nr5g_action_band", ""),
+        nr5g_rsrp=to_number(get("Z5g_rsrp")),
+        nr5g_sinr=to_number(get("Z5g_SINR")),
+        temperature_4g=to_number(get("pm_sensor_mdm")),
+        temperature_5g=to_number(get("pm_modem_5g")),
+        firmware_version=get("wa_inner_version", ""),
+    )
 
-    processed_data["PCI"] = {
-        "desc": "PCI",
-        "str_value": f"{int(data['nr5g_pci'],base=16)}",
-    }
 
-    processed_data["EARFCN"] = {
-        "desc": "EARFCN",
-        "str_value": data["nr5g_action_channel"],
-    }
+def process_data(raw_data: dict) -> dict:
+    """Process raw data to produce usable data
 
-    processed_data["Bands"] = {
-        "desc": "Bands",
-        "str_value": f"{data['nr5g_action_band']}",
-    }
+    Prefer `process_sample`; this nested representation is kept for display
+    (e.g. the `data` command) and backward compatibility.
 
-    processed_data["RSRP"] = {
-        "desc": "RSRP [Power]",
-        "str_value": f"{data['Z5g_rsrp']}dB",
-    }
+    Args:
+        data (dict): Raw data
 
-    processed_data["SNR"] = {
-        "desc": "SNR [Noise]",
-        "str_value": f"{data['Z5g_SINR']}dB",
-    }
+    Returns:
+        dict: Processed signal data
+    """
+    return process_sample(raw_data).as_dict()
 
-    return processed_data
 
+def _processed_section(data: Union[dict, SignalSample], section: str):
+    sample = data if isinstance(data, SignalSample) else process_sample(data)
+
+    if section == "4G_CA":
+        return sample.format_carriers()
+
+    return sample.section_dict(section)
 
-def process_data_cell(data: dict) -> dict:
-    """Process general cell data
+
+def process_misc_data(data: Union[dict, SignalSample]) -> dict:
+    """Process misc. data such as temperature and firmware version
 
     Args:
-        data (dict): Raw data
+        data (Union[dict, SignalSample]): Raw data, or a sample already obtained using `process_sample`
 
     Returns:
         dict: Processed data
     """
+    return _processed_section(data, "MISC")
 
-    processed_data = {}
 
-    processed_data["CELL_ID"] = {
-        "desc": "Cell ID",
-        "str_value": f'{int(data["cell_id"], base=16)}',
-    }
+def process_ca_4g_data(data: Union[dict, SignalSample]) -> list:
+    """Process carrier aggregation data
 
-    processed_data["ENBID"] = {
-        "desc": "ENBID",
-        "str_value": math.trunc(int(data["cell_id"], base=16) / 256),
-    }
+    Args:
+        data (Union[dict, SignalSample]): Raw data, or a sample already obtained using `process_sample`
 
-    processed_data["NETWORK_TYPE"] = {
-        "desc": "Network Type",
-        "str_value": data["network_type"],
-    }
+    Returns:
+        list: Processed data
+    """
+    return _processed_section(data, "4G_CA")
+
+
+def process_5g_data(data: Union[dict, SignalSample]) -> dict:
+    """Process 5G-related data
+
+    Args:
+        data (Union[dict, SignalSample]): Raw data, or a sample already obtained using `process_sample`
 
-    processed_data["NETWORK_PROVIDER"] = {
-        "desc": "Provider",
-        "str_value": data["network_provider"],
-    }
+    Returns:
+        dict: Processed data
+    """
+    return _processed_section(data, "5G")
 
-    if len(data["wan_lte_ca"]):
-        processed_data["CA_STATUS"] = {"desc": "CA Status", "str_value": "🟢 Active"}
-    else:
-        processed_data["CA_STATUS"] = {"desc": "CA Status", "str_value": "🔴 Inactive"}
 
-    processed_data["WAN_WIP"] = {
-        "desc": "WAN IP",
-        "str_value": data["wan_ipaddr"],
-    }
+def process_data_cell(data: Union[dict, SignalSample]) -> dict:
+    """Process general cell data
 
-    processed_data["APN"] = {
-        "desc": "APN",
-        "str_value": data["wan_apn"],
-    }
+    Args:
+        data (Union[dict, SignalSample]): Raw data, or a sample already obtained using `process_sample`
 
-    return processed_data
+    Returns:
+        dict: Processed data
+    """
+    return _processed_section(data, "CELL AND NETWORK")
 
 
-def process_data_4g(data: dict) -> dict:
+def process_data_4g(data: Union[dict, SignalSample]) -> dict:
     """Process 4G-related data
 
     Args:
-        data (dict): Raw data
+        data (Union[dict, SignalSample]): Raw data, or a sample already obtained using `process_sample`
 
     Returns:
         dict: Processed data
     """
-    processed_data = {}
+    return _processed_section(data, "4G")
 
-    if len(data["lte_pci"]):
-        lock_str = ""
 
-        if str(int(data["lte_pci"], base=16)) == data["lte_pci_lock"]:
-            lock_str = "🔒"
+def get_version_hash(raw_data: dict) -> str:
+    """Hash the firmware versions, the static part of the AD value
 
-        processed_data["4G_PCI"] = {
-            "desc": "PCI",
-            "str_value": f"{lock_str}{int(data['lte_pci'],base=16)}",
-        }
-    else:
-        processed_data["4G_PCI"] = {"desc": "PCI", "str_value": ""}
+    Args:
+        raw_data (dict): Raw data containing `wa_inner_version` and `cr_version`
 
-    lock_str = ""
+    Returns:
+        str: Version hash
+    """
+    m = hashlib.md5()
+    m.update((raw_data["wa_inner_version"] + raw_data["cr_version"]).encode())
+    return m.hexdigest()
 
-    if data["wan_active_channel"] == data["lte_earfcn_lock"]:
-        lock_str = "🔒"
 
-    processed_data["4G_EARFCN"] = {
-        "desc": "EARFCN",
-        "str_value": f'{lock_str}{data["wan_active_channel"]}',
-    }
+def get_ad_value(raw_data: dict, version_hash: str = None) -> str:
+    """Retrieve AD value for write operations
 
-    if len(data["lte_ca_pcell_bandwidth"]):
-        processed_data["4G_BANDS"] = {
-            "desc": "Bands",
-            "str_value": f"{data['lte_ca_pcell_band']} ({round(float(data['lte_ca_pcell_bandwidth']))}Mhz)",
-        }
-    else:
-        processed_data["4G_BANDS"] = {
-            "desc": "Bands",
-            "str_value": f"{data['wan_active_band']}",
-        }
+    Args:
+        raw_data (dict): Raw data containing `RD` (and the version fields, unless `version_hash` is provided)
+        version_hash (str, optional): Version hash obtained using `get_version_hash`. Defaults to None (computed from `raw_data`).
 
-    processed_data["4G_RSRP"] = {
-        "desc": "RSRP [Power]",
-        "str_value": f"{data['lte_rsrp']}dB",
-    }
+    Returns:
+        str: AD value
+    """
+    if version_hash is None:
+        version_hash = get_version_hash(raw_data)
 
-    processed_data["4G_RSRQ"] = {
-        "desc": "RSRQ [Quality]",
-        "str_value": f"{data['lte_rsrq']}dB",
-    }
+    m2 = hashlib.md5()
+    m2.update((version_hash + raw_data["RD"]).encode())
 
-    processed_data["4G_RSSI"] = {"desc": "RSSI", "str_value": f"{data['lte_rssi']}dB"}
+    return m2.hexdigest()
 
-    processed_data["4G_SNR"] = {
-        "desc": "SNR [Noise]",
-        "str_value": f"{data['lte_snr']}dB",
-    }
 
-    return processed_data
+def hash_password(user_password: str, ld: str) -> str:
+    """Hash the admin password with the router-provided LD for the LOGIN request
 
+    Args:
+        user_password (str): Admin user password
+        ld (str): LD value returned by the router
 
-def get_ad_value(raw_data: dict) -> str:
-    """Retrieve AD value for write operations
+    Returns:
+        str: Hashed password
+    """
+    # The password is hashed twice
+    m = hashlib.sha256()
+    m.update(user_password.encode())
+
+    m2 = hashlib.sha256()
+    m2.update(f"{m.hexdigest().upper()}{ld}".encode())
+
+    return m2.hexdigest().upper()
+
+
+def decode_sms_content(content: str) -> str:
+    """Decode the hex content of a message
 
     Args:
-        data (dict): Raw data
+        content (str): Hex representation of the message (UCS-2)
 
     Returns:
-        str: AD value
+        str: Message text
     """
+    payload = bytes.fromhex(content)
 
-    # data_to_request = [
-    #     "wa_inner_version",
-    #     "cr_version",
-    #     "RD",
-    # ]
+    if len(payload) % 2:
+        # Not UCS-2: keep the printable bytes
+        return str(payload.replace(b"\x00", b""), "latin-1")
 
-    # r_data = requests.get(
-    #     f"http://{router_ip}/goform/goform_get_cmd_process?cmd=wa_inner_version,cr_version,RD&multi_data=1",
-    #     cookies=auth_cookies,
-    #     headers={f"referer": f"http://{router_ip}/"},
-    # )
+    return payload.decode("utf-16-be", errors="replace")
 
-    # raw_data = r_data.json()
 
-    m = hashlib.md5()
-    m.update((raw_data["wa_inner_version"] + raw_data["cr_version"]).encode())
+@metrics.timed("decode_sms")
+def decode_sms_messages(messages: list, n: int) -> list:
+    """Keep the `n` first messages and decode their hex content
 
-    m2 = hashlib.md5()
-    m2.update((m.hexdigest() + raw_data["RD"]).encode())
+    Args:
+        messages (list): Raw messages from `sms_data_total`
+        n (int): Number of messages to keep
 
-    return m2.hexdigest()
+    Returns:
+        list: Dictionaries of messages with decoded content
+    """
+    if len(messages) > n:
+        messages = messages[0:n]
+
+    # Convert hex representation to ASCII
+    for index, msg in enumerate(messages):
+        messages[index]["content"] = decode_sms_content(msg["content"])
+
+    return messages
+
+
+class SMSCache:
+    """Decoded messages keyed by message id.
+
+    Each message is decoded once; later fetches of the same message reuse the
+    cached result. A message is decoded again only if its raw content changed
+    (e.g. the router reused the id of a deleted message).
+    """
+
+    def __init__(self, max_size: int = 1000) -> None:
+        """
+        Args:
+            max_size (int, optional): Maximum number of cached messages (oldest cached are evicted first). Defaults to 1000.
+        """
+        self.max_size = max_size
+        self._messages = {}
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    @metrics.timed("decode_sms")
+    def decode(self, messages: list) -> list:
+        """Decode raw messages, reusing cached ones
+
+        Args:
+            messages (list): Raw messages from `sms_data_total`
+
+        Returns:
+            list: Dictionaries of messages with decoded content, in the same order
+        """
+        decoded = []
+
+        for msg in messages:
+            cached = self._messages.get(msg["id"])
+
+            if cached is None or cached[0] != msg["content"]:
+                cached = (
+                    msg["content"],
+                    {**msg, "content": decode_sms_content(msg["content"])},
+                )
+                self._messages.pop(msg["id"], None)
+                self._messages[msg["id"]] = cached
+
+                if len(self._messages) > self.max_size:
+                    del self._messages[next(iter(self._messages))]
+
+            decoded.append(dict(cached[1]))
+
+        return decoded
@@ -1,11 +1,16 @@
 from python_zte_mc801a.lib.router_requests import (
-    set_5g_band,
-    get_signal_data,
-    get_auth_cookies,
-    get_latest_sms_messages,
+    RouterSession,
+    get_router_session,
 )
-from python_zte_mc801a.lib.data_processing import process_data
+from python_zte_mc801a.lib.data_processing import (
+    SignalSample,
+    from_hex,
+    process_sample,
+)
+from python_zte_mc801a.lib.polling import TieredPoller
 from python_zte_mc801a.lib.constants import ALL_5G_BANDS
+from collections import namedtuple
+import statistics
 import time
 import logging
 
@@ -23,86 +28,210 @@ def get_sms_data(router_ip: str, password: str) -> list:
         list: list of dictionaries containing SMS data
     """
 
-    auth_cookies = get_auth_cookies(router_ip=router_ip, user_password=password)
-    return get_latest_sms_messages(router_ip=router_ip, auth_cookies=auth_cookies)
+    return get_router_session(router_ip, password).get_latest_sms_messages()
+
+
+_router_pollers = {}
 
 
-def get_processed_data(router_ip: str, password: str) -> dict:
+def get_router_poller(router_ip: str, password: str) -> TieredPoller:
+    """Return the shared `TieredPoller` for a router, creating it on first use
+
+    Args:
+        router_ip (str): IP (or hostname) of the router
+        user_password (str): Admin user password
+
+    Returns:
+        TieredPoller: Poller using the shared `RouterSession` of this router
+    """
+    key = (router_ip, password)
+
+    if key not in _router_pollers:
+        session = get_router_session(router_ip, password)
+        _router_pollers[key] = TieredPoller(session.get_signal_data)
+
+    return _router_pollers[key]
+
+
+def get_processed_data(router_ip: str, password: str) -> tuple:
     """Helper method to return processed data in a single operation
 
+    Only the field groups due for a refresh are requested from the router (see
+    `TieredPoller`); other fields come from the previous polls. A call within 1s
+    of the previous one therefore sends no request at all: signal fields may be
+    up to 1s old, and slower-changing fields older (see `FIELD_GROUPS`).
+
     Args:
         router_ip (str): IP (or hostname) of the router
         user_password (str): Admin user password
 
     Returns:
-        dict: Processed signal data
+        tuple: Signal sample and raw signal data
+    """
+    data = get_router_poller(router_ip, password).poll()
+    sample = process_sample(raw_data=data)
+    return sample, data
+
+
+# Outcome of `wait_for_5g_settle`: serving PCI (None without 5G cell), seconds
+# elapsed, whether the modem was seen reacting to the band change (detaching or
+# moving to another cell) and whether it then settled on a stable cell
+SettleResult = namedtuple("SettleResult", ["pci", "elapsed", "reattached", "settled"])
+
+
+def wait_for_5g_settle(
+    session: RouterSession,
+    target_pci: int,
+    previous_pci: int = None,
+    poll_interval: float = 1.0,
+    stable_polls: int = 3,
+    timeout: float = 30.0,
+    grace: float = 5.0,
+) -> SettleResult:
+    """Poll the 5G PCI after a band change until the modem has settled on a cell
+
+    Returns as soon as the target PCI is served, or once the same PCI has been
+    served for `stable_polls` consecutive polls after the modem reacted to the
+    band change, i.e. was seen detaching or serving another cell than
+    `previous_pci`. The modem may reattach to the same cell faster than it is
+    polled, so a cell stable for `grace` seconds is settled even if the modem
+    was not seen reacting.
+
+    Args:
+        session (RouterSession): Authenticated router session
+        target_pci (int): The target PCI, or None to wait for any stable cell
+        previous_pci (int, optional): PCI served before the band change. Defaults to None (the PCI of the first poll).
+        poll_interval (float, optional): Seconds between polls. Defaults to 1.
+        stable_polls (int, optional): Consecutive identical polls for a cell to be stable. Defaults to 3.
+        timeout (float, optional): Maximum seconds to wait. Defaults to 30.
+        grace (float, optional): Seconds after which a stable cell is settled without a seen reaction. Defaults to 5.
+
+    Returns:
+        SettleResult: Serving PCI and time to settle
     """
-    auth_cookies = get_auth_cookies(router_ip=router_ip, user_password=password)
-    data = get_signal_data(router_ip=router_ip, auth_cookies=auth_cookies)
-    processed_data = process_data(raw_data=data)
-    return processed_data, data
+    start = time.monotonic()
+    reattached = False
+    last_pci = None
+    same_polls = 0
+    polls = 0
+
+    while True:
+        raw_data = session.get_signal_data(fields=["nr5g_pci"])
+        pci = from_hex(raw_data.get("nr5g_pci"))
+        elapsed = time.monotonic() - start
+        polls += 1
+
+        if polls == 1 and previous_pci is None:
+            previous_pci = pci
+
+        if pci is None:
+            reattached = True
+            same_polls = 0
+        else:
+            reattached = reattached or pci != previous_pci
+            same_polls = same_polls + 1 if pci == last_pci else 1
+
+        last_pci = pci
+
+        if target_pci is not None and pci == target_pci:
+            return SettleResult(pci, elapsed, reattached, True)
+
+        if same_polls >= stable_polls and (reattached or elapsed >= grace):
+            return SettleResult(pci, elapsed, reattached, True)
+
+        if elapsed >= timeout:
+            if pci is None:
+                log.warning(f"No 5G cell {elapsed:.0f}s after the modem detached")
+            else:
+                log.debug(f"5G PCI still changing after {elapsed:.0f}s")
+
+            return SettleResult(pci, elapsed, reattached, False)
+
+        time.sleep(poll_interval)
 
 
 def force_5g_pci_selection(
-    target_pci: str,
-    processed_data: dict,
-    router_ip: str,
-    auth_cookies: dict,
+    target_pci: int,
+    sample: SignalSample,
+    session: RouterSession,
     bands_5g: list = ["78", ALL_5G_BANDS],
     verbose: bool = True,
+    max_attempts: int = 30,
+    settle_timeout: float = 30.0,
 ) -> bool:
     """Force selection of a 5G PCI site by alternatively forcing different bands. This is useful if, for example, the router tends to alternate between two PCIs, one significantly outperforming the other.
 
+    After each band change, the PCI is polled until the modem settles (see
+    `wait_for_5g_settle`) rather than after a fixed delay.
+
     Args:
-        target_pci (str): The target PCI
-        processed_data (dict): Processed signal data
-        router_ip (str): Router IP
-        auth_cookies (dict): Authentication cookies
+        target_pci (int): The target PCI (decimal)
+        sample (SignalSample): Current signal sample
+        session (RouterSession): Authenticated router session
         bands_5g (list, optional): The 5G bands to alternate between. Must be a list with two strings (e.g. ["78",["3+78"]]). Defaults to ["78", ALL_5G_BANDS].
         verbose (bool): Whether messages should be printed to stdout
+        max_attempts (int, optional): Maximum number of band changes. Defaults to 30.
+        settle_timeout (float, optional): Maximum seconds to wait for the modem to settle after a band change. Defaults to 30.
 
     Returns:
         bool: Success
     """
+    if sample.nr5g_pci == target_pci:
+        if verbose:
+            log.info(f"PCI already set to target {target_pci}")
+        return True
+
     next_5g_band_set = 0
+    settle_times = []
+    start = time.monotonic()
+    achieved = False
 
-    for attempt in range(0, 30):
+    for attempt in range(0, max_attempts):
         if verbose:
-            log.info(f"Attempt {attempt+1} / {10} to obtain target PCI")
-        if processed_data["5G"]["PCI"]["str_value"] == target_pci:
-            if verbose:
-                log.info(f"PCI already set to target {target_pci}")
-            return True
+            log.info(f"Attempt {attempt+1} / {max_attempts} to obtain target PCI")
+
+        if next_5g_band_set == 0:
+            next_5g_band_set = 1
         else:
-            if next_5g_band_set == 0:
-                next_5g_band_set = 1
-            else:
-                next_5g_band_set = 0
+            next_5g_band_set = 0
 
-            set_5g_band(
-                router_ip=router_ip,
-                auth_cookies=auth_cookies,
-                bands=bands_5g[next_5g_band_set],
-                verbose=False,
-            )
+        previous_pci = from_hex(
+            session.get_signal_data(fields=["nr5g_pci"]).get("nr5g_pci")
+        )
+        bands = bands_5g[next_5g_band_set]
+
+        if not session.set_5g_band(bands=bands, verbose=False):
+            log.warning(f"Router rejected 5G bands {bands}, skipping them")
+            continue
 
+        if verbose:
+            log.info(f"⌛ Waiting for the modem to settle")
+        result = wait_for_5g_settle(
+            session, target_pci, previous_pci=previous_pci, timeout=settle_timeout
+        )
+        settle_times.append(result.elapsed)
+
+        if result.pci == target_pci:
             if verbose:
-                log.info(f"⌛ Waiting 20 seconds before checking current PCI")
-            time.sleep(20)
+                log.info(
+                    f"🟢 Achieved target PCI {result.pci} after {result.elapsed:.1f}s"
+                )
+            achieved = True
+            break
 
-            raw_data = get_signal_data(router_ip=router_ip, auth_cookies=auth_cookies)
-            new_processed_data = process_data(raw_data)
+        if verbose:
+            state = "settled" if result.settled else "not settled"
+            log.info(
+                f"🛑 Not achieved target PCI - current is {result.pci} "
+                f"({state} after {result.elapsed:.1f}s)"
+            )
 
-            if not new_processed_data["5G"]["PCI"]["str_value"] == target_pci:
-                if verbose:
-                    log.info(
-                        f'🛑 Not achieved target PCI - current is {new_processed_data["5G"]["PCI"]["str_value"]}'
-                    )
-            else:
-                if verbose:
-                    log.info(
-                        f'🟢 Achieved target PCI {new_processed_data["5G"]["PCI"]["str_value"]}'
-                    )
-                return True
+    if verbose and settle_times:
+        log.info(
+            f"Time to lock: {len(settle_times)} band changes in "
+            f"{time.monotonic() - start:.1f}s, settle time "
+            f"median {statistics.median(settle_times):.1f}s, "
+            f"max {max(settle_times):.1f}s"
+        )
 
-    return False
+    return achieved
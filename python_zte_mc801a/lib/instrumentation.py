@@ -0,0 +1,291 @@
+"""Timings and counters of the hot path (login, fetches, decoding, rendering).
+
+Durations are recorded in per-stage histograms of the process-wide `metrics`
+registry, and every measurement is also passed to the registry's sinks (e.g.
+`LogSink`, `JSONLinesSink`, `TraceEventSink` or any callable).
+
+Example:
+    with metrics.time("fetch_signal"):
+        raw_data = session.get_signal_data()
+
+    metrics.summary()["fetch_signal"]["p95"]
+"""
+
+import functools
+import json
+import math
+import threading
+import time
+from collections import deque
+import logging
+
+log = logging.getLogger("rich")
+
+
+class Histogram:
+    """Distribution of the latest values recorded for a stage.
+
+    Percentiles are computed over the last `window` values, so they follow
+    changes in behaviour; the count, total and maximum cover all values.
+    """
+
+    def __init__(self, window: int = 1024) -> None:
+        """
+        Args:
+            window (int, optional): Number of latest values percentiles are computed from. Defaults to 1024.
+        """
+        self.values = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float):
+        """Add a value to the distribution"""
+        self.values.append(value)
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Return a percentile of the latest values (nearest rank)
+
+        Args:
+            q (float): Percentile, between 0 and 100
+
+        Returns:
+            float: Percentile, or None if no value was recorded
+        """
+        if not self.values:
+            return None
+
+        values = sorted(self.values)
+        rank = max(1, math.ceil(q / 100 * len(values)))
+        return values[rank - 1]
+
+    def summary(self) -> dict:
+        """Return the count, mean, p50, p95 and max of the recorded values"""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max if self.count else None,
+        }
+
+
+class Metrics:
+    """Registry of stage timings (histograms, in seconds) and counters"""
+
+    def __init__(self, window: int = 1024) -> None:
+        """
+        Args:
+            window (int, optional): Number of latest timings percentiles are computed from. Defaults to 1024.
+        """
+        self.window = window
+        self.timers = {}
+        self.counters = {}
+        self.sinks = []
+
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        """Record the duration of a stage
+
+        Args:
+            name (str): Stage name (e.g. "fetch_signal")
+            seconds (float): Duration
+        """
+        with self._lock:
+            histogram = self.timers.get(name)
+            if histogram is None:
+                histogram = self.timers[name] = Histogram(self.window)
+            histogram.record(seconds)
+
+        self._emit("timer", name, seconds)
+
+    def increment(self, name: str, n: int = 1):
+        """Increment a counter
+
+        Args:
+            name (str): Counter name (e.g. "login_retry")
+            n (int, optional): Increment. Defaults to 1.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+        self._emit("counter", name, n)
+
+    def time(self, name: str) -> "_Timer":
+        """Measure the duration of a `with` block; failures also count `<name>_error`
+
+        Args:
+            name (str): Stage name
+        """
+        return _Timer(self, name)
+
+    def timed(self, name: str):
+        """Decorator measuring each call of a function (see `time`)
+
+        Args:
+            name (str): Stage name
+        """
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def add_sink(self, sink):
+        """Pass every measurement to a sink
+
+        Args:
+            sink (callable): Called with the kind ("timer" or "counter"), name and value of each measurement
+        """
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        """Stop passing measurements to a sink added with `add_sink`"""
+        self.sinks.remove(sink)
+
+    def summary(self) -> dict:
+        """Summarize timings and counters
+
+        Returns:
+            dict: Stage name -> count, mean, p50, p95 and max (seconds), plus a "counters" entry
+        """
+        with self._lock:
+            summary = {name: h.summary() for name, h in sorted(self.timers.items())}
+            summary["counters"] = dict(sorted(self.counters.items()))
+        return summary
+
+    def reset(self):
+        """Forget all timings and counters (sinks are kept)"""
+        with self._lock:
+            self.timers = {}
+            self.counters = {}
+
+    def _emit(self, kind: str, name: str, value):
+        for sink in self.sinks:
+            try:
+                sink(kind, name, value)
+            except Exception as e:
+                log.debug(f"Metrics sink {sink!r} failed: {e!r}")
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: Metrics, name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.metrics.increment(f"{self.name}_error")
+
+
+class LogSink:
+    """Sink logging each measurement"""
+
+    def __init__(self, level: int = logging.DEBUG) -> None:
+        """
+        Args:
+            level (int, optional): Logging level. Defaults to logging.DEBUG.
+        """
+        self.level = level
+
+    def __call__(self, kind: str, name: str, value):
+        if kind == "timer":
+            log.log(self.level, f"{name} took {value * 1000:.1f}ms")
+        else:
+            log.log(self.level, f"{name} +{value}")
+
+
+class JSONLinesSink:
+    """Sink appending each measurement to a JSON Lines file"""
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path (str): Path of the file
+        """
+        self.path = path
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+
+    def __call__(self, kind: str, name: str, value):
+        line = json.dumps(
+            {"time": time.time(), "kind": kind, "name": name, "value": value}
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class TraceEventSink:
+    """Sink recording timings as spans in the Chrome trace event format.
+
+    The resulting JSON file opens as a flame chart, one track per thread, in
+    Perfetto (ui.perfetto.dev), speedscope or chrome://tracing.
+    """
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.events = []
+        self._threads = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, kind: str, name: str, value):
+        end = time.perf_counter()
+        thread = threading.current_thread()
+
+        if kind == "timer":
+            event = {"ph": "X", "ts": (end - self.start - value) * 1e6}
+            event["dur"] = value * 1e6
+        else:
+            event = {"ph": "i", "ts": (end - self.start) * 1e6, "s": "t"}
+
+        event.update({"name": name, "pid": 1, "tid": thread.ident})
+
+        with self._lock:
+            if thread.ident not in self._threads:
+                self._threads.add(thread.ident)
+                self.events.append(
+                    {
+                        "ph": "M",
+                        "name": "thread_name",
+                        "pid": 1,
+                        "tid": thread.ident,
+                        "args": {"name": thread.name},
+                    }
+                )
+            self.events.append(event)
+
+    def save(self, path: str):
+        """Write the recorded spans to a JSON file
+
+        Args:
+            path (str): Path of the file
+        """
+        with self._lock:
+            trace = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+        with open(path, "w") as f:
+            json.dump(trace, f)
+
+
+# Process-wide registry used by the instrumented functions
+metrics = Metrics()
@@ -0,0 +1,374 @@
+"""Stand-in MC801a web server for offline testing and load benchmarking.
+
+Implements the subset of the goform API used by this package:
+
+- the LD/LOGIN handshake,
+- `multi_data` field queries,
+- paged `sms_data_total`,
+- `WAN_PERFORM_NR5G_BAND_LOCK` and `LTE_LOCK_CELL_SET` writes.
+
+Latency, error rate and signal evolution are configurable.
+"""
+
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http.cookies import SimpleCookie
+from urllib.parse import urlparse, parse_qs
+import logging
+
+from python_zte_mc801a.lib.data_processing import get_ad_value, hash_password
+
+log = logging.getLogger("rich")
+
+DEFAULT_SIGNAL_DATA = {
+    "lte_pci": "1A2",
+    "lte_pci_lock": "",
+    "lte_earfcn_lock": "",
+    "lte_freq_lock": "",
+    "wan_ipaddr": "10.64.12.34",
+    "wan_apn": "three.co.uk",
+    "pm_sensor_mdm": "41",
+    "pm_modem_5g": "45",
+    "nr5g_pci": "1F5",
+    "nr5g_action_band": "n78",
+    "nr5g_action_channel": "636576",
+    "Z5g_SINR": "12.5",
+    "Z5g_rsrp": "-92",
+    "wan_active_channel": "1617",
+    "wan_active_band": "LTE BAND 3",
+    "lte_multi_ca_scell_info": "1,291,0,1,100,20.0;2,291,0,7,3050,15.0",
+    "cell_id": "2E1B40A",
+    "dns_mode": "auto",
+    "prefer_dns_manual": "",
+    "standby_dns_manual": "",
+    "rmcc": "234",
+    "rmnc": "20",
+    "network_type": "ENDC",
+    "wan_lte_ca": "ca_activated",
+    "lte_rssi": "-65",
+    "lte_rsrp": "-94",
+    "lte_snr": "8.0",
+    "lte_rsrq": "-11",
+    "lte_ca_pcell_bandwidth": "20.0",
+    "lte_ca_pcell_band": "3",
+    "lte_ca_scell_bandwidth": "",
+    "lte_ca_scell_band": "",
+    "wa_inner_version": "BD_UKH3GMC801AV1.0.0B15",
+    "cr_version": "CR_UKH3GMC801AV1.0.0B15",
+    "network_provider": "3 UK",
+    "signalbar": "4",
+}
+
+# Candidate 5G cells (decimal PCI -> band) the modem attaches to after a band lock
+DEFAULT_5G_CELLS = {"501": "78", "502": "78", "317": "1", "88": "28"}
+
+# Random walk of numeric fields: name -> (step, minimum, maximum)
+SIGNAL_WALK = {
+    "lte_rsrp": (1, -120, -70),
+    "lte_rsrq": (1, -20, -3),
+    "lte_rssi": (1, -95, -45),
+    "lte_snr": (0.5, -5, 30),
+    "Z5g_rsrp": (1, -120, -70),
+    "Z5g_SINR": (0.5, -5, 30),
+    "pm_sensor_mdm": (0.2, 30, 70),
+    "pm_modem_5g": (0.2, 30, 75),
+}
+
+
+class MockRouter:
+    """State and request handling of a simulated router"""
+
+    def __init__(
+        self,
+        password: str = "admin",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        session_ttl: float = None,
+        sms_count: int = 20,
+        reattach_delay: float = 0.0,
+        cells_5g: dict = None,
+        seed: int = None,
+    ) -> None:
+        """
+        Args:
+            password (str, optional): Admin password. Defaults to "admin".
+            latency (float, optional): Delay in seconds added to each response. Defaults to 0.
+            jitter (float, optional): Maximum random delay in seconds added to `latency`. Defaults to 0.
+            error_rate (float, optional): Probability of answering with an HTTP 500 error. Defaults to 0.
+            session_ttl (float, optional): Seconds after which a login expires. Defaults to None (never).
+            sms_count (int, optional): Number of SMS messages in the inbox. Defaults to 20.
+            reattach_delay (float, optional): Seconds without 5G cell after a band lock. Defaults to 0.
+            cells_5g (dict, optional): Candidate 5G cells (PCI -> band). Defaults to DEFAULT_5G_CELLS.
+            seed (int, optional): Random seed. Defaults to None.
+        """
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.session_ttl = session_ttl
+        self.reattach_delay = reattach_delay
+        self.cells_5g = cells_5g or DEFAULT_5G_CELLS
+
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        # Typical RSRP and SINR of each 5G cell, applied when the modem attaches
+        self.cell_signal = {
+            pci: (self.random.randint(-110, -80), self.random.randint(0, 25))
+            for pci in self.cells_5g
+        }
+
+        self.data = dict(DEFAULT_SIGNAL_DATA)
+        self.data["RD"] = secrets.token_hex(16)
+        self.data["nr5g_band_mask"] = ""
+        self.reattach_until = 0.0
+        self.pending_5g_cell = None
+        self.ld = None
+        self.sessions = {}
+        self.messages = [self._make_message(index) for index in range(sms_count)]
+
+        self.stats = {"requests": 0, "logins": 0, "errors": 0, "band_locks": 0}
+
+    def _make_message(self, index: int) -> dict:
+        content = f"Message {index}: your data allowance has been updated."
+        return {
+            "id": str(index + 1),
+            "number": "+447000000000",
+            "content": content.encode("utf-16-be").hex().upper(),
+            "tag": "1",
+            "date": "23,01,15,10,00,00,+0",
+        }
+
+    def add_message(self, content: str):
+        """Add a message to the inbox
+
+        Args:
+            content (str): Message text
+        """
+        with self.lock:
+            message = self._make_message(len(self.messages))
+            message["content"] = content.encode("utf-16-be").hex().upper()
+            self.messages.append(message)
+
+    def handle(self, method: str, path: str, cookies: dict, form: dict) -> tuple:
+        """Handle a request
+
+        Args:
+            method (str): "GET" or "POST"
+            path (str): Request path and query string
+            cookies (dict): Request cookies
+            form (dict): Form data (POST requests)
+
+        Returns:
+            tuple: Status code, JSON-serializable body and cookies to set
+        """
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+        with self.lock:
+            self.stats["requests"] += 1
+
+            if self.random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return 500, {"result": "error"}, {}
+
+            url = urlparse(path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            query.update(form)
+
+            if url.path == "/goform/goform_get_cmd_process":
+                return self._handle_get(query, cookies)
+            elif url.path == "/goform/goform_set_cmd_process":
+                return self._handle_set(query, cookies)
+
+            return 404, {}, {}
+
+    def _authenticated(self, cookies: dict) -> bool:
+        login_time = self.sessions.get(cookies.get("stok", ""))
+
+        if login_time is None:
+            return False
+
+        return self.session_ttl is None or time.time() - login_time < self.session_ttl
+
+    def _handle_get(self, query: dict, cookies: dict) -> tuple:
+        cmd = query.get("cmd", "")
+
+        if cmd == "LD":
+            self.ld = secrets.token_hex(32).upper()
+            return 200, {"LD": self.ld}, {}
+
+        if not self._authenticated(cookies):
+            return 403, {"result": "failure"}, {}
+
+        if cmd == "sms_data_total":
+            page = int(query.get("page", 0))
+            per_page = int(query.get("data_per_page", 500))
+            ordered = list(reversed(self.messages))
+            return (
+                200,
+                {"messages": ordered[page * per_page : (page + 1) * per_page]},
+                {},
+            )
+
+        self._evolve()
+
+        return 200, {field: self.data.get(field, "") for field in cmd.split(",")}, {}
+
+    def _handle_set(self, query: dict, cookies: dict) -> tuple:
+        goform_id = query.get("goformId")
+
+        if goform_id == "LOGIN":
+            if self.ld is None or query.get("password") != hash_password(
+                self.password, self.ld
+            ):
+                return 200, {"result": "3"}, {}
+
+            self.ld = None
+            token = secrets.token_hex(16)
+            self.sessions[token] = time.time()
+            self.stats["logins"] += 1
+            return 200, {"result": "0"}, {"stok": token}
+
+        if not self._authenticated(cookies):
+            return 200, {"result": "failure"}, {}
+
+        if query.get("AD") != get_ad_value(self.data):
+            return 200, {"result": "failure"}, {}
+
+        self.data["RD"] = secrets.token_hex(16)
+
+        if goform_id == "WAN_PERFORM_NR5G_BAND_LOCK":
+            self.stats["band_locks"] += 1
+            self._lock_5g_bands(query.get("nr5g_band_mask", ""))
+            return 200, {"result": "success"}, {}
+
+        if goform_id == "LTE_LOCK_CELL_SET":
+            self.data["lte_pci_lock"] = query.get("lte_pci_lock", "")
+            self.data["lte_earfcn_lock"] = query.get("lte_earfcn_lock", "")
+            return 200, {"result": "success"}, {}
+
+        return 200, {"result": "failure"}, {}
+
+    def _lock_5g_bands(self, band_mask: str):
+        self.data["nr5g_band_mask"] = band_mask
+        bands = set(band_mask.split(","))
+
+        candidates = [pci for pci, band in self.cells_5g.items() if band in bands]
+        pci = self.random.choice(candidates) if candidates else None
+
+        self.reattach_until = time.time() + self.reattach_delay
+        self.pending_5g_cell = pci
+
+        self.data["nr5g_pci"] = ""
+        self.data["nr5g_action_band"] = ""
+        if not self.reattach_delay:
+            self._attach_5g()
+
+    def _attach_5g(self):
+        pci = self.pending_5g_cell
+        if pci is not None:
+            self.data["nr5g_pci"] = format(int(pci), "X")
+            self.data["nr5g_action_band"] = f"n{self.cells_5g[pci]}"
+            rsrp, sinr = self.cell_signal[pci]
+            self.data["Z5g_rsrp"] = str(rsrp)
+            self.data["Z5g_SINR"] = f"{sinr:.1f}"
+        self.pending_5g_cell = None
+
+    def _evolve(self):
+        if self.reattach_until and time.time() >= self.reattach_until:
+            self.reattach_until = 0.0
+            self._attach_5g()
+
+        for field, (step, minimum, maximum) in SIGNAL_WALK.items():
+            try:
+                value = float(self.data[field])
+            except ValueError:
+                continue
+
+            value += self.random.uniform(-step, step)
+            value = min(max(value, minimum), maximum)
+
+            if isinstance(step, int):
+                self.data[field] = str(round(value))
+            else:
+                self.data[field] = f"{value:.1f}"
+
+
+class MockRouterRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Headers and body are written separately; without this, keep-alive
+    # connections stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        log.debug(format % args)
+
+    def _respond(self, form: dict):
+        cookies = {
+            name: morsel.value
+            for name, morsel in SimpleCookie(self.headers.get("Cookie", "")).items()
+        }
+
+        status, body, set_cookies = self.server.router.handle(
+            self.command, self.path, cookies, form
+        )
+
+        content = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in set_cookies.items():
+            self.send_header("Set-Cookie", f"{name}={value}; path=/; HttpOnly")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        self._respond({})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        self._respond({k: v[-1] for k, v in form.items()})
+
+
+class MockRouterServer(ThreadingHTTPServer):
+    """HTTP server exposing a `MockRouter`"""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, router: MockRouter) -> None:
+        self.router = router
+        super().__init__(address, MockRouterRequestHandler)
+
+    @property
+    def router_ip(self) -> str:
+        """Address to use as `router_ip` in requests"""
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+
+def start_mock_router(
+    host: str = "127.0.0.1", port: int = 0, **router_options
+) -> MockRouterServer:
+    """Start a mock router in a background thread
+
+    Args:
+        host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+        port (int, optional): Port to listen on. Defaults to 0 (any free port).
+        **router_options: Options passed to `MockRouter`
+
+    Returns:
+        MockRouterServer: Running server; call `shutdown()` to stop it
+    """
+    server = MockRouterServer((host, port), MockRouter(**router_options))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,326 @@
+import random
+import threading
+import time
+import logging
+from collections import namedtuple
+
+from python_zte_mc801a.lib.constants import FIELD_GROUPS
+
+log = logging.getLogger("rich")
+
+
+class TieredPoller:
+    """Polls groups of data fields at their own refresh interval.
+
+    Fast-changing fields (e.g. signal power) are fetched on every poll, while
+    slow-changing ones (e.g. firmware version, APN) are only fetched when their
+    interval has elapsed. Each poll sends a single request for the fields of all
+    due groups and merges the result into a cached snapshot, so callers always
+    get a complete raw data dictionary.
+    """
+
+    def __init__(
+        self, fetch, field_groups: dict = FIELD_GROUPS, clock=time.monotonic
+    ) -> None:
+        """
+        Args:
+            fetch (callable): Called with a list of fields, returns raw data for them (e.g. `RouterSession.get_signal_data`)
+            field_groups (dict, optional): Group name -> (fields, refresh interval in seconds). Defaults to FIELD_GROUPS.
+            clock (callable, optional): Monotonic time source. Defaults to time.monotonic.
+        """
+        self.fetch = fetch
+        self.field_groups = field_groups
+        self.clock = clock
+
+        self.snapshot = {}
+        self.last_polled = {group: None for group in field_groups}
+
+    def due_groups(self, now: float = None) -> list:
+        """Return the groups whose refresh interval has elapsed
+
+        Args:
+            now (float, optional): Current time of `clock`. Defaults to now.
+
+        Returns:
+            list: Group names
+        """
+        now = self.clock() if now is None else now
+
+        return [
+            group
+            for group, (_, interval) in self.field_groups.items()
+            if self.last_polled[group] is None
+            or now - self.last_polled[group] >= interval
+        ]
+
+    def poll(self, force: bool = False) -> dict:
+        """Fetch the fields of due groups and merge them into the snapshot
+
+        Args:
+            force (bool, optional): Whether to fetch all groups. Defaults to False.
+
+        Returns:
+            dict: Copy of the updated snapshot (raw data)
+        """
+        now = self.clock()
+        groups = list(self.field_groups) if force else self.due_groups(now)
+
+        if groups:
+            fields = [
+                field for group in groups for field in self.field_groups[group][0]
+            ]
+            log.debug(f"Polling field groups {', '.join(groups)}")
+
+            self.snapshot.update(self.fetch(fields))
+
+            for group in groups:
+                self.last_polled[group] = now
+
+        return dict(self.snapshot)
+
+    def invalidate(self, *groups: str):
+        """Mark groups as due, e.g. after a configuration change
+
+        Args:
+            *groups (str): Group names. Defaults to all groups.
+        """
+        for group in groups or self.field_groups:
+            self.last_polled[group] = None
+
+
+class PollScheduler:
+    """Decides when to poll a router next, backing off when it struggles.
+
+    The scheduler measures the latency and outcome of each poll. When the router
+    gets slow or fails, the interval between polls grows exponentially up to
+    `max_interval`; once it responds quickly again, the interval shrinks back
+    towards the target `interval`. After `failure_threshold` consecutive
+    failures the circuit opens: polls are skipped for `open_duration` seconds,
+    after which a single probe poll decides whether the circuit closes again.
+    All delays are jittered, so routers polled together drift apart.
+    """
+
+    def __init__(
+        self,
+        interval: float = 5.0,
+        max_interval: float = 60.0,
+        slow_latency: float = 2.0,
+        backoff: float = 2.0,
+        jitter: float = 0.1,
+        failure_threshold: int = 3,
+        open_duration: float = 60.0,
+        smoothing: float = 0.3,
+        clock=time.monotonic,
+    ) -> None:
+        """
+        Args:
+            interval (float, optional): Target seconds between the start of two polls. Defaults to 5.
+            max_interval (float, optional): Maximum seconds between polls while backing off. Defaults to 60.
+            slow_latency (float, optional): Average latency of successful polls in seconds above which to back off. Defaults to 2.
+            backoff (float, optional): Factor by which the interval grows or shrinks. Defaults to 2.
+            jitter (float, optional): Maximum relative random variation of delays. Defaults to 0.1.
+            failure_threshold (int, optional): Consecutive failures opening the circuit. Defaults to 3.
+            open_duration (float, optional): Minimum seconds polls are skipped for once the circuit is open. Defaults to 60.
+            smoothing (float, optional): Weight of the latest poll in the average latency and error rate. Defaults to 0.3.
+            clock (callable, optional): Monotonic time source. Defaults to time.monotonic.
+        """
+        self.target_interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.slow_latency = slow_latency
+        self.backoff = backoff
+        self.jitter = jitter
+        self.failure_threshold = failure_threshold
+        self.open_duration = open_duration
+        self.smoothing = smoothing
+        self.clock = clock
+
+        self.interval = interval
+        self.latency = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.circuit_open = False
+        self.next_poll = None
+
+    @property
+    def state(self) -> str:
+        """Circuit state: "closed", "open" or "half-open" (probe poll due)"""
+        if not self.circuit_open:
+            return "closed"
+        return "half-open" if self.due() else "open"
+
+    def due(self, now: float = None) -> bool:
+        """Return whether the next poll is due
+
+        Args:
+            now (float, optional): Current time of `clock`. Defaults to now.
+        """
+        now = self.clock() if now is None else now
+        return self.next_poll is None or now >= self.next_poll
+
+    def delay(self, now: float = None) -> float:
+        """Return the number of seconds until the next poll is due
+
+        Args:
+            now (float, optional): Current time of `clock`. Defaults to now.
+        """
+        now = self.clock() if now is None else now
+        return 0.0 if self.next_poll is None else max(0.0, self.next_poll - now)
+
+    def record(self, latency: float, error: Exception = None, now: float = None):
+        """Record the outcome of a poll and schedule the next one
+
+        Args:
+            latency (float): Duration of the poll in seconds
+            error (Exception, optional): Error raised by the poll. Defaults to None (success).
+            now (float, optional): Current time of `clock`, at the end of the poll. Defaults to now.
+        """
+        now = self.clock() if now is None else now
+
+        self.error_rate = (
+            self.smoothing * (error is not None)
+            + (1 - self.smoothing) * self.error_rate
+        )
+
+        if error is not None:
+            self.failures += 1
+            self.interval *= self.backoff
+
+            if self.failures >= self.failure_threshold and not self.circuit_open:
+                self.circuit_open = True
+                log.warning(
+                    f"{self.failures} consecutive poll failures, pausing polls for "
+                    f"{max(self.open_duration, self.interval):g}s"
+                )
+        else:
+            if self.circuit_open:
+                log.info("Router responding again, resuming polls")
+
+            # Failed polls (e.g. timeouts) say nothing about the router's latency
+            self.latency = (
+                latency
+                if self.latency is None
+                else self.smoothing * latency + (1 - self.smoothing) * self.latency
+            )
+
+            self.failures = 0
+            self.circuit_open = False
+
+            if self.latency > self.slow_latency:
+                self.interval *= self.backoff
+            else:
+                self.interval /= self.backoff
+
+        self.interval = min(self.max_interval, max(self.target_interval, self.interval))
+
+        delay = (
+            max(self.open_duration, self.interval)
+            if self.circuit_open
+            else self.interval
+        )
+        delay *= 1 + self.jitter * random.uniform(-1, 1)
+
+        # Intervals are measured between the start of two polls
+        self.next_poll = now - latency + delay
+
+    def __str__(self) -> str:
+        latency = "-" if self.latency is None else f"{self.latency:.2f}s"
+        return (
+            f"every {self.interval:g}s, latency {latency}, "
+            f"errors {self.error_rate:.0%}, circuit {self.state}"
+        )
+
+
+# Latest outcome of a `BackgroundPoller`: last successful value and its wall-clock
+# time, error of the last poll (None if it succeeded) and number of successful polls
+PollResult = namedtuple("PollResult", ["value", "timestamp", "error", "sequence"])
+
+
+class BackgroundPoller:
+    """Calls a polling function in a background thread.
+
+    Polls run at a fixed interval, or when a `PollScheduler` says so. Consumers
+    read `latest` whenever they need to, so a slow or unresponsive router never
+    blocks them; they can compare `sequence` numbers to detect new values and
+    `timestamp` to detect stale ones.
+    """
+
+    def __init__(
+        self,
+        poll,
+        interval: float = 5.0,
+        name: str = "poller",
+        schedule: PollScheduler = None,
+    ) -> None:
+        """
+        Args:
+            poll (callable): Called without arguments, returns the polled value
+            interval (float, optional): Seconds between the start of two polls, without `schedule`. Defaults to 5.
+            name (str, optional): Thread name. Defaults to "poller".
+            schedule (PollScheduler, optional): Adaptive schedule of the polls. Defaults to None (fixed interval).
+        """
+        self.poll = poll
+        self.interval = interval
+        self.schedule = schedule
+
+        self._latest = PollResult(None, None, None, 0)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._updated = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    @property
+    def latest(self) -> PollResult:
+        with self._lock:
+            return self._latest
+
+    def start(self) -> "BackgroundPoller":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        """Stop polling; a poll in progress is not interrupted
+
+        Args:
+            timeout (float, optional): Seconds to wait for the thread to finish. Defaults to None (wait forever).
+        """
+        self._stopped.set()
+        self._thread.join(timeout)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Wait for the next poll to complete (successfully or not)
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait. Defaults to None (wait forever).
+
+        Returns:
+            bool: Whether a poll completed
+        """
+        completed = self._updated.wait(timeout)
+        self._updated.clear()
+        return completed
+
+    def _run(self):
+        while not self._stopped.is_set():
+            start = time.monotonic()
+            error = None
+
+            try:
+                value = self.poll()
+            except Exception as e:
+                log.debug(f"Poll failed: {e!r}")
+                error = e
+                with self._lock:
+                    self._latest = self._latest._replace(error=e)
+            else:
+                with self._lock:
+                    self._latest = PollResult(
+                        value, time.time(), None, self._latest.sequence + 1
+                    )
+
+            self._updated.set()
+
+            if self.schedule is not None:
+                self.schedule.record(time.monotonic() - start, error)
+                self._stopped.wait(self.schedule.delay())
+            else:
+                self._stopped.wait(max(0.0, self.interval - (time.monotonic() - start)))
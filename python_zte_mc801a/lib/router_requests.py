@@ -1,21 +1,177 @@
 import requests
-import hashlib
-import codecs
+from requests.adapters import HTTPAdapter
 from retry import retry
-from python_zte_mc801a.lib.data_processing import get_ad_value
-from python_zte_mc801a.lib.constants import ALL_DATA_FIELDS
+from python_zte_mc801a.lib.data_processing import (
+    get_ad_value,
+    get_version_hash,
+    hash_password,
+    decode_sms_messages,
+    SMSCache,
+)
+from python_zte_mc801a.lib.constants import ALL_DATA_FIELDS, VERSION_FIELDS
+from python_zte_mc801a.lib.instrumentation import metrics
+from collections import OrderedDict
+from time import monotonic
+import json
 import logging
+import threading
 
 log = logging.getLogger("rich")
 
 
-@retry(tries=3, delay=2)
-def get_auth_cookies(router_ip: str, user_password: str) -> dict:
+class AuthenticationError(Exception):
+    """Raised when the router rejects the authentication cookies of a request"""
+
+
+WRITE_HEADERS = {
+    "Accept": "*/*",
+    "Accept-Language": "en-GB,en;q=0.9,f^r-FR;q=0.8,fr;q=0.7,en-US;q=0.6",
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+    "Pragma": "no-cache",
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/109.0.0.0 Safari/537.36 Edg/109.0.1518.70",
+    "X-Requested-With": "XMLHttpRequest",
+}
+
+
+def get_write_headers(router_ip: str) -> dict:
+    """Build the headers of a write request, which the router only accepts from its own origin
+
+    Args:
+        router_ip (str): IP (or hostname) of the router
+
+    Returns:
+        dict: Request headers
+    """
+    return {
+        **WRITE_HEADERS,
+        "Origin": f"http://{router_ip}",
+        "Referer": f"http://{router_ip}/",
+    }
+
+
+def get_cmd_url(router_ip: str, cmd: str, multi_data: bool = False) -> str:
+    """Build a `goform_get_cmd_process` URL
+
+    Args:
+        router_ip (str): IP (or hostname) of the router
+        cmd (str): Command, or comma-separated list of fields (with `multi_data`)
+        multi_data (bool, optional): Whether several fields are requested. Defaults to False.
+
+    Returns:
+        str: Request URL
+    """
+    url = f"http://{router_ip}/goform/goform_get_cmd_process?isTest=false&cmd={cmd}"
+
+    if multi_data:
+        url += "&multi_data=1"
+
+    return url
+
+
+def sms_page_url(router_ip: str, page: int = 0, data_per_page: int = 500) -> str:
+    """Build the URL of a page of `sms_data_total` (newest messages first)
+
+    Args:
+        router_ip (str): IP (or hostname) of the router
+        page (int, optional): Page index. Defaults to 0.
+        data_per_page (int, optional): Number of messages per page. Defaults to 500.
+
+    Returns:
+        str: Request URL
+    """
+    return (
+        get_cmd_url(router_ip, "sms_data_total")
+        + f"&page={page}&data_per_page={data_per_page}&mem_store=1&tags=10&order_by=order+by+id+desc"
+    )
+
+
+def parse_read_response(status_code: int, text: str) -> dict:
+    """Parse the JSON body of a read request, checking it was authenticated
+
+    The router either answers with an error status or redirects to the HTML login
+    page instead of returning JSON when the `stok` cookie is no longer valid.
+
+    Args:
+        status_code (int): HTTP status code
+        text (str): Response body
+
+    Raises:
+        AuthenticationError: The session is not (or no longer) authenticated
+
+    Returns:
+        dict: Parsed JSON data
+    """
+    if status_code in (401, 403):
+        raise AuthenticationError(f"Router rejected request ({status_code})")
+
+    try:
+        json_data = json.loads(text)
+    except ValueError:
+        raise AuthenticationError("Router did not return JSON data")
+
+    if isinstance(json_data, dict) and json_data.get("result") == "failure":
+        raise AuthenticationError("Router rejected request")
+
+    return json_data
+
+
+def check_login_response(json_data: dict):
+    """Check the result of a LOGIN request
+
+    Args:
+        json_data (dict): Parsed LOGIN response
+
+    Raises:
+        Exception: Login unsuccessful
+    """
+    if (not "result" in json_data.keys()) or (json_data["result"] != "0"):
+        raise Exception("Login unsuccessful")
+
+
+def set_5g_band_request_data(bands: str, ad: str) -> dict:
+    """Build the form data of a `WAN_PERFORM_NR5G_BAND_LOCK` request
+
+    Args:
+        bands (str): Comma-separated 5G bands
+        ad (str): AD value obtained using `get_ad_value`
+
+    Returns:
+        dict: Form data
+    """
+    return {
+        "isTest": "false",
+        "goformId": "WAN_PERFORM_NR5G_BAND_LOCK",
+        "nr5g_band_mask": bands,
+        "AD": ad,
+    }
+
+
+# Errors worth retrying a login for. Login attempts back off exponentially with
+# jitter; rejected passwords are not retried.
+LOGIN_RETRY_ERRORS = (requests.RequestException, ValueError, KeyError)
+
+
+# Each login is timed as "login" and each attempt as "login_attempt"
+@metrics.timed("login")
+@retry(
+    exceptions=LOGIN_RETRY_ERRORS,
+    tries=3,
+    delay=1,
+    backoff=2,
+    jitter=(0, 1),
+)
+@metrics.timed("login_attempt")
+def get_auth_cookies(
+    router_ip: str, user_password: str, session: requests.Session = None
+) -> dict:
     """Retrieve authentication cookies from the router
 
     Args:
         router_ip (str): IP (or hostname) of the router
         user_password (str): Admin user password
+        session (requests.Session, optional): HTTP session used to send the requests. Defaults to a new connection per request.
 
     Raises:
         Exception: Unable to retrieve authentication cookies
@@ -24,130 +180,575 @@ def get_auth_cookies(router_ip: str, user_password: str) -> dict:
         dict: Authentication cookies
     """
 
+    http = session or requests
+
     # Request the current LD
-    r_ld = requests.get(
-        f"http://{router_ip}/goform/goform_get_cmd_process?isTest=false&cmd=LD",
+    r_ld = http.get(
+        get_cmd_url(router_ip, "LD"),
         cookies={"stok": ""},
         headers={"referer": f"http://{router_ip}/"},
     )
 
-    # The password is hashed twice
-    m = hashlib.sha256()
-    m.update(user_password.encode())
-
-    m2 = hashlib.sha256()
-    m2.update(f'{m.hexdigest().upper()}{r_ld.json()["LD"]}'.encode())
-
-    pwd = m2.hexdigest().upper()
+    pwd = hash_password(user_password, r_ld.json()["LD"])
 
     # Login request
-    r_login = requests.get(
+    r_login = http.get(
         f"http://{router_ip}/goform/goform_set_cmd_process?isTest=false&goformId=LOGIN&password={pwd}",
         cookies={"stok": ""},
         headers={"referer": f"http://{router_ip}/"},
     )
 
-    if (not "result" in r_login.json().keys()) or (r_login.json()["result"] != "0"):
-        raise Exception("Login unsuccessful")
+    check_login_response(r_login.json())
 
     return r_login.cookies.get_dict()
 
 
-def get_signal_data(router_ip: str, auth_cookies: dict) -> dict:
+@metrics.timed("fetch_signal")
+def get_signal_data(
+    router_ip: str,
+    auth_cookies: dict,
+    session: requests.Session = None,
+    fields: list = ALL_DATA_FIELDS,
+) -> dict:
     """Retrieve router data related to signals
 
     Args:
         router_ip (str): IP (or hostname) of the router
         auth_cookies (dict): Authentication cookies obtained using `get_auth_cookies`
+        session (requests.Session, optional): HTTP session used to send the request. Defaults to a new connection.
+        fields (list, optional): Data fields to retrieve. Defaults to ALL_DATA_FIELDS.
+
+    Raises:
+        AuthenticationError: The router rejected the authentication cookies
 
     Returns:
         dict: Signal data dictionary (unprocessed)
     """
+    http = session or requests
 
-    r_data = requests.get(
-        f'http://{router_ip}/goform/goform_get_cmd_process?isTest=false&cmd={",".join(ALL_DATA_FIELDS)}&multi_data=1',
+    r_data = http.get(
+        get_cmd_url(router_ip, ",".join(fields), multi_data=True),
         cookies=auth_cookies,
         headers={f"referer": f"http://{router_ip}/"},
     )
 
-    return r_data.json()
+    return parse_read_response(r_data.status_code, r_data.text)
 
 
-def get_latest_sms_messages(router_ip, auth_cookies, n=3) -> list:
+@metrics.timed("fetch_sms")
+def get_sms_page(
+    router_ip: str,
+    auth_cookies: dict,
+    page: int = 0,
+    data_per_page: int = 500,
+    session: requests.Session = None,
+) -> list:
+    """Retrieve a page of raw SMS messages (newest first), without decoding them
+
+    Args:
+        router_ip (str): IP (or hostname) of the router
+        auth_cookies (dict): Authentication cookies obtained using `get_auth_cookies`
+        page (int, optional): Page index. Defaults to 0.
+        data_per_page (int, optional): Number of messages per page. Defaults to 500.
+        session (requests.Session, optional): HTTP session used to send the request. Defaults to a new connection.
+
+    Raises:
+        AuthenticationError: The router rejected the authentication cookies
+
+    Returns:
+        list: Raw messages, with hex content
+    """
+    http = session or requests
+
+    r_data = http.get(
+        sms_page_url(router_ip, page=page, data_per_page=data_per_page),
+        cookies=auth_cookies,
+        headers={f"referer": f"http://{router_ip}/"},
+    )
+
+    return parse_read_response(r_data.status_code, r_data.text)["messages"]
+
+
+def get_latest_sms_messages(
+    router_ip, auth_cookies, n=3, session: requests.Session = None
+) -> list:
     """Retrieve latest SMS messages
 
     Args:
         router_ip (_type_): IP (or hostname) of the router
         auth_cookies (_type_): Authentication cookies obtained using `get_auth_cookies`
         n (int, optional): Number of messages to retrieve. Defaults to 3.
+        session (requests.Session, optional): HTTP session used to send the request. Defaults to a new connection.
+
+    Raises:
+        AuthenticationError: The router rejected the authentication cookies
 
     Returns:
         list: Dictionaries of messages
     """
-    r_data = requests.get(
-        f"http://{router_ip}/goform/goform_get_cmd_process?isTest=false&cmd=sms_data_total&page=0&data_per_page=500&mem_store=1&tags=10&order_by=order+by+id+desc",
+    messages = get_sms_page(router_ip, auth_cookies, data_per_page=n, session=session)
+
+    return decode_sms_messages(messages, n)
+
+
+def get_rd_value(
+    router_ip: str, auth_cookies: dict, session: requests.Session = None
+) -> str:
+    """Retrieve the RD value, which the router renews after each write request
+
+    Args:
+        router_ip (str): IP (or hostname) of the router
+        auth_cookies (dict): Authentication cookies obtained using `get_auth_cookies`
+        session (requests.Session, optional): HTTP session used to send the request. Defaults to a new connection.
+
+    Raises:
+        AuthenticationError: The router rejected the authentication cookies
+
+    Returns:
+        str: RD value
+    """
+    http = session or requests
+
+    r_data = http.get(
+        get_cmd_url(router_ip, "RD"),
         cookies=auth_cookies,
         headers={f"referer": f"http://{router_ip}/"},
     )
 
-    json_data = r_data.json()
+    return parse_read_response(r_data.status_code, r_data.text)["RD"]
 
-    messages = json_data["messages"]
 
-    if len(messages) > n:
-        messages = messages[0:n]
+def get_ad_token(
+    router_ip: str,
+    auth_cookies: dict,
+    version_hash: str = None,
+    session: requests.Session = None,
+) -> str:
+    """Derive the AD value of the next write request
 
-    # Convert hex representation to ASCII
-    for index, msg in enumerate(messages):
-        messages[index]["content"] = str(
-            codecs.decode(msg["content"], "hex").replace(b"\x00", b""), "latin-1"
+    All write requests must obtain their AD value this way. When `version_hash`
+    is provided, only `RD` is requested from the router.
+
+    Args:
+        router_ip (str): IP (or hostname) of the router
+        auth_cookies (dict): Authentication cookies obtained using `get_auth_cookies`
+        version_hash (str, optional): Cached version hash (see `get_version_hash`). Defaults to None (version fields requested along with RD).
+        session (requests.Session, optional): HTTP session used to send the request. Defaults to a new connection.
+
+    Raises:
+        AuthenticationError: The router rejected the authentication cookies
+
+    Returns:
+        str: AD value
+    """
+    if version_hash is None:
+        raw_data = get_signal_data(
+            router_ip, auth_cookies, session=session, fields=VERSION_FIELDS + ["RD"]
         )
+        return get_ad_value(raw_data)
 
-    return messages
+    rd = get_rd_value(router_ip, auth_cookies, session=session)
+    return get_ad_value({"RD": rd}, version_hash)
 
 
-def set_5g_band(
-    router_ip: str, auth_cookies: dict, bands: str, verbose: bool = False
-) -> bool:
-    raw_data = get_signal_data(router_ip=router_ip, auth_cookies=auth_cookies)
-    ad = get_ad_value(raw_data)
-
-    headers = {
-        "Accept": "*/*",
-        "Accept-Language": "en-GB,en;q=0.9,f^r-FR;q=0.8,fr;q=0.7,en-US;q=0.6",
-        "Cache-Control": "no-cache",
-        "Connection": "keep-alive",
-        "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-        "Origin": "http://192.168.0.1",
-        "Pragma": "no-cache",
-        "Referer": "http://192.168.0.1/",
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/109.0.0.0 Safari/537.36 Edg/109.0.1518.70",
-        "X-Requested-With": "XMLHttpRequest",
-    }
+def post_write_request(
+    router_ip: str,
+    auth_cookies: dict,
+    request_data: dict,
+    session: requests.Session = None,
+) -> dict:
+    """Send a write request to `goform_set_cmd_process`
 
-    request_data = {
-        "isTest": "false",
-        "goformId": "WAN_PERFORM_NR5G_BAND_LOCK",
-        "nr5g_band_mask": bands,
-        "AD": ad,
-    }
+    Args:
+        router_ip (str): IP (or hostname) of the router
+        auth_cookies (dict): Authentication cookies obtained using `get_auth_cookies`
+        request_data (dict): Form data, including the AD value obtained using `get_ad_token`
+        session (requests.Session, optional): HTTP session used to send the request. Defaults to a new connection.
 
-    r = requests.post(
+    Returns:
+        dict: Parsed JSON response, empty if the request failed
+    """
+    http = session or requests
+
+    r = http.post(
         f"http://{router_ip}/goform/goform_set_cmd_process",
         data=request_data,
         cookies=auth_cookies,
-        headers=headers,
+        headers=get_write_headers(router_ip),
     )
 
-    if (
-        r.status_code == 200
-        and "result" in r.json().keys()
-        and r.json()["result"] == "success"
-    ):
+    try:
+        json_data = r.json()
+    except ValueError:
+        json_data = {}
+
+    if r.status_code != 200 or not isinstance(json_data, dict):
+        log.debug(f"Write request failed ({r.status_code}): {r.text}")
+        return {}
+
+    return json_data
+
+
+def set_5g_band(
+    router_ip: str,
+    auth_cookies: dict,
+    bands: str,
+    verbose: bool = False,
+    session: requests.Session = None,
+    version_hash: str = None,
+) -> bool:
+    """Set the 5G band mask
+
+    Args:
+        router_ip (str): IP (or hostname) of the router
+        auth_cookies (dict): Authentication cookies obtained using `get_auth_cookies`
+        bands (str): Comma-separated 5G bands (e.g. "1,3,78")
+        verbose (bool, optional): Whether messages should be logged. Defaults to False.
+        session (requests.Session, optional): HTTP session used to send the requests. Defaults to a new connection per request.
+        version_hash (str, optional): Cached version hash (see `get_ad_token`). Defaults to None.
+
+    Returns:
+        bool: Success
+    """
+    ad = get_ad_token(router_ip, auth_cookies, version_hash, session=session)
+
+    json_data = post_write_request(
+        router_ip, auth_cookies, set_5g_band_request_data(bands, ad), session=session
+    )
+
+    if json_data.get("result") == "success":
         if verbose:
             log.info(f"Successfully set 5G bands to {bands}")
         return True
     else:
         if verbose:
-            log.error(f"Error setting 5G band to {bands}: {r.content}")
+            log.error(f"Error setting 5G band to {bands}: {json_data}")
         return False
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTP adapter applying a default timeout to requests that do not set one"""
+
+    def __init__(self, *args, timeout: float = None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class ResponseCache:
+    """Memoizes the results of read requests with a TTL, across routers.
+
+    Entries are keyed by router, request function and arguments, and the least
+    recently used entries are evicted beyond `max_entries`. Callers asking for an
+    entry while it is being fetched wait for that fetch instead of sending the
+    same request again. Errors are cached for the TTL too, so a failing router
+    is not hammered by every caller.
+    """
+
+    def __init__(self, ttl: float = 1.0, max_entries: int = 256) -> None:
+        """
+        Args:
+            ttl (float, optional): Seconds a result is reused for. Defaults to 1.
+            max_entries (int, optional): Maximum number of cached results. Defaults to 256.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.fetch_count = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key: tuple, fetch) -> tuple:
+        """Return the cached result of a request, fetching it if missing or expired
+
+        Args:
+            key (tuple): Cache key, starting with the router IP
+            fetch (callable): Called without arguments to fetch the result
+
+        Raises:
+            Exception: Error raised by the latest fetch
+
+        Returns:
+            tuple: Result and its age in seconds
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                entry = _CacheEntry()
+                self._entries[key] = entry
+
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+
+        # Only the first caller of an expired entry fetches; others wait for it
+        with entry.lock:
+            if entry.fetched_at is None or monotonic() - entry.fetched_at >= self.ttl:
+                self.fetch_count += 1
+                try:
+                    entry.value, entry.error = fetch(), None
+                except Exception as e:
+                    entry.value, entry.error = None, e
+                entry.fetched_at = monotonic()
+
+            if entry.error is not None:
+                raise entry.error
+
+            return entry.value, monotonic() - entry.fetched_at
+
+    def invalidate(self, router_ip: str):
+        """Drop the cached results of a router, e.g. after a write request
+
+        Args:
+            router_ip (str): IP (or hostname) of the router
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == router_ip]:
+                del self._entries[key]
+
+
+class _CacheEntry:
+    __slots__ = ("lock", "value", "error", "fetched_at")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.value = None
+        self.error = None
+        self.fetched_at = None
+
+
+# Cache shared by the sessions of `get_router_session`; the TTL is short enough
+# for loops polling once per second to always get fresh data
+response_cache = ResponseCache(ttl=0.5)
+
+
+class RouterSession:
+    """Authenticated session to a single router over pooled keep-alive connections.
+
+    The session logs in lazily on first use and reuses the `stok` cookie for all
+    subsequent requests. When the router rejects the cookie, the session logs in
+    again and retries the request once.
+
+    With a `ResponseCache`, reads within the cache TTL reuse the previous result
+    (see `call_cached`) and writes invalidate the cached results of the router.
+
+    Example:
+        session = RouterSession("192.168.0.1", "ADMIN_PASSWORD")
+        raw_data = session.get_signal_data()
+    """
+
+    def __init__(
+        self,
+        router_ip: str,
+        user_password: str,
+        pool_maxsize: int = 4,
+        timeout: float = None,
+        cache: ResponseCache = None,
+    ) -> None:
+        """
+        Args:
+            router_ip (str): IP (or hostname) of the router
+            user_password (str): Admin user password
+            pool_maxsize (int, optional): Maximum number of pooled connections. Defaults to 4.
+            timeout (float, optional): Timeout in seconds of each HTTP request. Defaults to None (no timeout).
+            cache (ResponseCache, optional): Cache of read results. Defaults to None (no caching).
+        """
+        self.router_ip = router_ip
+        self.cache = cache
+        self.user_password = user_password
+        self.auth_cookies = None
+        self.login_count = 0
+        self.version_hash = None
+        self.sms_cache = SMSCache()
+        self._login_lock = threading.Lock()
+
+        self.http = requests.Session()
+        adapter = TimeoutHTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_maxsize, timeout=timeout
+        )
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close all pooled connections"""
+        self.http.close()
+
+    def login(self, rejected_cookies: dict = None) -> dict:
+        """Log in to the router, replacing any existing authentication cookies
+
+        Concurrent callers share a single login: if the cookies were already
+        replaced since `rejected_cookies` were handed out, no new login is made.
+
+        Args:
+            rejected_cookies (dict, optional): Cookies the router just rejected. Defaults to None.
+
+        Returns:
+            dict: Authentication cookies
+        """
+        with self._login_lock:
+            if self.auth_cookies is None or self.auth_cookies is rejected_cookies:
+                self.auth_cookies = get_auth_cookies(
+                    router_ip=self.router_ip,
+                    user_password=self.user_password,
+                    session=self.http,
+                )
+                self.login_count += 1
+
+                # Firmware can only change across a reboot, which ends the session
+                self.version_hash = None
+
+            return self.auth_cookies
+
+    def get_auth_cookies(self) -> dict:
+        """Return the current authentication cookies, logging in if required
+
+        Returns:
+            dict: Authentication cookies
+        """
+        if self.auth_cookies is None:
+            return self.login()
+        return self.auth_cookies
+
+    def call(self, func, **kwargs):
+        """Call a request function with this session's router, cookies and connections
+
+        Args:
+            func (callable): Function accepting `router_ip`, `auth_cookies` and `session` keyword arguments (e.g. `get_signal_data`)
+            **kwargs: Additional keyword arguments passed to `func`
+
+        Returns:
+            Any: Return value of `func`
+        """
+        auth_cookies = self.get_auth_cookies()
+
+        try:
+            return func(
+                router_ip=self.router_ip,
+                auth_cookies=auth_cookies,
+                session=self.http,
+                **kwargs,
+            )
+        except AuthenticationError:
+            log.debug(f"Session for {self.router_ip} rejected, logging in again")
+            metrics.increment("reauth")
+            return func(
+                router_ip=self.router_ip,
+                auth_cookies=self.login(rejected_cookies=auth_cookies),
+                session=self.http,
+                **kwargs,
+            )
+
+    def call_cached(self, func, **kwargs) -> tuple:
+        """Call a read request function through the session's `ResponseCache`
+
+        Args:
+            func (callable): Read request function (see `call`)
+            **kwargs: Additional keyword arguments passed to `func`
+
+        Returns:
+            tuple: Return value of `func` and its age in seconds (0 without cache)
+        """
+        if self.cache is None:
+            return self.call(func, **kwargs), 0.0
+
+        key = (
+            self.router_ip,
+            func.__name__,
+            *(
+                (name, tuple(value) if isinstance(value, list) else value)
+                for name, value in sorted(kwargs.items())
+            ),
+        )
+
+        return self.cache.get(key, lambda: self.call(func, **kwargs))
+
+    def invalidate_cache(self):
+        """Drop the cached read results of this router"""
+        if self.cache is not None:
+            self.cache.invalidate(self.router_ip)
+
+    def get_signal_data(self, fields: list = ALL_DATA_FIELDS) -> dict:
+        """Retrieve router data related to signals (see `get_signal_data`)"""
+        return self.call_cached(get_signal_data, fields=fields)[0]
+
+    def get_latest_sms_messages(self, n: int = 3) -> list:
+        """Retrieve latest SMS messages (see `get_latest_sms_messages`)
+
+        Only `n` messages are requested, and messages already seen by this
+        session are not decoded again (see `SMSCache`).
+        """
+        messages, _ = self.call_cached(get_sms_page, data_per_page=n)
+        return self.sms_cache.decode(messages)
+
+    def get_version_hash(self) -> str:
+        """Return the version hash of the AD value, retrieving it on first use
+
+        Returns:
+            str: Version hash (see `get_version_hash`)
+        """
+        if self.version_hash is None:
+            raw_data = self.call(get_signal_data, fields=VERSION_FIELDS)
+            self.version_hash = get_version_hash(raw_data)
+        return self.version_hash
+
+    def get_ad_token(self) -> str:
+        """Derive the AD value of the next write request (see `get_ad_token`)"""
+        return self.call(self._with_version_hash(get_ad_token))
+
+    def set_5g_band(self, bands: str, verbose: bool = False) -> bool:
+        """Set the 5G band mask (see `set_5g_band`)
+
+        Cached reads are invalidated once the request was sent, as they may
+        predate the change.
+        """
+        try:
+            return self.call(
+                self._with_version_hash(set_5g_band), bands=bands, verbose=verbose
+            )
+        finally:
+            self.invalidate_cache()
+
+    def _with_version_hash(self, func):
+        # The hash is looked up on each attempt, as logging in again resets it
+        def request(**kwargs):
+            return func(version_hash=self.get_version_hash(), **kwargs)
+
+        return request
+
+
+_router_sessions = {}
+
+
+def get_router_session(router_ip: str, user_password: str) -> RouterSession:
+    """Return the shared `RouterSession` for a router, creating it on first use
+
+    Shared sessions read through `response_cache`, so callers asking for the
+    same data at nearly the same time share a single request.
+
+    Args:
+        router_ip (str): IP (or hostname) of the router
+        user_password (str): Admin user password
+
+    Returns:
+        RouterSession: Shared session for this router and password
+    """
+    key = (router_ip, user_password)
+
+    if key not in _router_sessions:
+        _router_sessions[key] = RouterSession(
+            router_ip, user_password, cache=response_cache
+        )
+
+    return _router_sessions[key]
@@ -0,0 +1,303 @@
+"""Survey of 5G band masks: which cell each one reaches, and how well it performs.
+
+Masks are compared by successive halving: every surviving mask is sampled for a
+short round, the worse half is dropped and the next round samples the rest twice
+as long. Samples are cached per cell, so masks reaching the same cell share
+their measurements, and a persisted cache lets later surveys skip cells that
+were measured recently.
+"""
+
+import json
+import math
+import statistics
+import time
+from itertools import combinations
+from pathlib import Path
+import logging
+
+from python_zte_mc801a.lib.data_processing import from_hex, to_number
+from python_zte_mc801a.lib.helpers import wait_for_5g_settle
+from python_zte_mc801a.lib.router_requests import RouterSession
+
+log = logging.getLogger("rich")
+
+# Raw data fields read for each survey sample
+SURVEY_FIELDS = [
+    "cell_id",
+    "nr5g_pci",
+    "nr5g_action_band",
+    "nr5g_action_channel",
+    "Z5g_rsrp",
+    "Z5g_SINR",
+]
+
+
+def candidate_masks(bands: list, max_size: int = 2) -> list:
+    """List band masks made of up to `max_size` bands, plus all bands together
+
+    Args:
+        bands (list): 5G bands (e.g. ["1", "28", "78"])
+        max_size (int, optional): Maximum number of bands per mask. Defaults to 2.
+
+    Returns:
+        list: Comma-separated band masks
+    """
+    masks = [
+        ",".join(combination)
+        for size in range(1, min(max_size, len(bands)) + 1)
+        for combination in combinations(bands, size)
+    ]
+
+    if len(bands) > max_size:
+        masks.append(",".join(bands))
+
+    return masks
+
+
+class CellCache:
+    """Signal samples (RSRP, SINR) per 5G cell, optionally persisted as JSON.
+
+    Cells are keyed by LTE anchor cell, 5G PCI and channel. Samples older than
+    `max_age` are dropped, and only the latest `max_samples` of each cell are
+    kept, so the cache does not grow with every survey.
+    """
+
+    def __init__(
+        self, path: str = None, max_age: float = 86400, max_samples: int = 256
+    ) -> None:
+        """
+        Args:
+            path (str, optional): JSON file the cache is loaded from and saved to. Defaults to None (in memory only).
+            max_age (float, optional): Seconds after which samples are dropped. Defaults to 86400.
+            max_samples (int, optional): Maximum number of samples kept per cell. Defaults to 256.
+        """
+        self.path = path
+        self.max_age = max_age
+        self.max_samples = max_samples
+        self.cells = {}
+
+        if path is not None and Path(path).exists():
+            with open(path) as f:
+                self.cells = json.load(f)
+            self.prune()
+
+    @staticmethod
+    def key(raw_data: dict) -> str:
+        return "/".join(
+            str(raw_data.get(field, ""))
+            for field in ["cell_id", "nr5g_pci", "nr5g_action_channel"]
+        )
+
+    def samples(self, key: str) -> list:
+        """Return the fresh samples of a cell
+
+        Args:
+            key (str): Cell key (see `key`)
+
+        Returns:
+            list: [timestamp, rsrp, sinr] lists, oldest first
+        """
+        oldest = time.time() - self.max_age
+        return [s for s in self.cells.get(key, []) if s[0] >= oldest]
+
+    def add(self, key: str, rsrp: float, sinr: float):
+        samples = self.cells.setdefault(key, [])
+        samples.append([time.time(), rsrp, sinr])
+        del samples[: -self.max_samples]
+
+    def prune(self):
+        """Drop stale samples, and cells left without samples"""
+        oldest = time.time() - self.max_age
+        cells = {}
+
+        for key, samples in self.cells.items():
+            samples = [s for s in samples if s[0] >= oldest][-self.max_samples :]
+            if samples:
+                cells[key] = samples
+
+        self.cells = cells
+
+    def save(self):
+        self.prune()
+
+        if self.path is not None:
+            with open(self.path, "w") as f:
+                json.dump(self.cells, f)
+
+
+def measure_mask(
+    session: RouterSession,
+    mask: str,
+    n_samples: int,
+    cache: CellCache,
+    sample_interval: float = 1.0,
+    settle_timeout: float = 20.0,
+) -> dict:
+    """Apply a band mask, wait for the modem to settle and sample the cell reached
+
+    Only the samples the cell is missing in `cache` are taken.
+
+    Args:
+        session (RouterSession): Authenticated router session
+        mask (str): Comma-separated 5G bands
+        n_samples (int): Number of samples wanted for the cell
+        cache (CellCache): Samples per cell
+        sample_interval (float, optional): Seconds between samples. Defaults to 1.
+        settle_timeout (float, optional): Maximum seconds to wait for the modem to settle. Defaults to 20.
+
+    Returns:
+        dict: Mask, cell reached (None if no 5G cell) and its samples
+    """
+    previous_pci = from_hex(
+        session.get_signal_data(fields=["nr5g_pci"]).get("nr5g_pci")
+    )
+
+    if not session.set_5g_band(bands=mask):
+        log.warning(f"Could not set 5G bands to {mask}")
+        return {"mask": mask, "pci": None, "band": None, "cell": None, "samples": []}
+
+    settle = wait_for_5g_settle(
+        session, None, previous_pci=previous_pci, timeout=settle_timeout
+    )
+
+    raw_data = session.get_signal_data(fields=SURVEY_FIELDS)
+    pci = from_hex(raw_data.get("nr5g_pci"))
+
+    if not settle.settled or pci is None:
+        return {"mask": mask, "pci": pci, "band": None, "cell": None, "samples": []}
+
+    cell = CellCache.key(raw_data)
+    missing = n_samples - len(cache.samples(cell))
+
+    while missing > 0:
+        if from_hex(raw_data.get("nr5g_pci")) != pci:
+            log.debug(f"Mask {mask}: cell changed during sampling, stopping")
+            break
+
+        rsrp = to_number(raw_data.get("Z5g_rsrp"))
+        sinr = to_number(raw_data.get("Z5g_SINR"))
+
+        if rsrp is not None and sinr is not None:
+            cache.add(cell, rsrp, sinr)
+            missing -= 1
+
+        if missing > 0:
+            time.sleep(sample_interval)
+            raw_data = session.get_signal_data(fields=SURVEY_FIELDS)
+
+    return {
+        "mask": mask,
+        "pci": pci,
+        "band": raw_data.get("nr5g_action_band"),
+        "cell": cell,
+        "samples": cache.samples(cell)[-n_samples:],
+    }
+
+
+def score(result: dict) -> tuple:
+    """Ranking key of a measured mask: median SINR, then median RSRP
+
+    Args:
+        result (dict): Result obtained using `measure_mask`
+
+    Returns:
+        tuple: Higher is better; masks without samples rank last
+    """
+    if not result["samples"]:
+        return (-math.inf, -math.inf)
+
+    return (
+        statistics.median(s[2] for s in result["samples"]),
+        statistics.median(s[1] for s in result["samples"]),
+    )
+
+
+def survey_bands(
+    session: RouterSession,
+    masks: list,
+    samples_per_round: int = 3,
+    sample_interval: float = 1.0,
+    max_rounds: int = 0,
+    settle_timeout: float = 20.0,
+    cache: CellCache = None,
+) -> list:
+    """Rank 5G band masks by the signal of the cell each one reaches
+
+    Masks reaching no 5G cell are dropped after their first measurement. Each
+    round, the better half of the remaining masks is kept and sampled twice as
+    many times, until the remaining masks all reach the same cell or
+    `max_rounds` is reached.
+
+    Args:
+        session (RouterSession): Authenticated router session
+        masks (list): Candidate masks (e.g. from `candidate_masks`)
+        samples_per_round (int, optional): Samples per mask in the first round. Defaults to 3.
+        sample_interval (float, optional): Seconds between samples. Defaults to 1.
+        max_rounds (int, optional): Maximum number of rounds, 0 for no limit. Defaults to 0.
+        settle_timeout (float, optional): Maximum seconds to wait for the modem to settle. Defaults to 20.
+        cache (CellCache, optional): Samples per cell. Defaults to a new in-memory cache.
+
+    Returns:
+        list: Results, best first, with median RSRP and SINR and the round each mask reached
+    """
+    cache = cache or CellCache()
+    results = {}
+    survivors = list(masks)
+    n_samples = samples_per_round
+    survey_round = 1
+
+    # Measurements are saved even if the survey is interrupted
+    try:
+        while survivors:
+            log.info(
+                f"Round {survey_round}: {len(survivors)} masks, {n_samples} samples each"
+            )
+
+            for mask in survivors:
+                result = measure_mask(
+                    session,
+                    mask,
+                    n_samples,
+                    cache,
+                    sample_interval=sample_interval,
+                    settle_timeout=settle_timeout,
+                )
+                result["round"] = survey_round
+                results[mask] = result
+                log.info(f"Mask {mask}: PCI {result['pci']}, score {score(result)}")
+
+            survivors = sorted(
+                (mask for mask in survivors if results[mask]["samples"]),
+                key=lambda mask: score(results[mask]),
+                reverse=True,
+            )
+
+            # Stop once the remaining masks all reach the same cell
+            if (
+                len({results[mask]["cell"] for mask in survivors}) <= 1
+                or survey_round == max_rounds
+            ):
+                break
+
+            survivors = survivors[: math.ceil(len(survivors) / 2)]
+            n_samples *= 2
+            survey_round += 1
+    finally:
+        cache.save()
+
+    ranked = sorted(
+        results.values(), key=lambda r: (r["round"], score(r)), reverse=True
+    )
+
+    return [
+        {
+            "mask": r["mask"],
+            "pci": r["pci"],
+            "band": r["band"],
+            "rsrp": score(r)[1] if r["samples"] else None,
+            "sinr": score(r)[0] if r["samples"] else None,
+            "samples": len(r["samples"]),
+            "round": r["round"],
+        }
+        for r in ranked
+    ]
@@ -0,0 +1,154 @@
+"""Ordered router configuration changes, applied and verified together.
+
+Example:
+    with RouterSession("192.168.0.1", "ADMIN_PASSWORD") as session:
+        result = execute_write_plan(
+            session, [set_5g_band_step("78"), lock_lte_cell_step(291, 1617)]
+        )
+"""
+
+from dataclasses import dataclass, field
+from time import perf_counter
+import logging
+
+from python_zte_mc801a.lib.router_requests import (
+    RouterSession,
+    get_ad_token,
+    get_signal_data,
+    post_write_request,
+    set_5g_band_request_data,
+)
+
+log = logging.getLogger("rich")
+
+
+@dataclass
+class WriteStep:
+    """One write request of a plan"""
+
+    name: str
+    # Form data of the request, without the AD value
+    form: dict
+    # Raw data field -> value expected after the plan has run
+    expected: dict = field(default_factory=dict)
+
+
+def set_5g_band_step(bands: str) -> WriteStep:
+    """Build a step setting the 5G band mask
+
+    Args:
+        bands (str): Comma-separated 5G bands (e.g. "1,3,78")
+
+    Returns:
+        WriteStep: `WAN_PERFORM_NR5G_BAND_LOCK` step
+    """
+    return WriteStep(
+        name=f"set_5g_band {bands}",
+        form=set_5g_band_request_data(bands, ad=None),
+        expected={"nr5g_band_mask": bands},
+    )
+
+
+def lock_lte_cell_step(pci: int, earfcn: int) -> WriteStep:
+    """Build a step locking the LTE cell (applied by the router after a reboot)
+
+    Args:
+        pci (int): LTE PCI (decimal)
+        earfcn (int): LTE EARFCN
+
+    Returns:
+        WriteStep: `LTE_LOCK_CELL_SET` step
+    """
+    return WriteStep(
+        name=f"lock_lte_cell {pci}@{earfcn}",
+        form={
+            "isTest": "false",
+            "goformId": "LTE_LOCK_CELL_SET",
+            "lte_pci_lock": str(pci),
+            "lte_earfcn_lock": str(earfcn),
+        },
+        expected={"lte_pci_lock": str(pci), "lte_earfcn_lock": str(earfcn)},
+    )
+
+
+def execute_write_plan(
+    session: RouterSession,
+    steps: list,
+    verify: bool = True,
+    stop_on_error: bool = True,
+) -> dict:
+    """Apply write steps in order over one session, then verify them with one read
+
+    Every step is signed with a fresh AD value obtained using `get_ad_token` with
+    the session's cached version hash, i.e. a single `RD` read per step. Once all
+    steps have run, the fields they are expected to change are read back in one
+    request; when several steps set a field, the last one wins.
+
+    Args:
+        session (RouterSession): Router session
+        steps (list): `WriteStep`s, applied in order
+        verify (bool, optional): Whether to read back expected values. Defaults to True.
+        stop_on_error (bool, optional): Whether to skip the remaining steps after a failure. Defaults to True.
+
+    Returns:
+        dict: Per-step results and timings (in seconds), read-back mismatches and overall success
+    """
+    plan_start = perf_counter()
+    results = []
+    expected = {}
+
+    version_hash = session.get_version_hash()
+
+    for step in steps:
+        start = perf_counter()
+        ad = session.call(get_ad_token, version_hash=version_hash)
+        ad_duration = perf_counter() - start
+
+        response = session.call(
+            post_write_request, request_data={**step.form, "AD": ad}
+        )
+        success = response.get("result") == "success"
+
+        results.append(
+            {
+                "name": step.name,
+                "success": success,
+                "response": response,
+                "ad_duration": ad_duration,
+                "duration": perf_counter() - start,
+            }
+        )
+        log.debug(f"Write step {step.name}: {response}")
+
+        if success:
+            expected.update(step.expected)
+        elif stop_on_error:
+            log.error(f"Write step {step.name} failed: {response}")
+            break
+
+    # Cached reads predate the changes
+    session.invalidate_cache()
+
+    mismatches = {}
+    verify_duration = None
+
+    if verify and expected:
+        start = perf_counter()
+        readback = session.call(get_signal_data, fields=list(expected))
+        verify_duration = perf_counter() - start
+
+        mismatches = {
+            name: {"expected": value, "actual": readback.get(name)}
+            for name, value in expected.items()
+            if readback.get(name) != value
+        }
+
+    return {
+        "success": len(results) == len(steps)
+        and all(r["success"] for r in results)
+        and not mismatches,
+        "steps": results,
+        "mismatches": mismatches,
+        "verify_duration": verify_duration,
+        "duration": perf_counter() - plan_start,
+    }
@@ -1,19 +1,34 @@
 import typer
 import yaml
 
-from python_zte_mc801a.lib.data_processing import process_data
-from python_zte_mc801a.lib.router_requests import get_auth_cookies, get_signal_data
+from python_zte_mc801a.lib.data_processing import process_data, process_sample
+from python_zte_mc801a.lib.router_requests import RouterSession, get_router_session
 
 from python_zte_mc801a.lib.helpers import force_5g_pci_selection
+from python_zte_mc801a.lib.survey import CellCache, candidate_masks, survey_bands
+from python_zte_mc801a.lib.mock_router import MockRouter, MockRouterServer
 
 from python_zte_mc801a.client.live import show_live, LIVE_VISUALIZATIONS
 
-from python_zte_mc801a.client.data_io import check_config
+from python_zte_mc801a.client.fleet import show_fleet
+from python_zte_mc801a.client.exporter import MetricsExporter, MetricsServer
+from python_zte_mc801a.client.benchmark import run_benchmarks, write_benchmark_results
+from python_zte_mc801a.client.stats import collect_stats, stats_table
+from python_zte_mc801a.client.profiling import CommandProfiler
+from python_zte_mc801a.lib.instrumentation import metrics, JSONLinesSink
+
+from python_zte_mc801a.client.data_io import check_config, load_inventory
+from python_zte_mc801a.client.sqlite_store import SQLiteStore
+from python_zte_mc801a.client.sms_archive import SMSArchive, sync_sms
 
 from rich.pretty import pprint
 from rich.console import Console
 from rich.prompt import Prompt
 from rich.padding import Padding
+from rich.table import Table
+
+from pathlib import Path
+from datetime import datetime, timedelta
 
 from python_zte_mc801a.lib.constants import ALL_5G_BANDS
 
@@ -33,10 +48,24 @@ console = Console()
 
 
 @app.callback()
-def callback():
+def callback(
+    ctx: typer.Context,
+    profile: str = typer.Option(
+        None,
+        help="Profile the command: cProfile stats file, or stage trace if ending in .json",
+    ),
+    profile_ticks: int = typer.Option(
+        0, help="Exit `live` after this many dashboard updates (0: run until stopped)"
+    ),
+):
     """
     ZTE MC801a Management Tool
     """
+    ctx.obj = {"profile_ticks": profile_ticks}
+
+    if profile:
+        profiler = CommandProfiler(profile).start()
+        ctx.call_on_close(profiler.stop)
 
 
 @app.command()
@@ -67,7 +96,9 @@ def setup():
     help="Try to connect to a target 5G PCI by alternatively setting 5G bands to one of two sets. Useful when a certain PCI is preferred over another (e.g. for performance reason)"
 )
 def force_5g_pci(
-    target_pci: str = typer.Argument(..., help="PCI to target", metavar="TEXT"),
+    target_pci: int = typer.Argument(
+        ..., help="PCI to target (decimal)", min=0, max=1007
+    ),
     band_set_1: str = typer.Argument(
         ...,
         help="First set of bands to alternative between (comma separated, e.g. 1,3,78)",
@@ -79,22 +110,91 @@ def force_5g_pci(
     ),
     router_ip: str = typer.Option(None),
     password: str = typer.Option(None),
+    max_attempts: int = typer.Option(30, help="Maximum number of band changes"),
+    settle_timeout: float = typer.Option(
+        30, help="Maximum seconds to wait for the modem to settle after a change"
+    ),
 ):
     config = check_config(router_ip, password)
 
     if config:
-        cookies = get_auth_cookies(config["router_ip"], config["password"])
-        data = get_signal_data(config["router_ip"], cookies)
-        processed_data = process_data(raw_data=data)
-
+        session = get_router_session(config["router_ip"], config["password"])
+        data = session.get_signal_data()
         force_5g_pci_selection(
             target_pci=target_pci,
-            processed_data=processed_data,
-            router_ip=config["router_ip"],
-            auth_cookies=cookies,
+            sample=process_sample(raw_data=data),
+            session=session,
             bands_5g=[band_set_1, band_set_2],
+            max_attempts=max_attempts,
+            settle_timeout=settle_timeout,
+        )
+
+
+@app.command()
+def survey(
+    bands: str = typer.Argument(
+        ...,
+        help="5G bands to combine into candidate masks (comma separated, e.g. 1,28,78)",
+    ),
+    max_size: int = typer.Option(2, help="Maximum number of bands per candidate mask"),
+    samples: int = typer.Option(3, help="Samples per mask in the first round"),
+    interval: float = typer.Option(1, help="Seconds between samples"),
+    rounds: int = typer.Option(0, help="Maximum number of rounds (0: no limit)"),
+    settle_timeout: float = typer.Option(
+        20, help="Maximum seconds to wait for the modem to settle after a change"
+    ),
+    cache: str = typer.Option(
+        "survey_cache.json", help="JSON file caching samples per cell"
+    ),
+    apply: bool = typer.Option(
+        False, help="Keep the best mask instead of restoring the current one"
+    ),
+    router_ip: str = typer.Option(None),
+    password: str = typer.Option(None),
+):
+    """Rank 5G band masks by the signal of the cell each one reaches"""
+    config = check_config(router_ip, password)
+
+    if config:
+        session = get_router_session(config["router_ip"], config["password"])
+        current_mask = session.get_signal_data(fields=["nr5g_band_mask"]).get(
+            "nr5g_band_mask"
         )
 
+        if not current_mask and not apply:
+            log.error(
+                "Could not read the current 5G bands to restore after the survey, "
+                "use --apply to keep the best mask instead"
+            )
+            return
+
+        try:
+            results = survey_bands(
+                session,
+                candidate_masks(bands.split(","), max_size=max_size),
+                samples_per_round=samples,
+                sample_interval=interval,
+                max_rounds=rounds,
+                settle_timeout=settle_timeout,
+                cache=CellCache(cache),
+            )
+        finally:
+            if not apply:
+                log.info(f"Restoring 5G bands {current_mask}")
+                session.set_5g_band(bands=current_mask)
+
+        if apply and results and results[0]["samples"]:
+            log.info(f"Setting 5G bands to best mask {results[0]['mask']}")
+            session.set_5g_band(bands=results[0]["mask"])
+
+        table = Table()
+        for column in results[0].keys() if results else []:
+            table.add_column(column)
+        for row in results:
+            table.add_row(*[str(value) for value in row.values()])
+
+        console.print(table)
+
 
 @app.command()
 def data(
@@ -106,8 +206,9 @@ def data(
     config = check_config(router_ip, password)
 
     if config:
-        cookies = get_auth_cookies(config["router_ip"], config["password"])
-        data = get_signal_data(config["router_ip"], cookies)
+        data = get_router_session(
+            config["router_ip"], config["password"]
+        ).get_signal_data()
 
         if not raw:
             processed_data = process_data(raw_data=data)
@@ -118,18 +219,298 @@ def data(
 
 @app.command()
 def live(
+    ctx: typer.Context,
     viz: LIVE_VISUALIZATIONS = typer.Option(
         LIVE_VISUALIZATIONS.SMS, case_sensitive=False
     ),
     router_ip: str = typer.Option(None),
     password: str = typer.Option(None),
+    sqlite: str = typer.Option(None, help="SQLite database to store samples in"),
+    poll_interval: float = typer.Option(5, help="Seconds between router polls"),
+    timeout: float = typer.Option(10, help="Timeout of each request, in seconds"),
+    refresh: float = typer.Option(1, help="Seconds between dashboard updates"),
+    stale_after: float = typer.Option(
+        None, help="Flag data older than this many seconds (default: 3 poll intervals)"
+    ),
+    max_poll_interval: float = typer.Option(
+        60, help="Maximum seconds between polls when the router is slow or failing"
+    ),
+    stats: bool = typer.Option(
+        False, help="Show p50/p95 latencies of each stage in the footer"
+    ),
+    metrics_file: str = typer.Option(
+        None, help="JSON Lines file to append timings and counters to"
+    ),
 ):
     """Show a live dashboard"""
 
     config = check_config(router_ip, password)
 
     if config:
-        show_live(config, viz=viz)
+        show_live(
+            config,
+            viz=viz,
+            sqlite_path=sqlite,
+            poll_interval=poll_interval,
+            timeout=timeout,
+            refresh=refresh,
+            stale_after=stale_after,
+            max_poll_interval=max_poll_interval,
+            show_stats=stats,
+            metrics_file=metrics_file,
+            max_updates=ctx.obj["profile_ticks"] if ctx.obj else 0,
+        )
+
+
+@app.command()
+def stats(
+    samples: int = typer.Option(10, help="Number of polls to time"),
+    interval: float = typer.Option(1, help="Seconds between polls"),
+    sms: bool = typer.Option(True, help="Also time SMS fetching and decoding"),
+    timeout: float = typer.Option(10, help="Timeout of each request, in seconds"),
+    metrics_file: str = typer.Option(
+        None, help="JSON Lines file to append timings and counters to"
+    ),
+    router_ip: str = typer.Option(None),
+    password: str = typer.Option(None),
+):
+    """Time each stage of the dashboard hot path (login, fetch, decode, process, render)"""
+    config = check_config(router_ip, password)
+
+    if config:
+        sink = JSONLinesSink(metrics_file) if metrics_file else None
+        if sink is not None:
+            metrics.add_sink(sink)
+
+        try:
+            with RouterSession(
+                config["router_ip"], config["password"], timeout=timeout
+            ) as session:
+                collect_stats(session, samples=samples, interval=interval, sms=sms)
+        finally:
+            if sink is not None:
+                metrics.remove_sink(sink)
+                sink.close()
+
+        console.print(stats_table(metrics.summary()))
+
+
+@app.command()
+def history(
+    fields: str = typer.Argument(
+        "lte_rsrp,Z5g_SINR", help="Comma-separated fields to query (e.g. Z5g_SINR)"
+    ),
+    hours: float = typer.Option(24, help="Time range to query, in hours"),
+    router: str = typer.Option(None, help="Router IP (or fleet name) to query"),
+    sqlite: str = typer.Option("history.sqlite3", help="SQLite database to query"),
+    resolution: str = typer.Option(
+        None, help="Query minute, hour or day rollups instead of raw samples"
+    ),
+):
+    """Query signal history stored in SQLite"""
+    if not Path(sqlite).exists():
+        log.error(f"Could not locate SQLite database {sqlite}")
+        return
+
+    store = SQLiteStore(sqlite)
+    since = datetime.now() - timedelta(hours=hours)
+
+    try:
+        if resolution:
+            tables = {
+                field: store.query_rollups(
+                    field, resolution, router=router, since=since
+                )
+                for field in fields.split(",")
+            }
+        else:
+            tables = {
+                "samples": store.query(fields.split(","), router=router, since=since)
+            }
+    except ValueError as e:
+        log.error(e)
+        return
+    finally:
+        store.close()
+
+    for title, rows in tables.items():
+        table = Table(title=title if resolution else None)
+        for column in rows[0].keys() if rows else []:
+            table.add_column(column)
+        for row in rows:
+            table.add_row(*[str(value) for value in row.values()])
+
+        console.print(table)
+
+
+@app.command()
+def fleet(
+    inventory: str = typer.Option(
+        "inventory.yml", help="YAML file listing the routers to poll"
+    ),
+    workers: int = typer.Option(8, help="Maximum number of routers polled at once"),
+    timeout: float = typer.Option(10, help="Timeout (seconds) of each router request"),
+    interval: float = typer.Option(5, help="Seconds between polling cycles"),
+    cycles: int = typer.Option(0, help="Number of cycles to run (0 to run forever)"),
+    raw: bool = typer.Option(False),
+    sqlite: str = typer.Option(None, help="SQLite database to store samples in"),
+    max_interval: float = typer.Option(
+        60, help="Maximum seconds between polls of a slow or failing router"
+    ),
+    deadline: float = typer.Option(
+        None,
+        help="Maximum seconds a cycle waits for the routers (default: longest of interval and timeout)",
+    ),
+):
+    """Poll a fleet of routers concurrently"""
+    routers = load_inventory(inventory)
+
+    if routers:
+        show_fleet(
+            routers,
+            max_workers=workers,
+            timeout=timeout,
+            interval=interval,
+            cycles=cycles,
+            raw=raw,
+            sqlite_path=sqlite,
+            max_interval=max_interval,
+            deadline=deadline,
+        )
+
+
+@app.command()
+def sms_sync(
+    router_ip: str = typer.Option(None),
+    password: str = typer.Option(None),
+    archive: str = typer.Option(
+        "sms_archive.sqlite3", help="SQLite database archiving the messages"
+    ),
+    page_size: int = typer.Option(100, help="Number of messages per page"),
+    concurrency: int = typer.Option(4, help="Number of pages fetched at once"),
+    timeout: float = typer.Option(10, help="Timeout of each request, in seconds"),
+):
+    """Copy new SMS messages to a local archive"""
+    config = check_config(router_ip, password)
+
+    if config:
+        sms_archive = SMSArchive(archive)
+
+        with RouterSession(
+            config["router_ip"],
+            config["password"],
+            pool_maxsize=concurrency,
+            timeout=timeout,
+        ) as session:
+            result = sync_sms(
+                session, sms_archive, page_size=page_size, concurrency=concurrency
+            )
+
+        sms_archive.close()
+
+        log.info(
+            f"Archived {result['archived']} new messages in {archive} "
+            f"({result['pages']} pages fetched, latest id {result['high_water_mark']})"
+        )
+
+
+@app.command()
+def exporter(
+    host: str = typer.Option("0.0.0.0"),
+    port: int = typer.Option(9825),
+    ttl: float = typer.Option(5, help="Seconds router data is reused across scrapes"),
+    timeout: float = typer.Option(10, help="Timeout of each request, in seconds"),
+    scrape_timeout: float = typer.Option(
+        None,
+        help="Maximum seconds a scrape waits for the routers (default: timeout)",
+    ),
+    inventory: str = typer.Option(
+        None, help="YAML file listing the routers to export (default: single router)"
+    ),
+    router_ip: str = typer.Option(None),
+    password: str = typer.Option(None),
+):
+    """Serve router metrics for Prometheus on /metrics"""
+    if inventory:
+        routers = load_inventory(inventory)
+    else:
+        config = check_config(router_ip, password)
+        routers = [{"name": config["router_ip"], **config}] if config else None
+
+    if routers:
+        metrics_exporter = MetricsExporter(
+            routers, ttl=ttl, timeout=timeout, scrape_timeout=scrape_timeout
+        )
+        server = MetricsServer((host, port), metrics_exporter)
+        log.info(f"Serving metrics of {len(routers)} routers on {host}:{port}/metrics")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            metrics_exporter.close()
+
+
+@app.command()
+def mock_router(
+    host: str = typer.Option("127.0.0.1"),
+    port: int = typer.Option(8080),
+    password: str = typer.Option("admin", help="Admin password of the mock router"),
+    latency: float = typer.Option(0.0, help="Delay (seconds) added to each response"),
+    jitter: float = typer.Option(0.0, help="Maximum random delay added to latency"),
+    error_rate: float = typer.Option(0.0, help="Probability of an HTTP 500 response"),
+    session_ttl: float = typer.Option(None, help="Seconds after which logins expire"),
+    sms_count: int = typer.Option(20, help="Number of SMS messages in the inbox"),
+    reattach_delay: float = typer.Option(
+        0.0, help="Seconds without 5G cell after a band lock"
+    ),
+):
+    """Run a stand-in MC801a web server for offline testing"""
+    server = MockRouterServer(
+        (host, port),
+        MockRouter(
+            password=password,
+            latency=latency,
+            jitter=jitter,
+            error_rate=error_rate,
+            session_ttl=session_ttl,
+            sms_count=sms_count,
+            reattach_delay=reattach_delay,
+        ),
+    )
+
+    log.info(f"Mock router listening on {server.router_ip}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("Mock router stopped")
+    finally:
+        server.server_close()
+
+
+@app.command()
+def benchmark(
+    output: str = typer.Option("benchmark.json", help="JSON file to write results to"),
+    iterations: int = typer.Option(200, help="Timed iterations per benchmark"),
+    latency: float = typer.Option(0.0, help="Simulated router latency (seconds)"),
+):
+    """Benchmark parsing, authentication, polling and rendering against a mock router"""
+    results = run_benchmarks(iterations=iterations, latency=latency)
+    write_benchmark_results(results, output)
+
+    table = Table(title=f"Benchmark results ({output})")
+    for column in ["Benchmark", "Mean (ms)", "Median (ms)", "p95 (ms)"]:
+        table.add_column(column)
+    for name, result in results["results"].items():
+        table.add_row(
+            name,
+            *[f"{result[key] * 1000:.3f}" for key in ["mean", "median", "p95"]],
+        )
+
+    console.print(table)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,37 @@
+import pytest
+
+from python_zte_mc801a.lib.mock_router import start_mock_router
+from python_zte_mc801a.lib.router_requests import RouterSession
+
+PASSWORD = "admin"
+
+
+@pytest.fixture
+def mock_router():
+    server = start_mock_router(password=PASSWORD, seed=0)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session(mock_router):
+    with RouterSession(mock_router.router_ip, PASSWORD, timeout=5) as session:
+        yield session
+
+
+@pytest.fixture
+def make_router():
+    """Factory of mock routers with custom options, stopped after the test"""
+    servers = []
+
+    def make_router(**options):
+        server = start_mock_router(password=PASSWORD, seed=0, **options)
+        servers.append(server)
+        return server
+
+    yield make_router
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
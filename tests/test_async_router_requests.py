@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from python_zte_mc801a.lib.async_router_requests import (
+    AsyncRouterSession,
+    async_retry,
+    create_client_session,
+)
+
+from tests.conftest import PASSWORD
+
+
+def run_with_sessions(router_ips: list, coroutine):
+    """Run `coroutine(sessions)` with one AsyncRouterSession per router"""
+
+    async def main():
+        async with create_client_session() as http:
+            sessions = [AsyncRouterSession(http, ip, PASSWORD) for ip in router_ips]
+            return await coroutine(sessions)
+
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_login(mock_router):
+    async def poll(sessions):
+        (session,) = sessions
+        results = await asyncio.gather(*[session.get_signal_data() for _ in range(5)])
+        return session, results
+
+    session, results = run_with_sessions([mock_router.router_ip], poll)
+
+    assert all(raw_data["lte_rsrp"] for raw_data in results)
+    assert session.login_count == 1
+    assert mock_router.router.stats["logins"] == 1
+
+
+def test_many_routers_polled_together(make_router):
+    servers = [make_router(latency=0.2) for _ in range(4)]
+
+    async def poll(sessions):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await asyncio.gather(*[s.get_signal_data() for s in sessions])
+        return results, loop.time() - start
+
+    results, duration = run_with_sessions([s.router_ip for s in servers], poll)
+
+    assert len(results) == 4
+    # Login (LD, LOGIN) and read are 3 sequential requests per router
+    assert duration < 4 * 3 * 0.2
+
+
+def test_session_logs_in_again_when_stok_expires(mock_router):
+    async def poll(sessions):
+        (session,) = sessions
+        await session.get_signal_data()
+        mock_router.router.sessions.clear()
+        await asyncio.gather(*[session.get_signal_data() for _ in range(3)])
+        return session
+
+    session = run_with_sessions([mock_router.router_ip], poll)
+
+    assert session.login_count == 2
+
+
+def test_latest_sms_messages(mock_router):
+    async def fetch(sessions):
+        return await sessions[0].get_latest_sms_messages(n=2)
+
+    messages = run_with_sessions([mock_router.router_ip], fetch)
+
+    assert [msg["content"] for msg in messages] == [
+        "Message 19: your data allowance has been updated.",
+        "Message 18: your data allowance has been updated.",
+    ]
+
+
+def test_set_5g_band(mock_router):
+    async def write(sessions):
+        return await sessions[0].set_5g_band(bands="1,78")
+
+    assert run_with_sessions([mock_router.router_ip], write)
+    assert mock_router.router.data["nr5g_band_mask"] == "1,78"
+
+
+class TestAsyncRetry:
+    def test_retries_until_success(self):
+        attempts = []
+
+        @async_retry(tries=3, delay=0, exceptions=(ConnectionError,))
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError()
+            return "ok"
+
+        assert asyncio.run(flaky()) == "ok"
+        assert len(attempts) == 3
+
+    def test_gives_up_after_tries(self):
+        attempts = []
+
+        @async_retry(tries=2, delay=0, exceptions=(ConnectionError,))
+        async def failing():
+            attempts.append(1)
+            raise ConnectionError()
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(failing())
+        assert len(attempts) == 2
+
+    def test_other_errors_not_retried(self):
+        attempts = []
+
+        @async_retry(tries=3, delay=0, exceptions=(ConnectionError,))
+        async def rejected():
+            attempts.append(1)
+            raise Exception("Login unsuccessful")
+
+        with pytest.raises(Exception, match="Login unsuccessful"):
+            asyncio.run(rejected())
+        assert len(attempts) == 1
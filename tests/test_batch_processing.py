@@ -0,0 +1,98 @@
+import math
+
+import numpy as np
+
+from python_zte_mc801a.lib.batch_processing import (
+    MISSING_INT,
+    parse_ca_columns,
+    process_batch,
+)
+from python_zte_mc801a.lib.data_processing import process_sample
+from python_zte_mc801a.lib.mock_router import DEFAULT_SIGNAL_DATA
+
+SAMPLES = [
+    DEFAULT_SIGNAL_DATA,
+    {
+        **DEFAULT_SIGNAL_DATA,
+        "lte_rsrp": "-101",
+        "lte_snr": "-2.5",
+        "cell_id": "",
+        "nr5g_pci": "",
+        "lte_multi_ca_scell_info": "",
+    },
+    {
+        **DEFAULT_SIGNAL_DATA,
+        "lte_rsrp": "",
+        "Z5g_SINR": "invalid",
+        "lte_pci": "zz",
+        # Carriers with 7, 8 and 6 fields
+        "lte_multi_ca_scell_info": "1,100,0,1,100,20.0,0;2,200,0,7,3050,15.0,0,0;3,300,0,20,6300,10.0",
+    },
+]
+
+
+def same(batch_value, sample_value) -> bool:
+    if sample_value is None:
+        return batch_value == MISSING_INT or math.isnan(batch_value)
+    return batch_value == sample_value
+
+
+def assert_batch_matches_process_sample(samples: list):
+    columns = process_batch(samples)
+
+    for index, raw_data in enumerate(samples):
+        sample = process_sample(raw_data)
+
+        assert same(columns["lte_rsrp"][index], sample.lte_rsrp)
+        assert same(columns["lte_rsrq"][index], sample.lte_rsrq)
+        assert same(columns["lte_snr"][index], sample.lte_snr)
+        assert same(columns["Z5g_rsrp"][index], sample.nr5g_rsrp)
+        assert same(columns["Z5g_SINR"][index], sample.nr5g_sinr)
+        assert same(columns["lte_pci"][index], sample.lte_pci)
+        assert same(columns["nr5g_pci"][index], sample.nr5g_pci)
+        assert same(columns["cell_id"][index], sample.cell_id)
+        assert same(columns["enbid"][index], sample.enbid)
+        assert columns["ca_active"][index] == sample.ca_active
+        assert columns["network_type"][index] == sample.network_type
+
+        carriers = columns["ca_sample_index"] == index
+        assert columns["ca_count"][index] == len(sample.ca_carriers)
+        assert columns["ca_pci"][carriers].tolist() == [
+            carrier.pci for carrier in sample.ca_carriers
+        ]
+        assert columns["ca_band"][carriers].tolist() == [
+            carrier.band for carrier in sample.ca_carriers
+        ]
+        assert columns["ca_earfcn"][carriers].tolist() == [
+            carrier.earfcn for carrier in sample.ca_carriers
+        ]
+        assert columns["ca_bandwidth"][carriers].tolist() == [
+            carrier.bandwidth for carrier in sample.ca_carriers
+        ]
+
+
+def test_batch_matches_process_sample():
+    assert_batch_matches_process_sample(SAMPLES)
+
+
+def test_batch_of_uneven_carriers_matches_process_sample():
+    # The carriers of the batch have as many fields as if they all had 7
+    assert_batch_matches_process_sample(SAMPLES[2:])
+
+
+def test_carriers_with_missing_fields_padded():
+    columns = parse_ca_columns(["1,291,0,1,100,20.0;2,292,0,7", None, ""])
+
+    assert columns["ca_count"].tolist() == [2, 0, 0]
+    assert columns["ca_sample_index"].tolist() == [0, 0]
+    assert columns["ca_pci"].tolist() == [291, 292]
+    assert columns["ca_band"].tolist() == ["1", "7"]
+    assert columns["ca_earfcn"][0] == 100
+    assert np.isnan(columns["ca_earfcn"][1])
+
+
+def test_no_carriers():
+    columns = parse_ca_columns([None, ""])
+
+    assert columns["ca_count"].tolist() == [0, 0]
+    assert columns["ca_pci"].size == 0
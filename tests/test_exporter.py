@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from python_zte_mc801a.client.exporter import (
+    MetricsExporter,
+    _format,
+    format_metrics,
+)
+from python_zte_mc801a.lib.data_processing import process_sample
+from python_zte_mc801a.lib.mock_router import DEFAULT_SIGNAL_DATA
+
+from tests.conftest import PASSWORD
+
+
+@pytest.fixture
+def make_exporter():
+    exporters = []
+
+    def make_exporter(servers: dict, **options):
+        inventory = [
+            {"name": name, "router_ip": server.router_ip, "password": PASSWORD}
+            for name, server in servers.items()
+        ]
+        exporter = MetricsExporter(inventory, **options)
+        exporters.append(exporter)
+        return exporter
+
+    yield make_exporter
+
+    for exporter in exporters:
+        exporter.close()
+
+
+def metric_lines(page: str) -> dict:
+    return dict(
+        line.rsplit(" ", 1) for line in page.splitlines() if not line.startswith("#")
+    )
+
+
+@pytest.mark.parametrize(
+    "value, formatted",
+    [
+        (True, "1"),
+        (-94, "-94"),
+        (12.5, "12.5"),
+        (float("nan"), "NaN"),
+        (float("inf"), "+Inf"),
+        (float("-inf"), "-Inf"),
+    ],
+)
+def test_format(value, formatted):
+    assert _format(value) == formatted
+
+
+def test_metrics_page(make_router, make_exporter):
+    exporter = make_exporter({"office": make_router()})
+
+    metrics = metric_lines(exporter.render())
+
+    assert metrics['zte_mc801a_up{router="office"}'] == "1"
+    assert metrics['zte_mc801a_nr5g_pci{router="office"}'] == "501"
+    assert 'zte_mc801a_lte_rsrp_dbm{router="office"}' in metrics
+
+
+def test_router_data_reused_within_ttl(make_router, make_exporter):
+    server = make_router()
+    exporter = make_exporter({"office": server}, ttl=60)
+
+    exporter.render()
+    exporter.render()
+
+    # Login (LD, LOGIN) and a single read
+    assert server.router.stats["requests"] == 3
+
+
+def test_slow_router_reported_down(make_router, make_exporter):
+    slow = make_router(latency=1)
+    exporter = make_exporter(
+        {"slow": slow, "fast": make_router()}, ttl=0, scrape_timeout=0.3
+    )
+
+    start = time.monotonic()
+    metrics = metric_lines(exporter.render())
+    poll = exporter.polls["slow"]
+    # The slow router's poll is still running: it is not polled again
+    exporter.render()
+
+    assert time.monotonic() - start < 1.5
+    assert metrics['zte_mc801a_up{router="slow"}'] == "0"
+    assert metrics['zte_mc801a_up{router="fast"}'] == "1"
+    assert exporter.polls["slow"] is poll
+
+
+def test_sample_without_values_not_exported():
+    sample = process_sample({**DEFAULT_SIGNAL_DATA, "Z5g_rsrp": ""})
+    page = format_metrics({"office": (sample, DEFAULT_SIGNAL_DATA, 0.0)})
+
+    assert "zte_mc801a_nr5g_rsrp_dbm" not in page
+    assert 'zte_mc801a_lte_rsrp_dbm{router="office"} -94' in page
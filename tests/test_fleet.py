@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from python_zte_mc801a.client.data_io import load_inventory
+from python_zte_mc801a.client.fleet import create_fleet_sessions, poll_fleet
+
+from tests.conftest import PASSWORD
+
+
+def make_sessions(servers: dict) -> dict:
+    inventory = [
+        {"name": name, "router_ip": server.router_ip, "password": PASSWORD}
+        for name, server in servers.items()
+    ]
+    return create_fleet_sessions(inventory, timeout=5)
+
+
+def test_fleet_polled(make_router):
+    sessions = make_sessions({"a": make_router(), "b": make_router()})
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = poll_fleet(sessions, executor, raw=True)
+
+    assert list(results) == ["a", "b"]
+    assert all(result["data"]["lte_rsrp"] for result in results.values())
+
+
+def test_router_missing_deadline_reported_as_error(make_router):
+    sessions = make_sessions({"slow": make_router(latency=1), "fast": make_router()})
+    pending = {}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = poll_fleet(sessions, executor, deadline=0.5, pending=pending)
+        # The slow router is not polled again while its poll is still running
+        again = poll_fleet(sessions, executor, deadline=0.5, pending=pending)
+
+    assert results["slow"]["error"] == "TimeoutError: no response within 0.5s"
+    assert results["slow"]["raw_data"] is None
+    assert "data" in results["fast"]
+    assert again["slow"]["error"] == "TimeoutError: previous poll still running"
+    assert "data" in again["fast"]
+
+
+def test_load_inventory(tmp_path):
+    inventory_file = tmp_path / "inventory.yaml"
+    inventory_file.write_text(
+        "routers:\n"
+        "  - name: office\n"
+        "    router_ip: 192.168.0.1\n"
+        "    password: secret\n"
+        "  - router_ip: 192.168.0.2\n"
+        "    password: secret\n"
+    )
+
+    inventory = load_inventory(str(inventory_file))
+
+    assert [router["name"] for router in inventory] == ["office", "192.168.0.2"]
+
+
+def test_invalid_inventory(tmp_path):
+    inventory_file = tmp_path / "inventory.yaml"
+    inventory_file.write_text("routers:\n  - router_ip: 192.168.0.1\n")
+
+    assert load_inventory(str(inventory_file)) is None
+    assert load_inventory(str(tmp_path / "missing.yaml")) is None
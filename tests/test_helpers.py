@@ -0,0 +1,73 @@
+import time
+
+from python_zte_mc801a.lib.data_processing import process_sample
+from python_zte_mc801a.lib.helpers import force_5g_pci_selection, wait_for_5g_settle
+from python_zte_mc801a.lib.router_requests import RouterSession
+
+from tests.conftest import PASSWORD
+
+# Decimal 5G PCIs of the mock router's cells (see DEFAULT_5G_CELLS)
+PCI_N78 = 501
+PCI_N1 = 317
+
+
+def test_settles_on_new_cell(make_router):
+    server = make_router(reattach_delay=0.2)
+
+    with RouterSession(server.router_ip, PASSWORD) as session:
+        session.set_5g_band(bands="1")
+        result = wait_for_5g_settle(
+            session, None, previous_pci=PCI_N78, poll_interval=0.05, timeout=5
+        )
+
+    assert result.pci == PCI_N1
+    assert result.reattached and result.settled
+    assert result.elapsed < 1
+
+
+def test_settles_after_immediate_reattach(make_router):
+    # The modem is back on a cell before the first poll
+    server = make_router(reattach_delay=0)
+
+    with RouterSession(server.router_ip, PASSWORD) as session:
+        session.set_5g_band(bands="1")
+        result = wait_for_5g_settle(
+            session, None, previous_pci=PCI_N78, poll_interval=0.05, timeout=5
+        )
+
+    assert result == (PCI_N1, result.elapsed, True, True)
+    assert result.elapsed < 0.5
+
+
+def test_same_cell_settled_after_grace(make_router):
+    server = make_router(reattach_delay=0, cells_5g={"501": "78"})
+
+    with RouterSession(server.router_ip, PASSWORD) as session:
+        session.set_5g_band(bands="78")
+        result = wait_for_5g_settle(
+            session,
+            None,
+            previous_pci=PCI_N78,
+            poll_interval=0.05,
+            timeout=5,
+            grace=0.3,
+        )
+
+    assert result.pci == PCI_N78
+    assert not result.reattached and result.settled
+    assert 0.3 <= result.elapsed < 1
+
+
+def test_force_5g_pci_selection(make_router):
+    server = make_router(reattach_delay=0)
+
+    with RouterSession(server.router_ip, PASSWORD) as session:
+        sample = process_sample(session.get_signal_data())
+        start = time.monotonic()
+
+        assert force_5g_pci_selection(
+            PCI_N1, sample, session, bands_5g=["78", "1"], verbose=False
+        )
+
+    assert time.monotonic() - start < 5
+    assert server.router.data["nr5g_band_mask"] == "1"
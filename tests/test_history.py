@@ -0,0 +1,70 @@
+import json
+
+from python_zte_mc801a.client.history import HistoryStore, migrate_legacy_data
+
+
+def make_records(n: int) -> list:
+    return [{"lte_rsrp": str(-90 - i), "index": i} for i in range(n)]
+
+
+def test_segments_rotate_by_size(tmp_path):
+    store = HistoryStore(tmp_path / "history", max_segment_bytes=100)
+    store.extend(make_records(10))
+    store.close()
+
+    segments = store.segments()
+
+    assert len(segments) > 1
+    assert all(segment.stat().st_size <= 100 + 40 for segment in segments)
+    assert [r["index"] for r in store.iter_records()] == list(range(10))
+
+
+def test_tail_spans_segments(tmp_path):
+    store = HistoryStore(tmp_path / "history", max_segment_bytes=100)
+    store.extend(make_records(10))
+    store.close()
+
+    assert [r["index"] for r in store.tail(4)] == [6, 7, 8, 9]
+    assert [r["index"] for r in store.tail(20)] == list(range(10))
+    assert store.tail(0) == []
+
+
+def test_latest_segment_reopened_and_truncated_line_skipped(tmp_path):
+    store = HistoryStore(tmp_path / "history")
+    store.extend(make_records(2))
+    store.close()
+
+    # Simulate a crash in the middle of a write
+    with open(store.segments()[-1], "a") as f:
+        f.write('{"index": 2, "lte_')
+
+    store = HistoryStore(tmp_path / "history")
+    store.append({"index": 3})
+    store.close()
+
+    assert len(store.segments()) == 1
+    assert [r["index"] for r in store.iter_records()] == [0, 1, 3]
+
+
+def test_legacy_data_migrated_once(tmp_path):
+    legacy_file = tmp_path / "data.json"
+    legacy_file.write_text(json.dumps({"signal_data": make_records(3)}))
+    store = HistoryStore(tmp_path / "history")
+
+    assert migrate_legacy_data(store, legacy_file) == 3
+    assert migrate_legacy_data(store, legacy_file) == 0
+    store.close()
+
+    assert not legacy_file.exists()
+    assert (tmp_path / "data.json.migrated").exists()
+    assert list(store.iter_records()) == make_records(3)
+
+
+def test_invalid_legacy_data_left_in_place(tmp_path):
+    legacy_file = tmp_path / "data.json"
+    legacy_file.write_text("{not json")
+    store = HistoryStore(tmp_path / "history")
+
+    assert migrate_legacy_data(store, legacy_file) == 0
+    assert legacy_file.exists()
+    assert store.segments() == []
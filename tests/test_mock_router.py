@@ -0,0 +1,87 @@
+import time
+
+import pytest
+import requests
+
+from python_zte_mc801a.lib.router_requests import (
+    AuthenticationError,
+    RouterSession,
+    get_auth_cookies,
+    get_signal_data,
+    get_sms_page,
+    post_write_request,
+    set_5g_band_request_data,
+)
+
+from tests.conftest import PASSWORD
+
+
+def test_login_with_wrong_password_rejected(mock_router):
+    with pytest.raises(Exception, match="Login unsuccessful"):
+        get_auth_cookies(mock_router.router_ip, "wrong")
+
+
+def test_reads_require_login(mock_router):
+    with pytest.raises(AuthenticationError):
+        get_signal_data(mock_router.router_ip, {"stok": "unknown"})
+
+
+def test_login_expires_after_session_ttl(make_router):
+    server = make_router(session_ttl=0.1)
+    auth_cookies = get_auth_cookies(server.router_ip, PASSWORD)
+
+    get_signal_data(server.router_ip, auth_cookies, fields=["lte_rsrp"])
+    time.sleep(0.2)
+
+    with pytest.raises(AuthenticationError):
+        get_signal_data(server.router_ip, auth_cookies, fields=["lte_rsrp"])
+
+
+def test_only_requested_fields_returned(session):
+    assert set(session.get_signal_data(fields=["lte_rsrp", "nr5g_pci"])) == {
+        "lte_rsrp",
+        "nr5g_pci",
+    }
+
+
+def test_sms_pages_newest_first(session):
+    first_page = session.call(get_sms_page, page=0, data_per_page=8)
+    last_page = session.call(get_sms_page, page=2, data_per_page=8)
+
+    assert [msg["id"] for msg in first_page] == [str(i) for i in range(20, 12, -1)]
+    assert [msg["id"] for msg in last_page] == ["4", "3", "2", "1"]
+
+
+def test_band_lock_detaches_until_reattach_delay(make_router):
+    server = make_router(reattach_delay=0.2)
+
+    with RouterSession(server.router_ip, PASSWORD) as session:
+        assert session.set_5g_band(bands="1")
+        assert session.get_signal_data(fields=["nr5g_pci"]) == {"nr5g_pci": ""}
+
+        time.sleep(0.3)
+
+        raw_data = session.get_signal_data(fields=["nr5g_pci", "nr5g_action_band"])
+
+    assert raw_data == {"nr5g_pci": "13D", "nr5g_action_band": "n1"}
+
+
+def test_write_with_wrong_ad_rejected(session, mock_router):
+    response = session.call(
+        post_write_request,
+        request_data=set_5g_band_request_data("1", ad="0" * 32),
+    )
+
+    assert response == {"result": "failure"}
+    assert mock_router.router.data["nr5g_band_mask"] == ""
+
+
+def test_error_rate(make_router):
+    server = make_router(error_rate=1.0)
+
+    response = requests.get(
+        f"http://{server.router_ip}/goform/goform_get_cmd_process?cmd=LD"
+    )
+
+    assert response.status_code == 500
+    assert server.router.stats["errors"] == 1
@@ -0,0 +1,139 @@
+import pytest
+
+from python_zte_mc801a.client.fleet import poll_router
+from python_zte_mc801a.lib.polling import PollScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_scheduler(clock, **kwargs) -> PollScheduler:
+    options = {
+        "interval": 5.0,
+        "max_interval": 60.0,
+        "slow_latency": 2.0,
+        "jitter": 0.0,
+        "failure_threshold": 3,
+        "open_duration": 120.0,
+        "clock": clock,
+    }
+    return PollScheduler(**{**options, **kwargs})
+
+
+def test_first_poll_due_at_once(clock):
+    schedule = make_scheduler(clock)
+
+    assert schedule.due()
+    assert schedule.delay() == 0.0
+
+
+def test_interval_measured_from_poll_start(clock):
+    schedule = make_scheduler(clock)
+
+    clock.now += 0.5
+    schedule.record(0.5)
+
+    assert schedule.delay() == 4.5
+    assert not schedule.due()
+
+    clock.now += 4.5
+    assert schedule.due()
+
+
+def test_slow_router_backs_off_then_recovers(clock):
+    schedule = make_scheduler(clock, smoothing=1.0)
+
+    intervals = []
+    for _ in range(6):
+        schedule.record(3.0)
+        intervals.append(schedule.interval)
+
+    assert intervals == [10.0, 20.0, 40.0, 60.0, 60.0, 60.0]
+
+    schedule.record(0.1)
+    schedule.record(0.1)
+
+    assert schedule.interval == 15.0
+
+
+def test_failures_back_off_without_affecting_latency(clock):
+    schedule = make_scheduler(clock, smoothing=0.5)
+
+    schedule.record(0.2)
+    schedule.record(10.0, TimeoutError())
+
+    assert schedule.latency == 0.2
+    assert schedule.interval == 10.0
+    assert schedule.error_rate == 0.5
+    assert not schedule.circuit_open
+
+
+def test_circuit_opens_after_consecutive_failures(clock):
+    schedule = make_scheduler(clock)
+
+    for _ in range(3):
+        schedule.record(1.0, ConnectionError())
+
+    assert schedule.circuit_open
+    assert schedule.state == "open"
+    assert schedule.delay() == 119.0
+
+    clock.now += 119.0
+
+    assert schedule.state == "half-open"
+    assert schedule.due()
+
+
+def test_circuit_stays_open_when_probe_fails(clock):
+    schedule = make_scheduler(clock)
+
+    for _ in range(3):
+        schedule.record(0.0, ConnectionError())
+    clock.now += schedule.delay()
+    schedule.record(0.0, ConnectionError())
+
+    assert schedule.state == "open"
+    assert schedule.failures == 4
+
+
+def test_circuit_closes_when_probe_succeeds(clock):
+    schedule = make_scheduler(clock)
+
+    for _ in range(3):
+        schedule.record(0.0, ConnectionError())
+    clock.now += schedule.delay()
+    schedule.record(0.1)
+
+    assert schedule.state == "closed"
+    assert schedule.failures == 0
+    assert schedule.interval == 20.0
+
+
+def test_jitter_bounded(clock):
+    schedule = make_scheduler(clock, jitter=0.1)
+
+    for _ in range(50):
+        schedule.record(0.0)
+        assert 4.5 <= schedule.delay() <= 5.5
+
+
+def test_fleet_router_skipped_while_circuit_open(clock, session, mock_router):
+    schedule = make_scheduler(clock)
+    for _ in range(3):
+        schedule.record(0.1, ConnectionError())
+
+    result = poll_router(session, schedule=schedule)
+
+    assert result["skipped"] == "circuit open, next try in 120s"
+    assert "error" not in result
+    assert mock_router.router.stats["requests"] == 0
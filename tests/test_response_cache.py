@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from python_zte_mc801a.lib.router_requests import ResponseCache, RouterSession
+
+from tests.conftest import PASSWORD
+
+
+def test_set_5g_band_refreshes_version_hash_after_relogin(session, mock_router):
+    session.get_version_hash()
+    session.version_hash = "stale"
+    mock_router.router.sessions.clear()
+
+    assert session.set_5g_band(bands="78")
+    assert mock_router.router.data["nr5g_band_mask"] == "78"
+
+
+def test_set_5g_band_invalidates_cached_reads(mock_router):
+    cache = ResponseCache(ttl=60)
+
+    with RouterSession(mock_router.router_ip, PASSWORD, cache=cache) as session:
+        assert session.get_signal_data(fields=["nr5g_band_mask"]) == {
+            "nr5g_band_mask": ""
+        }
+
+        session.set_5g_band(bands="78")
+
+        assert session.get_signal_data(fields=["nr5g_band_mask"]) == {
+            "nr5g_band_mask": "78"
+        }
+
+
+class TestResponseCache:
+    def test_result_reused_within_ttl(self):
+        cache = ResponseCache(ttl=60)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.get(("router", "f"), fetch)[0] == 1
+        assert cache.get(("router", "f"), fetch)[0] == 1
+        assert cache.fetch_count == 1
+
+    def test_result_fetched_again_after_ttl(self):
+        cache = ResponseCache(ttl=0.05)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return len(calls)
+
+        cache.get(("router", "f"), fetch)
+        time.sleep(0.1)
+        value, age = cache.get(("router", "f"), fetch)
+
+        assert value == 2
+        assert age < 0.05
+
+    def test_concurrent_callers_share_one_fetch(self):
+        cache = ResponseCache(ttl=60)
+        results = []
+
+        def fetch():
+            time.sleep(0.1)
+            return "data"
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.get(("router", "f"), fetch)[0])
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["data"] * 8
+        assert cache.fetch_count == 1
+
+    def test_errors_are_cached(self):
+        cache = ResponseCache(ttl=60)
+
+        def fetch():
+            raise ConnectionError("router down")
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                cache.get(("router", "f"), fetch)
+
+        assert cache.fetch_count == 1
+
+    def test_invalidate_only_drops_router_entries(self):
+        cache = ResponseCache(ttl=60)
+
+        cache.get(("router-1", "f"), lambda: 1)
+        cache.get(("router-2", "f"), lambda: 2)
+        cache.invalidate("router-1")
+
+        assert cache.get(("router-1", "f"), lambda: 3)[0] == 3
+        assert cache.get(("router-2", "f"), lambda: 4)[0] == 2
+
+    def test_least_recently_used_entry_evicted(self):
+        cache = ResponseCache(ttl=60, max_entries=2)
+
+        cache.get(("router", "a"), lambda: "a")
+        cache.get(("router", "b"), lambda: "b")
+        cache.get(("router", "a"), lambda: "a2")
+        cache.get(("router", "c"), lambda: "c")
+
+        assert cache.get(("router", "a"), lambda: "a3")[0] == "a"
+        assert cache.get(("router", "b"), lambda: "b2")[0] == "b2"
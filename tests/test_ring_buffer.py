@@ -0,0 +1,65 @@
+import numpy as np
+
+from python_zte_mc801a.client.ring_buffer import ColumnarRingBuffer
+
+
+def fill(buffer: ColumnarRingBuffer, values: list):
+    for index, value in enumerate(values):
+        buffer.append({"lte_rsrp": value}, timestamp=index)
+
+
+def test_window_oldest_first():
+    buffer = ColumnarRingBuffer(["lte_rsrp"], capacity=5)
+    fill(buffer, ["-100", "-95", "-90"])
+
+    assert len(buffer) == 3
+    assert buffer.window("lte_rsrp", 2).tolist() == [-95, -90]
+    assert buffer.window("lte_rsrp", 10).tolist() == [-100, -95, -90]
+    assert buffer.window("time", 10).tolist() == [0, 1, 2]
+
+
+def test_oldest_values_overwritten():
+    buffer = ColumnarRingBuffer(["lte_rsrp"], capacity=3)
+    fill(buffer, ["-100", "-95", "-90", "-85", "-80"])
+
+    assert len(buffer) == 3
+    assert buffer.window("lte_rsrp", 3).tolist() == [-90, -85, -80]
+    assert buffer.window("time", 2).tolist() == [3, 4]
+
+
+def test_missing_values_recorded_as_nan():
+    buffer = ColumnarRingBuffer(["lte_rsrp", "Z5g_rsrp"], capacity=3)
+    buffer.append({"lte_rsrp": ""})
+    buffer.append({"lte_rsrp": "-95", "Z5g_rsrp": "-88"})
+
+    assert np.isnan(buffer.window("lte_rsrp", 2)[0])
+    assert np.isnan(buffer.window("Z5g_rsrp", 2)[0])
+    assert buffer.window("Z5g_rsrp", 1).tolist() == [-88]
+
+
+def test_file_backed_buffer_survives_restart(tmp_path):
+    path = str(tmp_path / "ring.bin")
+
+    buffer = ColumnarRingBuffer(["lte_rsrp"], capacity=3, path=path)
+    fill(buffer, ["-100", "-95", "-90", "-85"])
+    buffer.flush()
+    del buffer
+
+    buffer = ColumnarRingBuffer(["lte_rsrp"], capacity=3, path=path)
+
+    assert len(buffer) == 3
+    assert buffer.window("lte_rsrp", 3).tolist() == [-95, -90, -85]
+
+
+def test_mismatched_file_recreated(tmp_path):
+    path = str(tmp_path / "ring.bin")
+
+    buffer = ColumnarRingBuffer(["lte_rsrp"], capacity=3, path=path)
+    fill(buffer, ["-100"])
+    buffer.flush()
+    del buffer
+
+    buffer = ColumnarRingBuffer(["lte_rsrp"], capacity=4, path=path)
+
+    assert len(buffer) == 0
+    assert buffer.window("lte_rsrp", 4).size == 0
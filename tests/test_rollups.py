@@ -0,0 +1,134 @@
+from datetime import datetime
+
+import pytest
+
+from python_zte_mc801a.client.rollups import RollupAggregator, RollupBucket
+from python_zte_mc801a.client.sqlite_store import SQLiteStore, TIME_FORMAT
+
+# Start of an hour, so that minute and hour buckets are easy to reason about
+HOUR = datetime(2023, 1, 15, 10, 0, 0).timestamp()
+
+
+def sample_at(seconds: float, rsrp: int) -> dict:
+    return {
+        "time": datetime.fromtimestamp(HOUR + seconds).strftime(TIME_FORMAT),
+        "lte_rsrp": str(rsrp),
+    }
+
+
+def test_bucket_statistics():
+    bucket = RollupBucket(0)
+    for value in [-100, -95, -90, -90]:
+        bucket.update(value)
+
+    assert bucket.count == 4
+    assert bucket.mean == -93.75
+    assert (bucket.minimum, bucket.maximum) == (-100, -90)
+    assert bucket.percentile(50) == -95
+    assert bucket.percentile(100) == -90
+
+
+def test_aggregator_buckets_align_on_resolution():
+    aggregator = RollupAggregator(metrics=["lte_rsrp"])
+
+    aggregator.add("router", HOUR + 10, {"lte_rsrp": "-100"})
+    aggregator.add("router", HOUR + 50, {"lte_rsrp": "-90"})
+    updated = aggregator.add("router", HOUR + 70, {"lte_rsrp": "-80"})
+
+    buckets = {resolution: bucket for _, resolution, _, bucket in updated}
+
+    assert buckets["minute"].start == HOUR + 60
+    assert buckets["minute"].count == 1
+    assert buckets["hour"].start == HOUR
+    assert buckets["hour"].count == 3
+    assert buckets["hour"].mean == -90
+
+
+def test_aggregator_skips_missing_values():
+    aggregator = RollupAggregator(metrics=["lte_rsrp", "Z5g_rsrp"])
+
+    updated = aggregator.add("router", HOUR, {"lte_rsrp": "-95", "Z5g_rsrp": ""})
+
+    assert {metric for _, _, metric, _ in updated} == {"lte_rsrp"}
+
+
+def test_aggregator_reloads_buckets_it_moved_away_from():
+    stored = {}
+
+    def loader(router, resolution, metric, start):
+        return stored.get((router, resolution, metric, start))
+
+    aggregator = RollupAggregator(loader=loader, metrics=["lte_rsrp"])
+
+    for _, resolution, metric, bucket in aggregator.add(
+        "router", HOUR, {"lte_rsrp": "-100"}
+    ):
+        stored[("router", resolution, metric, bucket.start)] = bucket
+    aggregator.clear()
+
+    updated = aggregator.add("router", HOUR + 1, {"lte_rsrp": "-90"})
+
+    assert all(bucket.count == 2 for _, _, _, bucket in updated)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStore(str(tmp_path / "history.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_insert_many_interleaved_routers(store):
+    store.insert_many(
+        [
+            ("a", sample_at(0, -100)),
+            ("b", sample_at(1, -80)),
+            ("a", sample_at(2, -90)),
+        ]
+    )
+
+    rollups = store.query_rollups("lte_rsrp", "minute")
+
+    assert [(r["router"], r["count"], r["mean"]) for r in rollups] == [
+        ("a", 2, -95),
+        ("b", 1, -80),
+    ]
+
+
+def test_insert_many_bucket_left_and_revisited(store):
+    # Out-of-order samples move to the next minute and back within one batch
+    store.insert_many(
+        [
+            ("a", sample_at(0, -100)),
+            ("a", sample_at(60, -80)),
+            ("a", sample_at(30, -90)),
+        ]
+    )
+
+    minutes = store.query_rollups("lte_rsrp", "minute", router="a")
+    hours = store.query_rollups("lte_rsrp", "hour", router="a")
+
+    assert [(r["count"], r["min"], r["max"]) for r in minutes] == [
+        (2, -100, -90),
+        (1, -80, -80),
+    ]
+    assert [r["count"] for r in hours] == [3]
+
+
+def test_rollups_continue_across_stores(store, tmp_path):
+    store.insert("a", sample_at(0, -100))
+    store.close()
+
+    reopened = SQLiteStore(str(tmp_path / "history.sqlite3"))
+    reopened.insert("a", sample_at(1, -90))
+
+    assert reopened.query_rollups("lte_rsrp", "minute")[0]["count"] == 2
+    reopened.close()
+
+
+def test_query_rollups_rejects_unknown_metric(store):
+    with pytest.raises(ValueError):
+        store.query_rollups("lte_rssi", "minute")
+
+    with pytest.raises(ValueError):
+        store.query_rollups("lte_rsrp", "week")
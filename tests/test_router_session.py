@@ -0,0 +1,75 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from python_zte_mc801a.lib.router_requests import RouterSession
+
+from tests.conftest import PASSWORD
+
+
+def call_concurrently(func, n: int = 8) -> list:
+    """Call `func` from `n` threads at once, re-raising their errors"""
+    barrier = threading.Barrier(n)
+
+    def run():
+        barrier.wait()
+        return func()
+
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        futures = [executor.submit(run) for _ in range(n)]
+        return [future.result() for future in futures]
+
+
+def test_session_logs_in_once(session, mock_router):
+    session.get_signal_data()
+    session.get_signal_data()
+
+    assert session.login_count == 1
+    assert mock_router.router.stats["logins"] == 1
+
+
+def test_session_logs_in_again_when_stok_expires(session, mock_router):
+    session.get_signal_data()
+    expired_cookies = session.auth_cookies
+
+    # The router forgets every session, as after a reboot or timeout
+    mock_router.router.sessions.clear()
+
+    raw_data = session.get_signal_data(fields=["nr5g_band_mask"])
+
+    assert "nr5g_band_mask" in raw_data
+    assert session.login_count == 2
+    assert session.auth_cookies != expired_cookies
+
+
+def test_concurrent_callers_share_first_login(make_router):
+    # Latency keeps all requests in flight at once
+    server = make_router(latency=0.05)
+
+    with RouterSession(server.router_ip, PASSWORD, pool_maxsize=8) as session:
+        call_concurrently(lambda: session.get_signal_data(fields=["lte_rsrp"]))
+
+        assert session.login_count == 1
+
+
+def test_concurrent_callers_share_login_after_expiry(make_router):
+    server = make_router(latency=0.05)
+
+    with RouterSession(server.router_ip, PASSWORD, pool_maxsize=8) as session:
+        session.get_auth_cookies()
+        server.router.sessions.clear()
+
+        results = call_concurrently(
+            lambda: session.get_signal_data(fields=["lte_rsrp"])
+        )
+
+        assert all("lte_rsrp" in raw_data for raw_data in results)
+        assert session.login_count == 2
+        assert server.router.stats["logins"] == 2
+
+
+def test_login_without_rejected_cookies_keeps_session(session, mock_router):
+    cookies = session.get_auth_cookies()
+
+    assert session.login() is cookies
+    assert session.login(rejected_cookies=cookies) is not cookies
+    assert mock_router.router.stats["logins"] == 2
@@ -0,0 +1,83 @@
+import pytest
+
+from python_zte_mc801a.lib import data_processing
+from python_zte_mc801a.lib.data_processing import SMSCache, decode_sms_content
+
+
+def encode(text: str) -> str:
+    return text.encode("utf-16-be").hex().upper()
+
+
+def raw_message(message_id: int, text: str) -> dict:
+    return {"id": str(message_id), "content": encode(text), "number": "+44"}
+
+
+@pytest.mark.parametrize("text", ["Top up", "Crédit 5€", "Hello 👋", ""])
+def test_decode_sms_content(text):
+    assert decode_sms_content(encode(text)) == text
+
+
+def test_decode_sms_content_odd_length_payload():
+    assert decode_sms_content("414243") == "ABC"
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+
+    def counting_decode(content):
+        calls.append(content)
+        return decode_sms_content(content)
+
+    monkeypatch.setattr(data_processing, "decode_sms_content", counting_decode)
+    return calls
+
+
+def test_sms_cache_decodes_each_message_once(decode_calls):
+    cache = SMSCache()
+    messages = [raw_message(1, "first"), raw_message(2, "second")]
+
+    cache.decode(messages)
+    decoded = cache.decode(messages)
+
+    assert [msg["content"] for msg in decoded] == ["first", "second"]
+    assert len(decode_calls) == 2
+
+
+def test_sms_cache_decodes_reused_id_again(decode_calls):
+    cache = SMSCache()
+
+    cache.decode([raw_message(1, "deleted")])
+    decoded = cache.decode([raw_message(1, "new")])
+
+    assert decoded[0]["content"] == "new"
+    assert len(decode_calls) == 2
+
+
+def test_sms_cache_evicts_oldest(decode_calls):
+    cache = SMSCache(max_size=2)
+
+    cache.decode([raw_message(i, f"message {i}") for i in range(3)])
+    cache.decode([raw_message(0, "message 0")])
+
+    assert len(cache) == 2
+    assert len(decode_calls) == 4
+
+
+def test_sms_cache_returns_copies():
+    cache = SMSCache()
+
+    cache.decode([raw_message(1, "text")])[0]["content"] = "changed"
+
+    assert cache.decode([raw_message(1, "text")])[0]["content"] == "text"
+
+
+def test_latest_sms_messages_only_requests_n(session, mock_router):
+    mock_router.router.add_message("Hello 👋")
+
+    messages = session.get_latest_sms_messages(n=2)
+
+    assert [msg["content"] for msg in messages] == [
+        "Hello 👋",
+        "Message 19: your data allowance has been updated.",
+    ]
@@ -0,0 +1,65 @@
+import pytest
+
+from python_zte_mc801a.client.sms_archive import SMSArchive, sync_sms
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = SMSArchive(str(tmp_path / "sms.sqlite3"))
+    yield archive
+    archive.close()
+
+
+def test_sync_sms_pages_until_incomplete_page(session, mock_router, archive):
+    result = sync_sms(session, archive, page_size=10, concurrency=2)
+
+    assert result == {
+        "pages": 4,
+        "received": 20,
+        "archived": 20,
+        "high_water_mark": 20,
+    }
+    assert archive.high_water_mark(session.router_ip) == 20
+
+
+def test_sync_sms_stops_at_high_water_mark(session, mock_router, archive):
+    sync_sms(session, archive, page_size=10, concurrency=2)
+    mock_router.router.add_message("New message")
+
+    result = sync_sms(session, archive, page_size=10, concurrency=2)
+
+    assert result == {"pages": 1, "received": 1, "archived": 1, "high_water_mark": 21}
+    assert archive.messages(session.router_ip)[0]["content"] == "New message"
+
+
+def test_sync_sms_without_new_messages(session, archive):
+    sync_sms(session, archive, page_size=10)
+
+    result = sync_sms(session, archive, page_size=10)
+
+    assert result["archived"] == 0
+    assert result["high_water_mark"] == 20
+
+
+def test_interrupted_sync_keeps_high_water_mark(
+    session, mock_router, archive, monkeypatch
+):
+    sync_sms(session, archive, page_size=10)
+    for i in range(15):
+        mock_router.router.add_message(f"New message {i}")
+
+    def archive_then_fail(router, messages):
+        SMSArchive.add(archive, router, messages)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(archive, "add", archive_then_fail)
+    with pytest.raises(OSError):
+        sync_sms(session, archive, page_size=10, concurrency=1)
+    monkeypatch.undo()
+
+    assert archive.high_water_mark(session.router_ip) == 20
+
+    result = sync_sms(session, archive, page_size=10, concurrency=1)
+
+    assert result["high_water_mark"] == 35
+    assert len(archive.messages(session.router_ip)) == 35
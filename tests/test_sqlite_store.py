@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import pytest
+
+from python_zte_mc801a.client.sqlite_store import SQLiteStore
+
+
+def sample(time: str, **fields) -> dict:
+    return {"time": f"2023-01-15 {time}", **fields}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStore(str(tmp_path / "history.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_fields_parsed_into_columns(store):
+    store.insert(
+        "office",
+        sample("10:00:00", lte_rsrp="-95", lte_snr="7.5", nr5g_pci="1F5", cell_id=""),
+    )
+
+    (row,) = store.query(["lte_rsrp", "lte_snr", "nr5g_pci", "cell_id"])
+
+    assert row == {
+        "router": "office",
+        "time": "2023-01-15 10:00:00",
+        "lte_rsrp": -95,
+        "lte_snr": 7.5,
+        "nr5g_pci": 501,
+        "cell_id": None,
+    }
+
+
+def test_query_time_range_and_router(store):
+    store.insert_many(
+        [
+            ("office", sample("10:00:00", lte_rsrp="-100")),
+            ("home", sample("10:00:30", lte_rsrp="-80")),
+            ("office", sample("10:01:00", lte_rsrp="-95")),
+            ("office", sample("10:02:00", lte_rsrp="-90")),
+        ]
+    )
+
+    rows = store.query(
+        ["lte_rsrp"],
+        router="office",
+        since=datetime(2023, 1, 15, 10, 0, 30),
+        until=datetime(2023, 1, 15, 10, 2, 0),
+    )
+
+    assert rows == [
+        {"router": "office", "time": "2023-01-15 10:01:00", "lte_rsrp": -95}
+    ]
+    assert [row["router"] for row in store.query(["lte_rsrp"])] == [
+        "office",
+        "home",
+        "office",
+        "office",
+    ]
+
+
+def test_samples_kept_across_stores(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+
+    store = SQLiteStore(path)
+    store.insert("office", sample("10:00:00", lte_rsrp="-95"))
+    store.close()
+
+    store = SQLiteStore(path)
+    assert len(store.query(["lte_rsrp"])) == 1
+    store.close()
+
+
+def test_unknown_field_rejected(store):
+    with pytest.raises(ValueError, match="Unknown field"):
+        store.query(["lte_rsrp; DROP TABLE samples"])
@@ -0,0 +1,53 @@
+from typer.testing import CliRunner
+
+from python_zte_mc801a.lib.router_requests import RouterSession
+from python_zte_mc801a.lib.survey import CellCache, candidate_masks, measure_mask
+from python_zte_mc801a.main import app
+
+from tests.conftest import PASSWORD
+
+
+def test_candidate_masks():
+    assert candidate_masks(["1", "28", "78"]) == [
+        "1",
+        "28",
+        "78",
+        "1,28",
+        "1,78",
+        "28,78",
+        "1,28,78",
+    ]
+
+
+def test_measure_mask_after_immediate_reattach(make_router):
+    server = make_router(reattach_delay=0)
+    cache = CellCache()
+
+    with RouterSession(server.router_ip, PASSWORD) as session:
+        result = measure_mask(session, "1", 2, cache, sample_interval=0)
+
+    assert (result["pci"], result["band"]) == (317, "n1")
+    assert len(result["samples"]) == 2
+    assert cache.samples(result["cell"]) == result["samples"]
+
+
+def test_measure_mask_without_cell(make_router):
+    server = make_router(reattach_delay=0)
+
+    with RouterSession(server.router_ip, PASSWORD) as session:
+        result = measure_mask(session, "41", 2, CellCache(), settle_timeout=0)
+
+    assert result["pci"] is None
+    assert result["samples"] == []
+
+
+def test_survey_refused_without_current_mask(make_router):
+    server = make_router()
+
+    result = CliRunner().invoke(
+        app, ["survey", "1,78", "--router-ip", server.router_ip, "--password", PASSWORD]
+    )
+
+    assert result.exit_code == 0
+    assert server.router.data["nr5g_band_mask"] == ""
+    assert server.router.stats["band_locks"] == 0
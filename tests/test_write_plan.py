@@ -0,0 +1,68 @@
+from python_zte_mc801a.lib.router_requests import set_5g_band_request_data
+from python_zte_mc801a.lib.write_plan import (
+    WriteStep,
+    execute_write_plan,
+    lock_lte_cell_step,
+    set_5g_band_step,
+)
+
+
+def test_plan_applied_and_verified(session, mock_router):
+    result = execute_write_plan(
+        session,
+        [set_5g_band_step("1"), set_5g_band_step("78"), lock_lte_cell_step(291, 1617)],
+    )
+
+    assert result["success"]
+    assert result["mismatches"] == {}
+    assert [step["success"] for step in result["steps"]] == [True, True, True]
+    assert mock_router.router.data["nr5g_band_mask"] == "78"
+    assert mock_router.router.data["lte_pci_lock"] == "291"
+
+
+def test_read_back_mismatch_fails_plan(session):
+    # The router accepts the request, but does not end up in the expected state
+    step = WriteStep(
+        name="set_5g_band 78",
+        form=set_5g_band_request_data("78", ad=None),
+        expected={"nr5g_band_mask": "1"},
+    )
+
+    result = execute_write_plan(session, [step])
+
+    assert not result["success"]
+    assert result["steps"][0]["success"]
+    assert result["mismatches"] == {"nr5g_band_mask": {"expected": "1", "actual": "78"}}
+
+
+def test_failed_step_stops_plan(session, mock_router):
+    failing_step = WriteStep(
+        name="unsupported", form={"isTest": "false", "goformId": "UNSUPPORTED"}
+    )
+
+    result = execute_write_plan(session, [failing_step, set_5g_band_step("78")])
+
+    assert not result["success"]
+    assert len(result["steps"]) == 1
+    assert mock_router.router.data["nr5g_band_mask"] == ""
+
+
+def test_failed_step_without_stop_on_error(session, mock_router):
+    failing_step = WriteStep(
+        name="unsupported", form={"isTest": "false", "goformId": "UNSUPPORTED"}
+    )
+
+    result = execute_write_plan(
+        session, [failing_step, set_5g_band_step("78")], stop_on_error=False
+    )
+
+    assert not result["success"]
+    assert [step["success"] for step in result["steps"]] == [False, True]
+    assert result["mismatches"] == {}
+
+
+def test_plan_without_verification(session):
+    result = execute_write_plan(session, [set_5g_band_step("78")], verify=False)
+
+    assert result["success"]
+    assert result["verify_duration"] is None